@@ -4,10 +4,8 @@
 # Import Functions
 # ---------------
  
-from modules import entity
-from modules.lineage.informatica_lineage import *
-from modules.entity import *
-from utils import get_credentials, create_purview_client
+from modules.lazy_loading import lazy_import
+from utils import get_credentials, create_purview_client, LazyPurviewClient
 from pyapacheatlas.core.util import GuidTracker
 from pyapacheatlas.readers import ExcelConfiguration, ExcelReader
  
@@ -26,18 +24,20 @@ import time
 import sys
  
  
+# The functions of these modules are imported when they are first called, see modules.lazy_loading
+lazy_import(globals(), "modules.lineage.informatica_lineage", "modules.entity", "modules.lineage.lineage_process_registry")
+ 
+ 
 # Constants
 # ---------------
  
 REFERENCE_NAME_PURVIEW = "hbi-qa01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-qa_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+qa_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
  
 REFERENCE_NAME_PURVIEW = "hbi-pd01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-prod_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+prod_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
    
  
  
@@ -52,7 +52,10 @@ def main():
     # INFORMATICA DEV
     connection_names_excel = "testing_inputs\All_connections.xlsx"
     directories = ["D:\Git\Purview\scripts\data files\HIGHLEVEL_SALES_FORECAST"]
-    build_mass_lineage_for_folders(prod_client, connection_names_excel, directories)
+    # Processes already in Purview with the same sources and targets are not uploaded again, and sources and
+    # targets are looked up in the saved qualified name index before searching for them
+    with LineageProcessRegistry(prod_client, "prod"), persistent_qualified_name_index(prod_client, "prod"):
+        build_mass_lineage_for_folders(prod_client, connection_names_excel, directories)
  
 if __name__ == '__main__':
     main()
\ No newline at end of file
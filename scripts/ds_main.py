@@ -3,27 +3,28 @@
  
 # Import Functions
 # ---------------
-from modules.connection.build_lineage import *
-from modules.entity import *
-from modules.catalog.qube_ingestion import ingest_qube_data
-from utils import get_credentials, create_purview_client
+from modules.lazy_loading import lazy_import, LazyFunction
+from utils import get_credentials, create_purview_client, LazyPurviewClient
 # Import Packages
 # ---------------
 from pathlib import Path
  
  
+# The functions of these modules are imported when they are first called, see modules.lazy_loading
+lazy_import(globals(), "modules.connection.build_lineage", "modules.entity")
+ingest_qube_data = LazyFunction("modules.catalog.qube_ingestion", "ingest_qube_data")
+ 
+ 
 # Constants
 # ---------------
  
 REFERENCE_NAME_PURVIEW = "hbi-qa01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-qa_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+qa_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 REFERENCE_NAME_PURVIEW = "hbi-pd01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-prod_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+prod_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
  
 # Functions
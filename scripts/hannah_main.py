@@ -4,33 +4,8 @@
 # Import Functions
 # ---------------
 
-from modules import entity
-from modules.lineage.cube_lineage import *
-from modules.lineage.magento_lineage import *
-from modules.lineage.databricks_lineage import *
-from modules.lineage.data_lake_lineage import *
-from modules.lineage.data_warehouse_internal_lineage import *
-from modules.lineage.json_payload_lineage import *
-from modules.lineage.informatica_lineage import *
-from modules.lineage.oracle_server_lineage import *
-#from modules.lineage.pkms_lineage import *
-from modules.lineage.powerbi_sql_query_lineage import *
-from modules.lineage.analysis_services_tabular_model_lineage import *
-from modules.lineage.sap_hana_internal_lineage import *
-from modules.lineage.shared_lineage_functions import *
-from modules.lineage.sharepoint_lineage import *
-from modules.lineage.sql_server_lineage import *
-
-from modules.glossary_propagation.shared_glossary_functions import *
-from modules.glossary_propagation.sap_hana_glossary_propagation import *
-from modules.glossary_propagation.sap_s4hana_glossary_propagation import *
-from modules.glossary_propagation.datalake_glossary_propagation import *
-from modules.glossary_propagation.sql_dw_glossary_propagation import *
-from modules.entity import *
-from modules.collection.collection_shared_functions import *
-from modules.collection.sap_s4hana_collection_sorting import *
-from modules.collection.azure_dw_collection_sorting import *
-from utils import get_credentials, create_purview_client
+from modules.lazy_loading import lazy_import
+from utils import get_credentials, create_purview_client, LazyPurviewClient
 from pyapacheatlas.core.util import GuidTracker
 
 from pyapacheatlas.readers import ExcelConfiguration, ExcelReader
@@ -50,18 +25,45 @@ import time
 import sys
 
 
+# The functions of these modules are imported when they are first called, see modules.lazy_loading
+lazy_import(globals(),
+    "modules.lineage.cube_lineage",
+    "modules.lineage.magento_lineage",
+    "modules.lineage.databricks_lineage",
+    "modules.lineage.data_lake_lineage",
+    "modules.lineage.data_warehouse_internal_lineage",
+    "modules.lineage.json_payload_lineage",
+    "modules.lineage.informatica_lineage",
+    "modules.lineage.oracle_server_lineage",
+    #"modules.lineage.pkms_lineage",
+    "modules.lineage.powerbi_sql_query_lineage",
+    "modules.lineage.analysis_services_tabular_model_lineage",
+    "modules.lineage.sap_hana_internal_lineage",
+    "modules.lineage.shared_lineage_functions",
+    "modules.lineage.sharepoint_lineage",
+    "modules.lineage.sql_server_lineage",
+    "modules.glossary_propagation.shared_glossary_functions",
+    "modules.glossary_propagation.sap_hana_glossary_propagation",
+    "modules.glossary_propagation.sap_s4hana_glossary_propagation",
+    "modules.glossary_propagation.datalake_glossary_propagation",
+    "modules.glossary_propagation.sql_dw_glossary_propagation",
+    "modules.entity",
+    "modules.collection.collection_shared_functions",
+    "modules.collection.sap_s4hana_collection_sorting",
+    "modules.collection.azure_dw_collection_sorting"
+)
+
+
 # Constants
 # ---------------
 
 REFERENCE_NAME_PURVIEW = "hbi-qa01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-qa_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+qa_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 REFERENCE_NAME_PURVIEW = "hbi-pd01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-prod_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+prod_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
     
 
 
@@ -0,0 +1,20 @@
+##! /usr/bin/env python3
+
+"""
+The functions and classes of every submodule can be reached as modules.<name>. The submodule that defines
+one, and its dependencies such as pandas or the Azure SDKs, is only imported when the name is first read.
+Entry points stand in for their star imports with modules.lazy_loading.lazy_import.
+"""
+
+
+# Functions
+# ---------------
+
+def __getattr__(name):
+    from modules.lazy_loading import get_lazy_attribute
+    return get_lazy_attribute(name)
+
+
+def __dir__():
+    from modules.lazy_loading import get_function_index
+    return sorted(set(globals()) | set(get_function_index()))
@@ -0,0 +1,344 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import atexit
+import bisect
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+
+
+# Constants
+# ---------------
+
+# Upper bounds, in seconds, of the latency histogram buckets. The last bucket has no upper bound.
+LATENCY_BUCKETS_SECONDS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+# Set to a file path to write the metrics at exit, as Prometheus text when it ends in ".prom" and as JSON otherwise
+METRICS_FILENAME = os.environ.get("PURVIEW_METRICS_FILENAME")
+
+# Set to "0" to turn the recording off
+METRICS_ENABLED = os.environ.get("PURVIEW_METRICS_ENABLED", "1") != "0"
+
+# Functions of the client wrappers, skipped when looking for the function that made a call
+CLIENT_WRAPPER_FUNCTIONS = {"instrumented_call", "governed_call", "limited_call", "sync_call"}
+
+
+# Global
+# ---------------
+
+# (operation, caller) -> the metrics of the pair, see new_operation_metrics
+api_metrics = {}
+api_metrics_lock = threading.Lock()
+
+# The operation metrics of the call running on each thread, so HTTP responses can be added to it
+current_call = threading.local()
+
+
+# Functions
+# ---------------
+
+def new_operation_metrics():
+    """
+    Returns the empty metrics of one operation and calling function.
+    """
+    return {
+        "calls": 0,
+        "errors": 0,
+        "retries": 0,
+        "requests": 0,
+        "seconds": 0.0,
+        "max_seconds": 0.0,
+        "bytes_sent": 0,
+        "bytes_received": 0,
+        "status_codes": {},
+        "latency_buckets": [0] * (len(LATENCY_BUCKETS_SECONDS) + 1)
+    }
+
+
+def get_operation_metrics(operation: str, caller: str):
+    """
+    Returns the metrics of one operation and calling function, creating them on first use.
+    """
+    with api_metrics_lock:
+        metrics = api_metrics.get((operation, caller))
+        if metrics is None:
+            metrics = api_metrics[(operation, caller)] = new_operation_metrics()
+        return metrics
+
+
+def get_calling_function(depth: int = 2):
+    """
+    Returns the name of the function that called the client, skipping the client wrappers.
+
+    Parameters:
+        depth (int, optional): The number of frames between this function and the client call.
+
+    Returns:
+        str: The name of the calling function.
+    """
+    try:
+        frame = sys._getframe(depth)
+    except ValueError:
+        return "<unknown>"
+    while frame is not None and frame.f_code.co_name in CLIENT_WRAPPER_FUNCTIONS:
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else "<unknown>"
+
+
+def record_call(operation: str, caller: str, seconds: float, error: str = None):
+    """
+    Adds one finished client call to the metrics.
+
+    Parameters:
+        operation (str): The client method, ie. "glossary.assignTerm".
+        caller (str): The function that made the call.
+        seconds (float): The wall time of the call, including any wait on the request governor.
+        error (str, optional): The name of the exception the call raised.
+    """
+    metrics = get_operation_metrics(operation, caller)
+    with api_metrics_lock:
+        metrics["calls"] += 1
+        metrics["seconds"] += seconds
+        metrics["max_seconds"] = max(metrics["max_seconds"], seconds)
+        metrics["latency_buckets"][bisect.bisect_left(LATENCY_BUCKETS_SECONDS, seconds)] += 1
+        if error is not None:
+            metrics["errors"] += 1
+
+
+def record_response(metrics: dict, status_code: int, bytes_sent: int, bytes_received: int, retry: bool = False):
+    """
+    Adds one HTTP response to the metrics of the call that sent the request.
+    """
+    with api_metrics_lock:
+        metrics["requests"] += 1
+        metrics["bytes_sent"] += bytes_sent
+        metrics["bytes_received"] += bytes_received
+        metrics["status_codes"][str(status_code)] = metrics["status_codes"].get(str(status_code), 0) + 1
+        if retry:
+            metrics["retries"] += 1
+
+
+def response_hook(response, *args, **kwargs):
+    """
+    A requests response hook that adds the status code, payload sizes and retries of every HTTP
+    response to the call running on the thread. It is registered before the request governor's
+    hook, so it also sees the responses the governor retries.
+    """
+    metrics = getattr(current_call, "metrics", None)
+    if metrics is None:
+        metrics = get_operation_metrics("<http>", "<unknown>")
+    body = response.request.body
+    bytes_sent = len(body) if body else 0
+    bytes_received = int(response.headers.get("Content-Length") or len(response.content or b""))
+    record_response(metrics, response.status_code, bytes_sent, bytes_received, getattr(response.request, "retry_attempt", 0) > 0)
+    return response
+
+
+class InstrumentedPurviewClient:
+    """
+    Wraps a PurviewClient so that every call made through it, including through client.discovery,
+    is recorded by operation and by the function that made it.
+    """
+    def __init__(self, client, prefix: str = ""):
+        """
+        Args:
+            client (PurviewClient): The Purview client, or one of its sub-clients.
+            prefix (str, optional): The name of the sub-client, ie. "glossary.".
+        """
+        self._client = client
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if callable(attribute):
+            operation = self._prefix + name
+            def instrumented_call(*args, **kwargs):
+                caller = get_calling_function()
+                metrics = get_operation_metrics(operation, caller)
+                previous_metrics = getattr(current_call, "metrics", None)
+                current_call.metrics = metrics
+                started_on = time.perf_counter()
+                try:
+                    result = attribute(*args, **kwargs)
+                except BaseException as e:
+                    record_call(operation, caller, time.perf_counter() - started_on, type(e).__name__)
+                    raise
+                finally:
+                    current_call.metrics = previous_metrics
+                if inspect.isgenerator(result):
+                    # ie. discovery.search_entities, whose requests are sent while it is iterated
+                    return instrument_generator(result, operation, caller, metrics, time.perf_counter() - started_on)
+                record_call(operation, caller, time.perf_counter() - started_on)
+                return result
+            return instrumented_call
+        if hasattr(attribute, "__dict__") and hasattr(attribute, "_requests_args"):
+            return InstrumentedPurviewClient(attribute, self._prefix + name + ".")
+        return attribute
+
+
+def instrument_generator(generator, operation: str, caller: str, metrics: dict, seconds: float):
+    """
+    Yields from a generator returned by a client call, timing each step as part of the call,
+    and records the call once the generator is exhausted or closed.
+    """
+    error = None
+    try:
+        while True:
+            previous_metrics = getattr(current_call, "metrics", None)
+            current_call.metrics = metrics
+            started_on = time.perf_counter()
+            try:
+                value = next(generator)
+            except StopIteration:
+                return
+            finally:
+                seconds += time.perf_counter() - started_on
+                current_call.metrics = previous_metrics
+            yield value
+    except BaseException as e:
+        if not isinstance(e, GeneratorExit):
+            error = type(e).__name__
+        raise
+    finally:
+        record_call(operation, caller, seconds, error)
+
+
+def instrument_purview_client(client):
+    """
+    Records the calls and HTTP responses of a PurviewClient.
+
+    Parameters:
+        client (PurviewClient): The Purview client, already governed or not.
+
+    Returns:
+        InstrumentedPurviewClient or PurviewClient: The instrumented client, or the client itself when recording is off.
+    """
+    if not METRICS_ENABLED:
+        return client
+    response_hooks = client._requests_args.setdefault("hooks", {}).setdefault("response", [])
+    if response_hook not in response_hooks:
+        response_hooks.insert(0, response_hook)
+    return InstrumentedPurviewClient(client)
+
+
+def estimate_quantile(latency_buckets: list, quantile: float):
+    """
+    Estimates a latency quantile as the upper bound of the histogram bucket it falls in.
+    """
+    target = quantile * sum(latency_buckets)
+    count = 0
+    for i, bucket_count in enumerate(latency_buckets):
+        count += bucket_count
+        if count >= target and bucket_count > 0:
+            return LATENCY_BUCKETS_SECONDS[i] if i < len(LATENCY_BUCKETS_SECONDS) else float("inf")
+    return 0.0
+
+
+def get_api_metrics_summary():
+    """
+    Returns the recorded metrics, slowest operation first.
+
+    Returns:
+        list: One dictionary per operation and calling function, with its share of the total time under "percent_of_time".
+    """
+    with api_metrics_lock:
+        rows = [dict(operation=operation, caller=caller, **{k: (dict(v) if isinstance(v, dict) else list(v) if isinstance(v, list) else v) for k, v in metrics.items()})
+                for (operation, caller), metrics in api_metrics.items() if metrics["calls"] > 0 or metrics["requests"] > 0]
+    total_seconds = sum(row["seconds"] for row in rows) or 1
+    for row in rows:
+        row["percent_of_time"] = round(100 * row["seconds"] / total_seconds, 1)
+        row["p50_seconds"] = estimate_quantile(row["latency_buckets"], 0.5)
+        row["p95_seconds"] = estimate_quantile(row["latency_buckets"], 0.95)
+    return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+
+def format_api_metrics_table(rows: list):
+    """
+    Formats the summary as a fixed-width table.
+    """
+    header = f"{'operation':<32} {'caller':<40} {'calls':>7} {'errors':>6} {'retries':>7} {'total s':>9} {'%':>5} {'mean ms':>8} {'p95 ms':>8} {'KB sent':>9} {'KB recv':>9}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        mean_ms = 1000 * row["seconds"] / row["calls"] if row["calls"] else 0
+        lines.append(f"{row['operation'][:32]:<32} {row['caller'][:40]:<40} {row['calls']:>7} {row['errors']:>6} {row['retries']:>7} "
+                     f"{row['seconds']:>9.2f} {row['percent_of_time']:>5.1f} {mean_ms:>8.1f} {1000 * row['p95_seconds']:>8.0f} "
+                     f"{row['bytes_sent'] / 1024:>9.1f} {row['bytes_received'] / 1024:>9.1f}")
+    return "\n".join(lines)
+
+
+def format_api_metrics_prometheus(rows: list):
+    """
+    Formats the summary in the Prometheus text exposition format.
+    """
+    lines = [
+        "# TYPE purview_api_calls_total counter",
+        "# TYPE purview_api_errors_total counter",
+        "# TYPE purview_api_retries_total counter",
+        "# TYPE purview_api_bytes_sent_total counter",
+        "# TYPE purview_api_bytes_received_total counter",
+        "# TYPE purview_api_responses_total counter",
+        "# TYPE purview_api_call_seconds histogram"
+    ]
+    for row in rows:
+        labels = f'operation="{row["operation"]}",caller="{row["caller"]}"'
+        lines.append(f"purview_api_calls_total{{{labels}}} {row['calls']}")
+        lines.append(f"purview_api_errors_total{{{labels}}} {row['errors']}")
+        lines.append(f"purview_api_retries_total{{{labels}}} {row['retries']}")
+        lines.append(f"purview_api_bytes_sent_total{{{labels}}} {row['bytes_sent']}")
+        lines.append(f"purview_api_bytes_received_total{{{labels}}} {row['bytes_received']}")
+        for status_code, count in row["status_codes"].items():
+            lines.append(f'purview_api_responses_total{{{labels},code="{status_code}"}} {count}')
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS_SECONDS + ["+Inf"], row["latency_buckets"]):
+            cumulative += count
+            lines.append(f'purview_api_call_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"purview_api_call_seconds_sum{{{labels}}} {row['seconds']:.6f}")
+        lines.append(f"purview_api_call_seconds_count{{{labels}}} {row['calls']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_api_metrics(filename: str):
+    """
+    Writes the recorded metrics to a file, as Prometheus text when it ends in ".prom" and as JSON otherwise.
+
+    Parameters:
+        filename (str): The path of the file.
+    """
+    rows = get_api_metrics_summary()
+    with open(filename, "w", encoding="utf-8") as output_file:
+        if filename.endswith(".prom"):
+            output_file.write(format_api_metrics_prometheus(rows))
+        else:
+            json.dump({"latency_buckets_seconds": LATENCY_BUCKETS_SECONDS, "operations": rows}, output_file, indent=3)
+
+
+def report_api_metrics():
+    """
+    Prints the summary table and writes METRICS_FILENAME, if set. Runs at exit.
+    """
+    rows = get_api_metrics_summary()
+    if len(rows) == 0:
+        return
+    print("\nPurview API usage")
+    print(format_api_metrics_table(rows))
+    if METRICS_FILENAME:
+        write_api_metrics(METRICS_FILENAME)
+        print(f"Purview API metrics written to {METRICS_FILENAME}")
+
+
+def clear_api_metrics():
+    """
+    Drops everything recorded so far.
+    """
+    with api_metrics_lock:
+        api_metrics.clear()
+
+
+if METRICS_ENABLED:
+    atexit.register(report_api_metrics)
@@ -0,0 +1,499 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import asyncio
+import sys
+import threading
+import time
+from json import dumps
+import aiohttp
+from pyapacheatlas.core.util import AtlasException
+from modules.request_governor import *
+from modules.api_metrics import get_calling_function, get_operation_metrics, record_call, record_response
+
+
+# Constants
+# ---------------
+
+PURVIEW_TOKEN_SCOPE = "https://purview.azure.net/.default"
+
+# Requests in flight at once per client
+ASYNC_MAX_CONCURRENT_REQUESTS = 24
+
+# Tokens are refreshed this many seconds before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+# GUIDs per /entity/bulk request in get_entities_by_guids
+ASYNC_ENTITY_BULK_CHUNK_SIZE = 100
+
+# The api-version the discovery and collections endpoints are called with, as in pyapacheatlas
+PURVIEW_API_VERSION = "2022-03-01-preview"
+
+
+# Classes
+# ---------------
+
+class AsyncPurviewClient:
+    """
+    An asyncio facade over the Purview endpoints this project uses, with the same method names and
+    arguments as the pyapacheatlas PurviewClient.
+
+    Requests share one pooled keep-alive connection per host. At most max_concurrent_requests are in flight
+    at once, fewer while the AIMD limit of the account's RequestGovernor is lower, and each request takes a
+    token from the governor's bucket like the synchronous clients. Failed requests raise AtlasException, like pyapacheatlas.
+    """
+    def __init__(self, account_name: str, credentials, max_concurrent_requests: int = ASYNC_MAX_CONCURRENT_REQUESTS):
+        """
+        Args:
+            account_name (str): The name of the Purview account, ie. "hbi-qa01-datamgmt-pview".
+            credentials: A DefaultAzureCredential, ClientSecretCredential or ServicePrincipalAuthentication.
+            max_concurrent_requests (int, optional): The number of requests in flight at once.
+        """
+        self.account_name = account_name.lower()
+        self.credentials = credentials
+        self.max_concurrent_requests = max_concurrent_requests
+        self.endpoint_url = f"https://{self.account_name}.purview.azure.com/catalog/api/atlas/v2"
+        self.catalog_url = f"https://{self.account_name}.purview.azure.com/catalog/api"
+        self.discovery = AsyncPurviewDiscoveryClient(self)
+        self.glossary = AsyncPurviewGlossaryClient(self)
+        self.collections = AsyncPurviewCollectionsClient(self)
+        self.governor = get_request_governor(self.account_name)
+        self._session = None
+        self._slot_condition = None
+        self._in_flight = 0
+        self._token_lock = None
+        self._authorization = None
+        self._token_expires_on = 0
+
+    async def _get_session(self):
+        # The session, condition and lock belong to the event loop, so they are made on first use
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrent_requests, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._slot_condition = asyncio.Condition()
+            self._token_lock = asyncio.Lock()
+        return self._session
+
+    async def _acquire_slot(self):
+        """
+        Waits until fewer requests are in flight than both max_concurrent_requests and the governor's AIMD limit.
+        """
+        async with self._slot_condition:
+            await self._slot_condition.wait_for(lambda: self._in_flight < min(self.max_concurrent_requests, self.governor.get_concurrency_limit()))
+            self._in_flight += 1
+
+    async def _release_slot(self):
+        async with self._slot_condition:
+            self._in_flight -= 1
+            self._slot_condition.notify_all()
+
+    async def _take_token(self):
+        """
+        Waits for a token from the governor's bucket, shared with the synchronous clients of the account,
+        and for any Retry-After pause to end.
+        """
+        while True:
+            wait = self.governor.try_take_token()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    async def _get_authorization(self):
+        async with self._token_lock:
+            if hasattr(self.credentials, "get_authentication_headers"):
+                # pyapacheatlas authentication refreshes its own token
+                headers = await asyncio.to_thread(self.credentials.get_authentication_headers)
+                return headers["Authorization"]
+            if self._authorization is None or time.time() > self._token_expires_on - TOKEN_REFRESH_MARGIN_SECONDS:
+                token = await asyncio.to_thread(self.credentials.get_token, PURVIEW_TOKEN_SCOPE)
+                self._authorization = "Bearer " + token.token
+                self._token_expires_on = token.expires_on
+            return self._authorization
+
+    async def _request(self, method: str, url: str, params=None, json=None):
+        """
+        Sends one request and returns the parsed JSON body, or None if the body is empty.
+
+        Throttled, failed or disconnected idempotent requests are retried with the policy of the account's RequestGovernor,
+        and the request is refused while the circuit breaker of its endpoint class is open or once the job's deadline has passed.
+        """
+        operation = "async." + sys._getframe(1).f_code.co_name
+        circuit_breaker = self.governor.get_circuit_breaker(get_endpoint_class(operation))
+        caller = get_calling_function(3)
+        metrics = get_operation_metrics(operation, caller)
+        data = dumps(json) if json is not None else None
+        started_on = time.perf_counter()
+        session = await self._get_session()
+        attempt = 0
+        error = None
+        try:
+            check_job_deadline()
+            circuit_breaker.before_call()
+            while True:
+                # The slot is only held while the request is in flight, not while backing off
+                await self._acquire_slot()
+                try:
+                    await self._take_token()
+                    headers = {"Authorization": await self._get_authorization(), "Content-Type": "application/json"}
+                    # The same connect and read timeouts as the synchronous clients, capped by the job's deadline
+                    remaining_seconds = get_remaining_seconds()
+                    timeout = aiohttp.ClientTimeout(total=max(1.0, remaining_seconds) if remaining_seconds is not None else None,
+                                                    sock_connect=GOVERNOR_REQUEST_TIMEOUT_SECONDS[0], sock_read=GOVERNOR_REQUEST_TIMEOUT_SECONDS[1])
+                    connection_error = None
+                    try:
+                        async with session.request(method, url, params=params, data=data, headers=headers, timeout=timeout) as response:
+                            body = await response.text()
+                            record_response(metrics, response.status, len(data or ""), len(body), attempt > 0)
+                            if response.status < 400:
+                                self.governor.on_success()
+                                circuit_breaker.on_success()
+                                return await response.json(content_type=None) if body else None
+                            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                        connection_error = e
+                        retry_after = None
+                finally:
+                    await self._release_slot()
+
+                if connection_error is None and response.status in THROTTLED_STATUS_CODES:
+                    self.governor.on_throttled(retry_after)
+                retryable = connection_error is not None or response.status in RETRYABLE_STATUS_CODES
+                delay = self.governor.get_backoff_seconds(attempt + 1, retry_after)
+                remaining_seconds = get_remaining_seconds()
+                if (not retryable or attempt >= GOVERNOR_MAX_RETRIES or not is_idempotent_request(method, url)
+                        or (remaining_seconds is not None and delay >= remaining_seconds)):
+                    if connection_error is not None or is_server_failure(response.status):
+                        circuit_breaker.on_failure()
+                    else:
+                        circuit_breaker.on_success()
+                    check_job_deadline()
+                    if connection_error is not None:
+                        raise connection_error
+                    raise AtlasException(body)
+                attempt += 1
+                self.governor.retried_count += 1
+                await asyncio.sleep(delay)
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            record_call(operation, caller, time.perf_counter() - started_on, error)
+
+    async def close(self):
+        """
+        Closes the pooled connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def get_entity(self, guid=None, qualifiedName=None, typeName=None, ignoreRelationships=False, minExtInfo=False):
+        """
+        Retrieves one or many entities by GUID, or by qualified name and type.
+
+        Args:
+            guid (str or list, optional): The GUID or GUIDs of the entities.
+            qualifiedName (str or list, optional): The qualified name or names of the entities.
+            typeName (str, optional): The type of the entities, required with qualifiedName.
+            ignoreRelationships (bool, optional): Leave the relationship attributes out.
+            minExtInfo (bool, optional): Leave the referred entities out.
+
+        Returns:
+            dict: The entities, under the "entities" key.
+        """
+        params = [("ignoreRelationships", str(ignoreRelationships).lower()), ("minExtInfo", str(minExtInfo).lower())]
+        if qualifiedName and typeName:
+            qualified_names = qualifiedName if isinstance(qualifiedName, list) else [qualifiedName]
+            params.extend((f"attr_{i}:qualifiedName", q) for i, q in enumerate(qualified_names))
+            url = self.endpoint_url + f"/entity/bulk/uniqueAttribute/type/{typeName}"
+        else:
+            guids = guid if isinstance(guid, list) else [guid]
+            params.extend(("guid", g) for g in guids)
+            url = self.endpoint_url + "/entity/bulk"
+        return await self._request("GET", url, params=params)
+
+    async def get_entities_by_guids(self, guids: list, chunk_size: int = ASYNC_ENTITY_BULK_CHUNK_SIZE, **kwargs):
+        """
+        Retrieves any number of entities by GUID, with the chunks requested concurrently.
+
+        Args:
+            guids (list): The GUIDs of the entities.
+            chunk_size (int, optional): The number of GUIDs sent in one request.
+            **kwargs: Passed on to get_entity, ie. ignoreRelationships.
+
+        Returns:
+            dict: The entities of every chunk, under the "entities" key.
+        """
+        chunks = [guids[i : i + chunk_size] for i in range(0, len(guids), chunk_size)]
+        pulled = await asyncio.gather(*[self.get_entity(guid=chunk, **kwargs) for chunk in chunks])
+        entities = []
+        for result in pulled:
+            entities.extend((result or {}).get("entities", []))
+        return {"entities": entities}
+
+    async def upload_entities(self, batch):
+        """
+        Uploads entities with the bulk entity endpoint.
+
+        Args:
+            batch (list or dict): AtlasEntity objects or dictionaries, or a dictionary with an "entities" key.
+
+        Returns:
+            dict: The result, with "mutatedEntities" and "guidAssignments".
+        """
+        if isinstance(batch, dict) and "entities" in batch:
+            entities = batch["entities"]
+        else:
+            entities = batch if isinstance(batch, list) else [batch]
+        payload = {"entities": [e.to_json() if hasattr(e, "to_json") else e for e in entities]}
+        return await self._request("POST", self.endpoint_url + "/entity/bulk", json=payload)
+
+    async def upload_relationship(self, relationship):
+        """
+        Uploads one relationship.
+
+        Args:
+            relationship (dict or AtlasRelationship): The relationship.
+
+        Returns:
+            dict: The uploaded relationship.
+        """
+        payload = relationship.to_json() if hasattr(relationship, "to_json") else relationship
+        return await self._request("POST", self.endpoint_url + "/relationship", json=payload)
+
+
+class AsyncPurviewDiscoveryClient:
+    """
+    The search and browse endpoints, as client.discovery.
+    """
+    def __init__(self, client: AsyncPurviewClient):
+        self.client = client
+
+    async def query(self, keywords=None, filter=None, facets=None, limit=None, offset=None, api_version=PURVIEW_API_VERSION):
+        """
+        Runs one search query.
+
+        Returns:
+            dict: The page of results, with "@search.count" and "value".
+        """
+        body = {"keywords": keywords, "filter": filter}
+        if facets:
+            body["facets"] = facets
+        if limit is not None:
+            body["limit"] = limit
+        if offset is not None:
+            body["offset"] = offset
+        return await self.client._request("POST", self.client.catalog_url + "/search/query", params={"api-version": api_version}, json=body)
+
+    async def browse(self, entityType=None, limit=None, offset=None, api_version=PURVIEW_API_VERSION):
+        """
+        Browses one page of the entities of a type.
+
+        Returns:
+            dict: The page of results, with "@search.count" and "value".
+        """
+        body = {"entityType": entityType}
+        if limit is not None:
+            body["limit"] = limit
+        if offset is not None:
+            body["offset"] = offset
+        return await self.client._request("POST", self.client.catalog_url + "/browse", params={"api-version": api_version}, json=body)
+
+    async def search_entities(self, query, limit=50, search_filter=None, starting_offset=0, api_version=PURVIEW_API_VERSION):
+        """
+        Pages through every result of a search query.
+
+        Yields:
+            dict: Each search result.
+        """
+        offset = starting_offset
+        while True:
+            results = await self.query(keywords=query, filter=search_filter, limit=limit, offset=offset, api_version=api_version)
+            values = results.get("value", [])
+            if len(values) == 0:
+                return
+            for value in values:
+                yield value
+            offset += len(values)
+            if offset >= results.get("@search.count", 0):
+                return
+
+
+class AsyncPurviewGlossaryClient:
+    """
+    Term assignment, as client.glossary. Term names are resolved to GUIDs once per glossary and cached.
+    """
+    def __init__(self, client: AsyncPurviewClient):
+        self.client = client
+        self.term_guids = {}
+
+    async def get_term_guid(self, term_name: str, glossary_name: str = "Glossary"):
+        """
+        Returns the GUID of a term of a glossary by its display text.
+
+        Raises:
+            ValueError: If the glossary or the term does not exist.
+        """
+        if glossary_name not in self.term_guids:
+            glossaries = await self.client._request("GET", self.client.endpoint_url + "/glossary")
+            glossary = next((g for g in glossaries or [] if g.get("name") == glossary_name), None)
+            if glossary is None:
+                raise ValueError(f"Glossary with a name of {glossary_name} was not found.")
+            self.term_guids[glossary_name] = {term.get("displayText"): term.get("termGuid") for term in glossary.get("terms", [])}
+        term_guid = self.term_guids[glossary_name].get(term_name)
+        if term_guid is None:
+            raise ValueError(f"Term with a name of {term_name} was not found in {glossary_name}.")
+        return term_guid
+
+    async def assignTerm(self, entities, termGuid=None, termName=None, glossary_name="Glossary"):
+        """
+        Assigns one term to many entities, given as dictionaries with a "guid".
+
+        Returns:
+            dict: A success message.
+        """
+        if termName:
+            termGuid = await self.get_term_guid(termName, glossary_name)
+        payload = [{"guid": e["guid"]} for e in entities if e.get("guid") is not None]
+        if len(payload) == 0:
+            raise RuntimeError("No Atlas Entities or Dictionaries with Guid were provided.")
+        await self.client._request("POST", self.client.endpoint_url + f"/glossary/terms/{termGuid}/assignedEntities", json=payload)
+        return {"message": "Successfully assigned term to entities."}
+
+    async def delete_assignedTerm(self, entities, termGuid=None, termName=None, glossary_name="Glossary"):
+        """
+        Removes one term from many entities, given as dictionaries with a "guid" and "relationshipGuid",
+        or as entities from get_entity whose "meanings" include the term.
+
+        Returns:
+            dict: A success message.
+        """
+        if termName:
+            termGuid = await self.get_term_guid(termName, glossary_name)
+        payload = []
+        for e in entities:
+            if "relationshipGuid" in e:
+                payload.append({"guid": e["guid"], "relationshipGuid": e["relationshipGuid"]})
+            else:
+                for meaning in (e.get("relationshipAttributes") or {}).get("meanings", []):
+                    if meaning.get("guid") == termGuid:
+                        payload.append({"guid": e["guid"], "relationshipGuid": meaning["relationshipGuid"]})
+        if len(payload) == 0:
+            raise RuntimeError("No Atlas Entities or Dictionaries with Guid were provided.")
+        await self.client._request("DELETE", self.client.endpoint_url + f"/glossary/terms/{termGuid}/assignedEntities", json=payload)
+        return {"message": "Successfully deleted assigned term from entities."}
+
+
+class AsyncPurviewCollectionsClient:
+    """
+    Moving entities between collections, as client.collections.
+    """
+    def __init__(self, client: AsyncPurviewClient):
+        self.client = client
+
+    async def move_entities(self, guids: list, collection: str, api_version: str = PURVIEW_API_VERSION):
+        """
+        Moves entities to a collection.
+
+        Returns:
+            dict: The moved entities.
+        """
+        url = self.client.catalog_url + f"/collections/{collection}/entity/moveHere"
+        return await self.client._request("POST", url, params={"api-version": api_version}, json={"entityGuids": guids})
+
+
+class SyncPurviewClient:
+    """
+    Runs an AsyncPurviewClient on a background event loop so synchronous code can call it.
+
+    Calls look like the pyapacheatlas PurviewClient (client.get_entity(...), client.glossary.assignTerm(...)),
+    so an existing function can switch to it on its own. run_all sends many calls at once and waits for
+    all of them, which is how a synchronous job can keep many requests in flight.
+    """
+    def __init__(self, async_client: AsyncPurviewClient, target = None, loop = None):
+        self.async_client = async_client
+        self._target = target if target is not None else async_client
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+        self._loop = loop
+
+    def run(self, coroutine):
+        """
+        Runs a coroutine on the background event loop and returns its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def run_all(self, coroutines, return_exceptions: bool = False):
+        """
+        Runs many coroutines concurrently, ie. [client.async_client.glossary.assignTerm(...) for ...].
+
+        Args:
+            coroutines (iterable): The coroutines.
+            return_exceptions (bool, optional): Return exceptions in the results instead of raising the first one.
+
+        Returns:
+            list: The results, in the same order.
+        """
+        async def gather():
+            return await asyncio.gather(*coroutines, return_exceptions=return_exceptions)
+        return self.run(gather())
+
+    def search_entities(self, *args, **kwargs):
+        """
+        Returns every result of a search query as a list.
+        """
+        async def collect():
+            return [value async for value in self._target.search_entities(*args, **kwargs)]
+        return self.run(collect())
+
+    def close(self):
+        """
+        Closes the pooled connections and stops the background event loop.
+        """
+        self.run(self.async_client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if isinstance(attribute, (AsyncPurviewDiscoveryClient, AsyncPurviewGlossaryClient, AsyncPurviewCollectionsClient)):
+            return SyncPurviewClient(self.async_client, attribute, self._loop)
+        if asyncio.iscoroutinefunction(attribute):
+            def sync_call(*args, **kwargs):
+                return self.run(attribute(*args, **kwargs))
+            return sync_call
+        return attribute
+
+
+# Functions
+# ---------------
+
+def create_async_purview_client(credentials, purview_account: str, max_concurrent_requests: int = ASYNC_MAX_CONCURRENT_REQUESTS) -> AsyncPurviewClient:
+    """
+    Creates an AsyncPurviewClient, for use inside asyncio code.
+
+    Args:
+        credentials: The credentials from get_credentials.
+        purview_account (str): The name of the Azure Purview account.
+        max_concurrent_requests (int, optional): The number of requests in flight at once.
+
+    Returns:
+        AsyncPurviewClient: The client.
+    """
+    return AsyncPurviewClient(purview_account, credentials, max_concurrent_requests)
+
+
+def create_sync_purview_client(credentials, purview_account: str, max_concurrent_requests: int = ASYNC_MAX_CONCURRENT_REQUESTS) -> SyncPurviewClient:
+    """
+    Creates an AsyncPurviewClient wrapped for synchronous code.
+
+    Args:
+        credentials: The credentials from get_credentials.
+        purview_account (str): The name of the Azure Purview account.
+        max_concurrent_requests (int, optional): The number of requests in flight at once.
+
+    Returns:
+        SyncPurviewClient: The client.
+    """
+    return SyncPurviewClient(AsyncPurviewClient(purview_account, credentials, max_concurrent_requests))
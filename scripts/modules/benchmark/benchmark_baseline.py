@@ -0,0 +1,96 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import json
+from pathlib import Path
+
+
+# Constants
+# ---------------
+
+PROJ_PATH = Path(__file__).resolve().parent.parent.parent
+
+# The runs and baselines of the benchmarks are written to testing_outputs
+BENCHMARK_BASELINE_DIRECTORY = PROJ_PATH / "testing_outputs"
+
+# A result is reported as a regression when its metric gets worse by more than this share of the baseline
+BENCHMARK_REGRESSION_TOLERANCE = 0.20
+
+
+# Functions
+# ---------------
+
+def check_baseline_exists(baseline_filename: Path, update_baseline: bool = False):
+    """
+    Stops a benchmark before it runs when there is no baseline to compare it against.
+
+    Parameters:
+        baseline_filename (Path): The baseline of the benchmark.
+        update_baseline (bool, optional): Whether the run records the baseline, in which case it does not have to exist.
+
+    Raises:
+        FileNotFoundError: If the baseline does not exist and update_baseline is not set.
+    """
+    if not baseline_filename.exists() and not update_baseline:
+        raise FileNotFoundError(f'There is no baseline "{baseline_filename}" to compare against. Run with update_baseline to record one.')
+
+
+def compare_to_baseline(results: dict, baseline: dict, metric: str, higher_is_better: bool, tolerance: float = BENCHMARK_REGRESSION_TOLERANCE):
+    """
+    Lists the results whose metric got worse by more than tolerance against the baseline.
+
+    Parameters:
+        results (dict): The results of this run, keyed by name.
+        baseline (dict): The "results" of the baseline, keyed by name.
+        metric (str): The key of the compared value in each result, ie. "entities_per_second".
+        higher_is_better (bool): Whether a drop of the metric (throughput) or a rise (time) is a regression.
+        tolerance (float, optional): The share of the baseline value a result may lose.
+
+    Returns:
+        list: A description of each regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline_result = baseline.get(name)
+        if baseline_result is None or not baseline_result.get(metric):
+            continue
+        change = result[metric] / baseline_result[metric] - 1
+        if (change < -tolerance) if higher_is_better else (change > tolerance):
+            direction = "below" if change < 0 else "above"
+            regressions.append(f"{name}: {metric} {result[metric]}, {round(abs(change) * 100)}% {direction} the baseline of {baseline_result[metric]}")
+    return regressions
+
+
+def record_or_compare_baseline(run: dict, baseline_filename: Path, output_filename: Path, metric: str, higher_is_better: bool,
+                               update_baseline: bool = False, tolerance: float = BENCHMARK_REGRESSION_TOLERANCE):
+    """
+    Compares a benchmark run against its baseline, or records it as the baseline, and writes the run.
+
+    Parameters:
+        run (dict): The run, with its "results" keyed by name. Its "regressions" are filled in.
+        baseline_filename (Path): The baseline of the benchmark.
+        output_filename (Path): Where the run is written.
+        metric (str): The key of the compared value in each result.
+        higher_is_better (bool): Whether a drop of the metric or a rise is a regression.
+        update_baseline (bool, optional): Record this run as the new baseline instead of comparing it.
+        tolerance (float, optional): The share of the baseline value a result may lose.
+
+    Returns:
+        dict: The run.
+    """
+    if update_baseline:
+        with open(baseline_filename, "w", encoding="utf-8") as json_file:
+            json.dump(run, json_file, indent=3)
+        print(f'Baseline recorded in "{baseline_filename}".')
+    else:
+        check_baseline_exists(baseline_filename)
+        with open(baseline_filename, "r", encoding="utf-8") as json_file:
+            run["regressions"] = compare_to_baseline(run["results"], json.load(json_file).get("results", {}), metric, higher_is_better, tolerance)
+        for regression in run["regressions"]:
+            print("Regression: " + regression)
+
+    with open(output_filename, "w", encoding="utf-8") as json_file:
+        json.dump(run, json_file, indent=3)
+    return run
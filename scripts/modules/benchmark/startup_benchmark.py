@@ -0,0 +1,150 @@
+##! /usr/bin/env python3
+
+
+# Function Imports
+# ---------------
+from modules.benchmark.benchmark_baseline import *
+
+
+# Package Imports
+# ---------------
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+# Constants
+# ---------------
+
+PROJ_PATH = Path(__file__).resolve().parent.parent.parent
+
+# The entry points that can be imported without running. SAP_BW_Internal_Catalog.py prompts for input when imported.
+ENTRY_POINTS = ["hannah_main", "devansh_main", "ds_main"]
+
+# Each entry point is imported this many times, in a new interpreter each time, and the median is kept
+STARTUP_REPEATS = 5
+
+# Dependencies that should only load when a function that needs them is called
+HEAVY_DEPENDENCIES = ["pandas", "pyarrow", "sqllineage", "fuzzywuzzy", "azure.mgmt", "azure.purview", "openpyxl", "modules.classification"]
+
+# The slowest imports listed for each entry point
+SLOWEST_IMPORT_COUNT = 15
+
+# A line of python -X importtime: "import time: self [us] | cumulative | imported package"
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$")
+
+
+# Functions
+# ---------------
+
+def measure_cold_import(entry_point: str):
+    """
+    Imports an entry point in a new interpreter with -X importtime.
+
+    Parameters:
+        entry_point (str): The module name of the entry point, ie. "hannah_main".
+
+    Returns:
+        tuple: The wall seconds of the interpreter and the import time lines, as (module, self us, cumulative us, depth).
+    """
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {entry_point}"],
+                               cwd=PROJ_PATH, capture_output=True, text=True)
+    wall_seconds = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {entry_point} failed:\n{completed.stderr[-2000:]}")
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            imports.append((match.group(4).strip(), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return wall_seconds, imports
+
+
+def get_loaded_heavy_dependencies(imports: list):
+    """
+    Returns the HEAVY_DEPENDENCIES that an import loaded.
+    """
+    module_names = {module_name for module_name, _, _, _ in imports}
+    return [d for d in HEAVY_DEPENDENCIES if any(m == d or m.startswith(d + ".") for m in module_names)]
+
+
+def benchmark_entry_point(entry_point: str, repeats: int = STARTUP_REPEATS):
+    """
+    Measures the cold import time of an entry point.
+
+    Returns:
+        dict: The median wall and import seconds, the heavy dependencies it loads and its slowest imports.
+    """
+    runs = [measure_cold_import(entry_point) for _ in range(repeats)]
+    wall_seconds = statistics.median(wall for wall, _ in runs)
+    import_seconds = statistics.median(next((c for m, _, c, _ in imports if m == entry_point), 0) for _, imports in runs) / 1e6
+
+    # The slowest imports of the median run, by cumulative time, top-level packages only to avoid counting twice
+    _, imports = sorted(runs, key=lambda run: run[0])[len(runs) // 2]
+    top_level = [(m, c) for m, _, c, depth in imports if depth <= 1 and m != entry_point]
+    slowest = sorted(top_level, key=lambda i: i[1], reverse=True)[:SLOWEST_IMPORT_COUNT]
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "import_seconds": round(import_seconds, 3),
+        "module_count": len(imports),
+        "heavy_dependencies": get_loaded_heavy_dependencies(imports),
+        "slowest_imports": {m: round(c / 1e6, 3) for m, c in slowest}
+    }
+
+
+def run_startup_benchmarks(entry_points: list = ENTRY_POINTS, repeats: int = STARTUP_REPEATS, update_baseline: bool = False):
+    """
+    Measures the cold import time of each entry point, and which heavy dependencies importing it loads.
+
+    The results are written to testing_outputs/startup.json and compared against testing_outputs/startup_baseline.json.
+    A run with update_baseline records them as the new baseline instead.
+
+    Parameters:
+        entry_points (list, optional): The module names of the entry points.
+        repeats (int, optional): The number of cold imports of each entry point.
+        update_baseline (bool, optional): Record this run as the new baseline.
+
+    Returns:
+        dict: The run, with its "results" keyed by entry point and the "regressions" against the baseline.
+
+    Raises:
+        FileNotFoundError: If there is no baseline and update_baseline is not set.
+    """
+    baseline_filename = BENCHMARK_BASELINE_DIRECTORY / "startup_baseline.json"
+    check_baseline_exists(baseline_filename, update_baseline)
+
+    results = {}
+    for entry_point in entry_points:
+        results[entry_point] = result = benchmark_entry_point(entry_point, repeats)
+        print(f"{entry_point}: imported in {result['import_seconds']}s ({result['wall_seconds']}s with the interpreter), "
+              f"{result['module_count']} modules, heavy dependencies: {', '.join(result['heavy_dependencies']) or 'none'}")
+
+    run = {
+        "repeats": repeats,
+        "recorded_on": datetime.now().strftime("%m/%d/%Y %H:%M"),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "regressions": []
+    }
+
+    return record_or_compare_baseline(run, baseline_filename, BENCHMARK_BASELINE_DIRECTORY / "startup.json",
+                                      "import_seconds", higher_is_better=False, update_baseline=update_baseline)
+
+
+def main():
+    # python -m modules.benchmark.startup_benchmark [<entry point> ...] [update_baseline]
+    entry_points = [a for a in sys.argv[1:] if a != "update_baseline"] or ENTRY_POINTS
+    run = run_startup_benchmarks(entry_points, update_baseline="update_baseline" in sys.argv[1:])
+    sys.exit(1 if run["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
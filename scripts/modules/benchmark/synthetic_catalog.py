@@ -0,0 +1,363 @@
+##! /usr/bin/env python3
+
+
+# Function Imports
+# ---------------
+from modules.purview_emulator import PurviewEmulatorStore, EmulatorError, EMULATOR_MAX_PAGE_SIZE, EMULATOR_OFFSET_CEILING
+
+
+# Package Imports
+# ---------------
+import random
+import threading
+from pyapacheatlas.core.client import AtlasClient
+from pyapacheatlas.core.util import AtlasException
+
+
+# Constants
+# ---------------
+
+# Catalog sizes by name, in entities (assets and their columns)
+SYNTHETIC_CATALOG_SIZES = {
+    "10k": 10000,
+    "100k": 100000,
+    "1m": 1000000
+}
+
+# Share of the entities of a catalog that belong to each kind of asset, and the columns each asset has
+SYNTHETIC_CATALOG_MIX = {
+    "azure_sql_dw_table": {"share": 0.40, "columns": 20},
+    "sap_hana_view": {"share": 0.15, "columns": 15},
+    "sap_hana_table": {"share": 0.10, "columns": 12},
+    "sap_s4hana_table": {"share": 0.20, "columns": 20},
+    "azure_datalake_gen2_resource_set": {"share": 0.15, "columns": 10}
+}
+
+# Primary key fields of each S/4HANA table, out of its columns
+SAP_S4HANA_PRIMARY_KEY_FIELD_COUNT = 2
+
+# Glossary terms, and how many system-table-field mappings each term has
+SYNTHETIC_GLOSSARY_TERM_COUNT = 720
+SYNTHETIC_GLOSSARY_FIELDS_PER_TERM = 4
+SYNTHETIC_GLOSSARY_NAME = "Glossary"
+
+# Qualified name headers of the production data sources the lineage modules build on
+DW_QUALIFIED_NAME_HEADER = "mssql://hbi-pd01-analytics-dwsrv.database.windows.net/hbipd01dw/"
+SAP_HANA_QUALIFIED_NAME_HEADER = "sap_hana://ff43de60-f60e-41a3-98ed-cec560c93756.hana.prod-us10.hanacloud.ondemand.com/databases/H00/schemas/"
+SAP_HANA_SCHEMA = "FIN_REP"
+SAP_S4HANA_QUALIFIED_NAME_HEADER = "sap_s4hana://hbi-s4hana-prd/tables/"
+DATALAKE_QUALIFIED_NAME_HEADER = "https://hbipd01datalake.dfs.core.windows.net/curated/"
+
+# Half of the DW tables are staging tables loaded into the other half
+DW_SCHEMAS = ["stage", "common"]
+
+# Resource sets keep their columns on a tabular schema, like in Purview
+SYNTHETIC_RELATIONSHIP_DEFS = [
+    {"name": "tabular_schema_columns", "endDef1": {"type": "tabular_schema", "name": "columns", "cardinality": "SET"},
+     "endDef2": {"type": "column", "name": "composeSchema", "cardinality": "SINGLE"}}
+]
+
+# Entities sent to the store in one upsert while a catalog is generated
+SYNTHETIC_UPLOAD_BATCH_SIZE = 1000
+
+
+# Functions
+# ---------------
+
+def get_entity_count(size):
+    """
+    Converts a catalog size given by name ("10k", "100k", "1m") or as a number into an entity count.
+
+    Parameters:
+        size (str or int): The catalog size.
+
+    Returns:
+        int: The number of entities.
+    """
+    if isinstance(size, int):
+        return size
+    if size.lower() in SYNTHETIC_CATALOG_SIZES:
+        return SYNTHETIC_CATALOG_SIZES[size.lower()]
+    return int(size)
+
+
+def build_asset_with_columns(type_name: str, column_type_name: str, name: str, qualified_name: str, column_count: int,
+                             column_relationship: str, first_guid: int):
+    """
+    Builds an asset and its columns with placeholder GUIDs, with each column referring back to the asset.
+
+    Returns:
+        list: The asset followed by its columns.
+    """
+    asset = {"guid": first_guid, "typeName": type_name, "attributes": {"name": name, "qualifiedName": qualified_name}}
+    entities = [asset]
+    for j in range(column_count):
+        column_name = f"col_{j:03d}"
+        entities.append({
+            "guid": first_guid - 1 - j,
+            "typeName": column_type_name,
+            "attributes": {"name": column_name, "qualifiedName": qualified_name + "#" + column_name, "type": "nvarchar"},
+            "relationshipAttributes": {column_relationship: {"guid": first_guid}}
+        })
+    return entities
+
+
+def iterate_synthetic_assets(entity_count: int):
+    """
+    Yields every asset of a catalog, with its columns, in a fixed order.
+
+    Parameters:
+        entity_count (int): The number of entities in the catalog.
+
+    Yields:
+        tuple: The asset type, name, qualified name and its entities (placeholder GUIDs from -1 down).
+    """
+    for type_name, mix in SYNTHETIC_CATALOG_MIX.items():
+        entities_per_asset = mix["columns"] + (2 if type_name == "azure_datalake_gen2_resource_set" else 1)
+        asset_count = max(1, round(entity_count * mix["share"] / entities_per_asset))
+        for i in range(asset_count):
+            if type_name == "azure_sql_dw_table":
+                schema = DW_SCHEMAS[i % len(DW_SCHEMAS)]
+                name = f"tbl_{i:06d}"
+                qualified_name = DW_QUALIFIED_NAME_HEADER + schema + "/" + name
+                entities = build_asset_with_columns(type_name, "azure_sql_dw_column", name, qualified_name, mix["columns"], "table", -1)
+            elif type_name == "sap_hana_view":
+                name = f"RL_FIN_{i:06d}"
+                qualified_name = SAP_HANA_QUALIFIED_NAME_HEADER + SAP_HANA_SCHEMA + "/views/" + name
+                entities = build_asset_with_columns(type_name, "sap_hana_view_column", name, qualified_name, mix["columns"], "view", -1)
+            elif type_name == "sap_hana_table":
+                name = f"ZV_FIN_{i:06d}"
+                qualified_name = SAP_HANA_QUALIFIED_NAME_HEADER + SAP_HANA_SCHEMA + "/tables/" + name
+                entities = build_asset_with_columns(type_name, "sap_hana_table_column", name, qualified_name, mix["columns"], "table", -1)
+            elif type_name == "sap_s4hana_table":
+                name = f"ZT{i:06d}"
+                qualified_name = SAP_S4HANA_QUALIFIED_NAME_HEADER + name
+                entities = build_asset_with_columns(type_name, "sap_s4hana_table_field", name, qualified_name, mix["columns"], "schema", -1)
+                for field in entities[1 : 1 + SAP_S4HANA_PRIMARY_KEY_FIELD_COUNT]:
+                    field["relationshipAttributes"] = {"primary_key_table": {"guid": -1}}
+            else:
+                name = f"resource_set_{i:06d}"
+                qualified_name = DATALAKE_QUALIFIED_NAME_HEADER + name + "/{N}.parquet"
+                entities = build_asset_with_columns("tabular_schema", "column", name + "_schema", qualified_name + "#__tabular_schema",
+                                                    mix["columns"], "composeSchema", -2)
+                entities.insert(0, {"guid": -1, "typeName": type_name, "attributes": {"name": name, "qualifiedName": qualified_name},
+                                    "relationshipAttributes": {"tabular_schema": {"guid": -2}}})
+            yield type_name, name, qualified_name, entities
+
+
+def build_synthetic_glossary(catalog: dict, seed: int, term_count: int = SYNTHETIC_GLOSSARY_TERM_COUNT,
+                             fields_per_term: int = SYNTHETIC_GLOSSARY_FIELDS_PER_TERM):
+    """
+    Maps system-table-field names ("MDG-<table>-<column>") of the DW tables, SAP HANA views and
+    S/4HANA tables to glossary terms, like the Excel import read by read_glossary_import_file.
+
+    Returns:
+        dict: The glossary term name of each system-table-field.
+    """
+    rng = random.Random(seed)
+    tables = catalog["azure_sql_dw_table"] + catalog["sap_hana_view"] + catalog["sap_s4hana_table"]
+    field_count = sum(column_count for _, column_count in tables)
+    glossary_dict_with_fields_as_keys = {}
+    for t in range(term_count):
+        term_name = f"Term {t:04d}"
+        mapped_count = 0
+        while mapped_count < fields_per_term and len(glossary_dict_with_fields_as_keys) < field_count:
+            table_name, column_count = rng.choice(tables)
+            system_table_field = f"MDG-{table_name}-col_{rng.randrange(column_count):03d}"
+            # Each field belongs to one term, as in the import file
+            if system_table_field not in glossary_dict_with_fields_as_keys:
+                glossary_dict_with_fields_as_keys[system_table_field] = term_name
+                mapped_count += 1
+    return glossary_dict_with_fields_as_keys
+
+
+def generate_synthetic_catalog(client, size = "10k", seed: int = 0):
+    """
+    Fills the store of a FakePurviewClient with a synthetic catalog: DW tables and columns, SAP HANA views
+    and tables, S/4HANA tables with primary_key_fields, resource sets with tabular schemas, and a glossary
+    of SYNTHETIC_GLOSSARY_TERM_COUNT terms with system-table-field mappings.
+
+    Parameters:
+        client (FakePurviewClient): The fake client to fill.
+        size (str or int, optional): The catalog size, "10k", "100k", "1m" or a number of entities.
+        seed (int, optional): The seed of the glossary mappings, so catalogs can be compared between runs.
+
+    Returns:
+        dict: The "entity_count", the (name, column count) of the assets of each type, their "qualified_names"
+            by type, and the "glossary_dict_with_fields_as_keys".
+    """
+    entity_count = get_entity_count(size)
+    store = client.store
+    store.upload_typedefs({"relationshipDefs": SYNTHETIC_RELATIONSHIP_DEFS}, update=True)
+
+    catalog = {type_name: [] for type_name in SYNTHETIC_CATALOG_MIX}
+    catalog["qualified_names"] = {type_name: [] for type_name in SYNTHETIC_CATALOG_MIX}
+    pending = []
+    generated_count = 0
+    for type_name, name, qualified_name, entities in iterate_synthetic_assets(entity_count):
+        catalog[type_name].append((name, SYNTHETIC_CATALOG_MIX[type_name]["columns"]))
+        catalog["qualified_names"][type_name].append(qualified_name)
+        # Placeholder GUIDs only have to be unique within one upsert
+        offset = -len(pending) if pending else 0
+        for entity in entities:
+            entity["guid"] += offset
+            for reference in (entity.get("relationshipAttributes") or {}).values():
+                reference["guid"] += offset
+        pending.extend(entities)
+        generated_count += len(entities)
+        if len(pending) >= SYNTHETIC_UPLOAD_BATCH_SIZE:
+            store.upsert_entities(pending)
+            pending = []
+    if pending:
+        store.upsert_entities(pending)
+
+    catalog["entity_count"] = generated_count
+    catalog["glossary_dict_with_fields_as_keys"] = build_synthetic_glossary(catalog, seed)
+    for term_name in sorted(set(catalog["glossary_dict_with_fields_as_keys"].values())):
+        store.add_glossary_term(term_name, SYNTHETIC_GLOSSARY_NAME)
+    print(f"Generated a synthetic catalog of {generated_count} entities and {len(store.terms)} glossary terms")
+    return catalog
+
+
+def get_search_page(values: list, limit: int, offset: int):
+    """
+    Returns one page of search values, capped like Purview caps them.
+    """
+    if offset + 1 > EMULATOR_OFFSET_CEILING:
+        raise AtlasException(f"offset must be less than {EMULATOR_OFFSET_CEILING}")
+    limit = min(limit, EMULATOR_MAX_PAGE_SIZE)
+    return {"@search.count": len(values), "value": values[offset : offset + limit]}
+
+
+# Classes
+# ---------------
+
+class FakeSubClient:
+    """
+    Shares the store and the call counts of a FakePurviewClient.
+    """
+    def __init__(self, parent):
+        self.store = parent.store
+        self._parent = parent
+
+    def count_call(self, name: str):
+        self._parent.count_call(name)
+
+
+class FakePurviewDiscoveryClient(FakeSubClient):
+    def query(self, keywords=None, filter=None, facets=None, limit=50, offset=0, **kwargs):
+        self.count_call("discovery.query")
+        return get_search_page(self.store.search(keywords, filter), limit, offset)
+
+    def browse(self, entityType=None, path=None, limit=50, offset=0, **kwargs):
+        self.count_call("discovery.browse")
+        return get_search_page(self.store.search(None, {"entityType": entityType} if entityType else None), limit, offset)
+
+    def search_entities(self, query, limit=50, search_filter=None, starting_offset=0, **kwargs):
+        offset = starting_offset
+        while True:
+            self.count_call("discovery.search_entities")
+            page = get_search_page(self.store.search(query, search_filter), limit, offset)
+            if len(page["value"]) == 0:
+                return
+            yield from page["value"]
+            offset += len(page["value"])
+
+
+class FakePurviewGlossaryClient(FakeSubClient):
+    def get_glossaries(self, limit=-1, offset=0, sort_order="ASC"):
+        self.count_call("glossary.get_glossaries")
+        return list(self.store.glossaries.values())
+
+    def get_term_guid(self, termGuid=None, termName=None, glossary_name=SYNTHETIC_GLOSSARY_NAME):
+        if termGuid is not None:
+            return termGuid
+        for term in self.store.terms.values():
+            if term["name"] == termName and term["anchor"]["displayText"] == glossary_name:
+                return term["guid"]
+        raise AtlasException(f"Term {termName} was not found in {glossary_name}")
+
+    def assignTerm(self, entities, termGuid=None, termName=None, glossary_name=SYNTHETIC_GLOSSARY_NAME):
+        self.count_call("glossary.assignTerm")
+        try:
+            self.store.assign_term(self.get_term_guid(termGuid, termName, glossary_name), [{"guid": e.get("guid")} for e in entities])
+        except EmulatorError as e:
+            raise AtlasException(str(e))
+
+    def get_termAssignedEntities(self, termGuid=None, termName=None, glossary_name=SYNTHETIC_GLOSSARY_NAME, limit=-1, offset=0, sort="ASC"):
+        self.count_call("glossary.get_termAssignedEntities")
+        return list(self.store.terms[self.get_term_guid(termGuid, termName, glossary_name)]["assignedEntities"])
+
+    def delete_assignedTerm(self, entities, termGuid=None, termName=None, glossary_name=SYNTHETIC_GLOSSARY_NAME):
+        self.count_call("glossary.delete_assignedTerm")
+        self.store.delete_assigned_term(self.get_term_guid(termGuid, termName, glossary_name), entities)
+
+
+class FakePurviewCollectionsClient(FakeSubClient):
+    def move_entities(self, guids, collection, api_version=None):
+        self.count_call("collections.move_entities")
+        return self.store.move_entities(guids, collection)
+
+
+class FakePurviewClient:
+    """
+    A minimal in-memory stand-in for PurviewClient that calls a PurviewEmulatorStore directly, without HTTP,
+    so benchmarks measure this project's code rather than the network. It counts the calls made through it.
+    """
+    def __init__(self, store: PurviewEmulatorStore = None):
+        """
+        Args:
+            store (PurviewEmulatorStore, optional): The catalog. A new empty one when not given.
+        """
+        self.store = store or PurviewEmulatorStore()
+        self.call_counts = {}
+        self.call_counts_lock = threading.Lock()
+        self.discovery = FakePurviewDiscoveryClient(self)
+        self.glossary = FakePurviewGlossaryClient(self)
+        self.collections = FakePurviewCollectionsClient(self)
+
+    def count_call(self, name: str):
+        with self.call_counts_lock:
+            self.call_counts[name] = self.call_counts.get(name, 0) + 1
+
+    def get_call_count(self):
+        with self.call_counts_lock:
+            return sum(self.call_counts.values())
+
+    def get_entity(self, guid=None, qualifiedName=None, typeName=None, ignoreRelationships=False, minExtInfo=False):
+        self.count_call("get_entity")
+        if guid is not None:
+            return {"entities": self.store.get_entities(guid if isinstance(guid, list) else [guid]), "referredEntities": {}}
+        qualified_names = qualifiedName if isinstance(qualifiedName, list) else [qualifiedName]
+        return {"entities": self.store.get_entities_by_qualified_names(typeName, qualified_names), "referredEntities": {}}
+
+    def upload_entities(self, batch, batch_size=None):
+        self.count_call("upload_entities")
+        return self.store.upsert_entities(AtlasClient._prepare_entity_upload(batch)["entities"])
+
+    def upload_relationship(self, relationship):
+        self.count_call("upload_relationship")
+        try:
+            return self.store.add_relationship(relationship.to_json() if hasattr(relationship, "to_json") else relationship)
+        except EmulatorError as e:
+            raise AtlasException(str(e))
+
+    def delete_entity(self, guid=None, qualifiedName=None, typeName=None):
+        self.count_call("delete_entity")
+        if guid is None:
+            guid = [e["guid"] for e in self.store.get_entities_by_qualified_names(typeName, qualifiedName if isinstance(qualifiedName, list) else [qualifiedName])]
+        return self.store.delete_entities(guid if isinstance(guid, list) else [guid])
+
+    def get_all_typedefs(self):
+        self.count_call("get_all_typedefs")
+        return self.store.get_typedefs()
+
+    def upload_typedefs(self, typedefs=None, force_update=False, **kwargs):
+        self.count_call("upload_typedefs")
+        payload = dict(typedefs or {})
+        for category, type_defs in kwargs.items():
+            payload[category] = [t.to_json() if hasattr(t, "to_json") else t for t in type_defs]
+        try:
+            return self.store.upload_typedefs(payload, update=force_update)
+        except EmulatorError as e:
+            raise AtlasException(str(e))
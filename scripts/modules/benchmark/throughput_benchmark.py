@@ -0,0 +1,325 @@
+##! /usr/bin/env python3
+
+
+# Function Imports
+# ---------------
+from modules.benchmark.benchmark_baseline import *
+from modules.benchmark.synthetic_catalog import *
+from modules.entity import pull_entities_from_purview, clear_qualified_name_index, clear_type_scoped_entity_cache
+from modules.glossary_propagation.shared_glossary_functions import propagate_all_glossary_terms_across_specific_entity_type
+from modules.catalog.qube_ingestion import EntityFactory
+from modules.lineage import data_warehouse_internal_lineage, sap_hana_internal_lineage
+
+
+# Package Imports
+# ---------------
+import contextlib
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+# Constants
+# ---------------
+
+# The lineage paths read one SQL or JSON file per view, so they run on a sample of the catalog
+DW_LINEAGE_MAX_VIEWS = 500
+DW_LINEAGE_SOURCES_PER_VIEW = 2
+SAP_HANA_LINEAGE_MAX_VIEWS = 500
+SAP_HANA_LINEAGE_SOURCES_PER_VIEW = 3
+
+# QUBE fields per table uploaded by the EntityFactory benchmark
+QUBE_FIELDS_PER_TABLE = 20
+
+# The folders build_data_warehouse_schema_lineage reads, relative to the working directory
+DW_VIEWS_PATH = "inputs/BIDW/DataWarehouse/hbidw/Resources/Install/Views/"
+DW_ROUTINES_PATH = "inputs/BIDW/DataWarehouse/hbidw/Resources/Install/Routines/"
+
+
+# Functions
+# ---------------
+
+@contextlib.contextmanager
+def quiet_working_directory():
+    """
+    Runs a benchmarked path in an empty temporary working directory with its progress prints and INFO logs
+    discarded, so the files it writes are thrown away and writing to the terminal is not measured.
+    """
+    previous_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull:
+        os.chdir(directory)
+        logging.disable(logging.INFO)
+        try:
+            with contextlib.redirect_stdout(devnull):
+                yield Path(directory)
+        finally:
+            logging.disable(logging.NOTSET)
+            os.chdir(previous_directory)
+
+
+def count_pulled_entities(all_entity_details: list):
+    """
+    Counts the pulled assets and their columns, view columns and fields.
+    """
+    entity_count = 0
+    for entity in all_entity_details:
+        relationship_attributes = entity["entity"].get("relationshipAttributes") or {}
+        entity_count += 1 + len(entity.get("columns") or relationship_attributes.get("view_columns") or []) \
+            + len(relationship_attributes.get("fields") or []) + len(relationship_attributes.get("primary_key_fields") or [])
+    return entity_count
+
+
+def measure(client, unit: str, run):
+    """
+    Times one hot path.
+
+    Parameters:
+        client (FakePurviewClient): The client the path calls, for its call count.
+        unit (str): What the entity count counts, ie. "entities" or "views".
+        run (function): Runs the path and returns how many of unit it processed.
+
+    Returns:
+        dict: The "entity_count", "unit", "wall_seconds", "entities_per_second" and "api_calls" of the path.
+    """
+    calls_before = client.get_call_count()
+    start_time = time.perf_counter()
+    entity_count = run()
+    wall_seconds = time.perf_counter() - start_time
+    result = {
+        "entity_count": entity_count,
+        "unit": unit,
+        "wall_seconds": round(wall_seconds, 3),
+        "entities_per_second": round(entity_count / max(wall_seconds, 1e-9), 1),
+        "api_calls": client.get_call_count() - calls_before
+    }
+    return result
+
+
+def benchmark_pull_entities(client):
+    """
+    pull_entities_from_purview over every pulled entity type of the catalog, into "<account>_pulled_entities.json".
+    """
+    pulled = {}
+
+    def run():
+        pulled["entities"] = pull_entities_from_purview("benchmark", "benchmark-pview", client)
+        return sum(count_pulled_entities(entity_type.get("all_entity_details", []))
+                   for data_source in pulled["entities"]["data_sources"].values() for entity_type in data_source.values())
+
+    with quiet_working_directory():
+        result = measure(client, "entities", run)
+    # The pulled details feed the glossary propagation benchmark
+    return result, pulled["entities"]
+
+
+def benchmark_glossary_propagation(client, catalog: dict, pulled_entities: dict):
+    """
+    propagate_all_glossary_terms_across_specific_entity_type over the DW tables, SAP HANA views and S/4HANA tables.
+    """
+    data_sources = pulled_entities["data_sources"]
+    entity_types = [
+        (data_sources["azure_sql_dw"]["azure_sql_dw_table"]["all_entity_details"], "columns"),
+        (data_sources["sap_hana"]["sap_hana_view"]["all_entity_details"], "view_columns"),
+        (data_sources["sap_s4hana"]["sap_s4hana_table"]["all_entity_details"], "primary_key_fields")
+    ]
+    glossary_dict_with_fields_as_keys = catalog["glossary_dict_with_fields_as_keys"]
+
+    def run():
+        entity_count = 0
+        term_names = set(glossary_dict_with_fields_as_keys.values())
+        dict_for_string_matches = {term_name: [] for term_name in term_names}
+        dict_for_guids_of_a_glossary_term = {term_name: [] for term_name in term_names}
+        for all_entity_details, column_type_name in entity_types:
+            propagate_all_glossary_terms_across_specific_entity_type(client, all_entity_details, column_type_name, glossary_dict_with_fields_as_keys,
+                                                                     dict_for_string_matches, dict_for_guids_of_a_glossary_term)
+            entity_count += count_pulled_entities(all_entity_details)
+        return entity_count
+
+    return measure(client, "entities", run)
+
+
+def benchmark_entity_factory(entity_count: int):
+    """
+    EntityFactory.batch_create_entities of QUBE tables and fields, on a client of its own so the catalog is not doubled.
+    """
+    factory_client = FakePurviewClient()
+    factory = EntityFactory(factory_client)
+    entities = []
+    for i in range(max(1, entity_count // (QUBE_FIELDS_PER_TABLE + 1))):
+        table_name = f"QUBE_TABLE_{i:06d}"
+        table = factory.create_table_entity({"table_name": table_name, "business_name": table_name.title(), "module_name": "BENCHMARK"})
+        entities.append(table)
+        for j in range(QUBE_FIELDS_PER_TABLE):
+            entities.append(factory.create_field_entity({"parent_table_name": table_name, "field_name": f"FIELD_{j:03d}", "sequence_number": j,
+                                                         "data_type": "VARCHAR", "field_length": 40}, table["attributes"]["qualifiedName"]))
+
+    def run():
+        return factory.batch_create_entities(entities)["created_count"]
+
+    with quiet_working_directory():
+        return measure(factory_client, "entities", run)
+
+
+def write_data_warehouse_lineage_inputs(client, catalog: dict, directory: Path):
+    """
+    Writes one view per DW_LINEAGE_SOURCES_PER_VIEW common tables, and a load routine for each common table
+    reading from staging tables, and adds the views to the catalog.
+
+    Returns:
+        list: The view file names.
+    """
+    tables = [name for name, _ in catalog["azure_sql_dw_table"]]
+    stage_tables = tables[0::2]
+    common_tables = tables[1::2]
+    (directory / DW_VIEWS_PATH).mkdir(parents=True)
+    (directory / DW_ROUTINES_PATH).mkdir(parents=True)
+
+    view_count = min(DW_LINEAGE_MAX_VIEWS, max(1, len(common_tables) // DW_LINEAGE_SOURCES_PER_VIEW))
+    view_file_names = []
+    views = []
+    for i in range(view_count):
+        view_name = f"vwreport_{i:06d}"
+        sources = [common_tables[(i * DW_LINEAGE_SOURCES_PER_VIEW + k) % len(common_tables)] for k in range(DW_LINEAGE_SOURCES_PER_VIEW)]
+        joins = " ".join(f"JOIN common.{s} t{k} ON t0.id = t{k}.id" for k, s in enumerate(sources[1:], start=1))
+        (directory / DW_VIEWS_PATH / f"reporting.{view_name}.sql").write_text(
+            f"CREATE VIEW reporting.{view_name} AS SELECT t0.id FROM common.{sources[0]} t0 {joins}\nGO\n")
+        view_file_names.append(f"reporting.{view_name}.sql")
+        views.append({"typeName": "azure_sql_dw_view", "attributes": {"name": view_name, "qualifiedName": DW_QUALIFIED_NAME_HEADER + "reporting/" + view_name}})
+
+    for i, common_table in enumerate(common_tables):
+        stage_sources = [stage_tables[(i + k) % len(stage_tables)] for k in range(2)]
+        (directory / DW_ROUTINES_PATH / f"common.Load{common_table}.sql").write_text(
+            f"INSERT INTO common.{common_table} SELECT s.id FROM stage.{stage_sources[0]} s JOIN stage.{stage_sources[1]} s2 ON s.id = s2.id\nGO\n")
+
+    client.store.upsert_entities(views)
+    return view_file_names
+
+
+def benchmark_data_warehouse_lineage(client, catalog: dict):
+    """
+    build_data_warehouse_schema_lineage over a sample of views, each joining common tables loaded from staging tables.
+    """
+    with quiet_working_directory() as directory:
+        view_file_names = write_data_warehouse_lineage_inputs(client, catalog, directory)
+        clear_qualified_name_index()
+
+        def run():
+            data_warehouse_internal_lineage.build_data_warehouse_schema_lineage(client)
+            return len(view_file_names)
+
+        return measure(client, "views", run)
+
+
+def write_sap_hana_lineage_inputs(catalog: dict, directory: Path):
+    """
+    Writes one DSP view definition per new view, reading from existing SAP HANA views and tables.
+
+    Returns:
+        Path: The folder of the definitions.
+    """
+    sources = [name for name, _ in catalog["sap_hana_view"]] + [name for name, _ in catalog["sap_hana_table"]]
+    view_count = min(SAP_HANA_LINEAGE_MAX_VIEWS, max(1, len(sources) // SAP_HANA_LINEAGE_SOURCES_PER_VIEW))
+    views_directory = directory / SAP_HANA_SCHEMA
+    views_directory.mkdir()
+    for i in range(view_count):
+        view_name = f"HL_BENCHMARK_{i:06d}"
+        elements = {f"COL_{j:03d}": {"@EndUserText.label": f"Column {j}"} for j in range(10)}
+        definitions = {view_name: {"elements": elements}}
+        for k in range(SAP_HANA_LINEAGE_SOURCES_PER_VIEW):
+            definitions[sources[(i * SAP_HANA_LINEAGE_SOURCES_PER_VIEW + k) % len(sources)]] = {"elements": elements}
+        with open(views_directory / f"{view_name}.json", "w", encoding="utf-8") as json_file:
+            json.dump({"definitions": definitions}, json_file)
+    return views_directory
+
+
+def benchmark_sap_hana_lineage(client, catalog: dict):
+    """
+    parse_all_views_for_schema over DSP view definitions: each new view is created and connected to its sources.
+    """
+    with quiet_working_directory() as directory:
+        views_directory = write_sap_hana_lineage_inputs(catalog, directory)
+        sap_hana_internal_lineage.prod_hana_view_qualified_names = list(catalog["qualified_names"]["sap_hana_view"])
+        sap_hana_internal_lineage.prod_hana_table_qualified_names = list(catalog["qualified_names"]["sap_hana_table"])
+        sap_hana_internal_lineage.prod_dsp_connection_qualified_names = []
+        clear_qualified_name_index()
+        clear_type_scoped_entity_cache()
+
+        def run():
+            sap_hana_internal_lineage.parse_all_views_for_schema(client, str(views_directory), SAP_HANA_QUALIFIED_NAME_HEADER, SAP_HANA_SCHEMA)
+            return len(os.listdir(views_directory))
+
+        return measure(client, "views", run)
+
+
+def get_baseline_filename(size):
+    return BENCHMARK_BASELINE_DIRECTORY / f"throughput_baseline_{str(size).lower()}.json"
+
+
+def run_throughput_benchmarks(size = "10k", seed: int = 0, update_baseline: bool = False):
+    """
+    Generates a synthetic catalog and measures the wall time and entities/s of the hot paths: pulling
+    entities, glossary propagation, EntityFactory batch uploads, DW internal lineage and SAP HANA view lineage.
+
+    The results are written to testing_outputs/throughput_<size>.json and compared against the committed
+    testing_outputs/throughput_baseline_<size>.json. A run with update_baseline records them as the new baseline
+    instead.
+
+    Parameters:
+        size (str or int, optional): The catalog size, "10k", "100k", "1m" or a number of entities.
+        seed (int, optional): The seed of the synthetic glossary mappings.
+        update_baseline (bool, optional): Record this run as the new baseline.
+
+    Returns:
+        dict: The run, with its "results" keyed by path and the "regressions" against the baseline.
+
+    Raises:
+        FileNotFoundError: If the size has no baseline and update_baseline is not set.
+    """
+    baseline_filename = get_baseline_filename(size)
+    check_baseline_exists(baseline_filename, update_baseline)
+
+    client = FakePurviewClient()
+    catalog = generate_synthetic_catalog(client, size, seed)
+
+    results = {}
+    results["pull_entities_from_purview"], pulled_entities = benchmark_pull_entities(client)
+    results["propagate_all_glossary_terms_across_specific_entity_type"] = benchmark_glossary_propagation(client, catalog, pulled_entities)
+    del pulled_entities
+    results["EntityFactory.batch_create_entities"] = benchmark_entity_factory(catalog["entity_count"])
+    results["data_warehouse_internal_lineage"] = benchmark_data_warehouse_lineage(client, catalog)
+    results["sap_hana_view_lineage"] = benchmark_sap_hana_lineage(client, catalog)
+    for name, result in results.items():
+        print(f"{name}: {result['entity_count']} {result['unit']} in {result['wall_seconds']}s "
+              f"({result['entities_per_second']} {result['unit']}/s, {result['api_calls']} calls)")
+
+    run = {
+        "size": str(size),
+        "entity_count": catalog["entity_count"],
+        "glossary_term_count": len(set(catalog["glossary_dict_with_fields_as_keys"].values())),
+        "seed": seed,
+        "recorded_on": datetime.now().strftime("%m/%d/%Y %H:%M"),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "regressions": []
+    }
+
+    return record_or_compare_baseline(run, baseline_filename, BENCHMARK_BASELINE_DIRECTORY / f"throughput_{str(size).lower()}.json",
+                                      "entities_per_second", higher_is_better=True, update_baseline=update_baseline)
+
+
+def main():
+    # python -m modules.benchmark.throughput_benchmark [10k|100k|1m|<entities>] [update_baseline]
+    size = sys.argv[1] if len(sys.argv) > 1 else "10k"
+    run = run_throughput_benchmarks(size, update_baseline="update_baseline" in sys.argv[2:])
+    sys.exit(1 if run["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ import logging
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 
+from modules.typedef_registry import get_typedef_names, sync_typedefs
+from modules.api_metrics import get_api_metrics_summary
+
 try:
     from pyapacheatlas.core.util import AtlasException
 except ImportError:
@@ -264,6 +267,10 @@ class QubePurviewIngester:
         return {
             'status': 'completed',
             'statistics': self.ingestion_stats,
+            'api_usage': [
+                {k: row[k] for k in ('operation', 'caller', 'calls', 'errors', 'retries', 'seconds', 'percent_of_time')}
+                for row in get_api_metrics_summary()
+            ],
             'message': 'QUBE data dictionary ingestion completed successfully'
         }
 
@@ -568,18 +575,18 @@ class TypeDefinitionManager:
         results = {}
         
         try:
-            # Always try to create types - let the _create_type method handle conflicts
+            # Only the types that are missing or changed are uploaded, both in one request
             table_type_def = self.create_table_specification_type()
-            table_result = self._create_type(table_type_def)
-            results["qube_table_specification"] = table_result
-            if table_result:
-                logger.info("Successfully handled qube_table_specification entity type")
-            
             field_type_def = self.create_field_specification_type()
-            field_result = self._create_type(field_type_def)
-            results["qube_field_specification"] = field_result
-            if field_result:
-                logger.info("Successfully handled qube_field_specification entity type")
+            sync_result = sync_typedefs(self.client, entity_defs=[table_type_def, field_type_def])
+            uploaded_types = sync_result["missing"].get("entityDefs", []) + sync_result["changed"].get("entityDefs", [])
+            
+            for type_def in (table_type_def, field_type_def):
+                results[type_def["name"]] = True
+                if type_def["name"] in uploaded_types:
+                    logger.info(f"Successfully uploaded {type_def['name']} entity type")
+                else:
+                    logger.info(f"{type_def['name']} entity type is up to date, skipping upload")
                 
         except Exception as e:
             logger.error(f"Error registering entity types: {str(e)}")
@@ -595,75 +602,13 @@ class TypeDefinitionManager:
             List of existing entity type names
         """
         try:
-            # Use the client to get existing types
-            # This will depend on the specific pyapacheatlas client implementation
-            existing_types = []
-            
-            # Try to get type definitions - this may vary based on client version
-            if hasattr(self.client, 'get_typedef'):
-                type_defs = self.client.get_typedef()
-                if type_defs and 'entityDefs' in type_defs:
-                    existing_types = [t.get('name', '') for t in type_defs['entityDefs']]
-            elif hasattr(self.client, 'atlas'):
-                # Alternative approach for different client versions
-                type_defs = self.client.atlas.get_typedef()
-                if type_defs and 'entityDefs' in type_defs:
-                    existing_types = [t.get('name', '') for t in type_defs['entityDefs']]
-                    
+            # The typedefs are fetched once and cached in the typedef registry
+            existing_types = list(get_typedef_names(self.client, "entityDefs"))
             return existing_types
             
         except Exception as e:
             logger.warning(f"Could not retrieve existing types: {str(e)}")
             return []
-            
-    def _create_type(self, type_definition: dict) -> bool:
-        """
-        Create a single entity type in Purview.
-        
-        Args:
-            type_definition: Entity type definition dictionary
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            # Create the type definition using the client
-            # pyapacheatlas expects a dictionary with entityDefs key, not a list
-            typedef_payload = {
-                "entityDefs": [type_definition],
-                "enumDefs": [],
-                "relationshipDefs": [],
-                "structDefs": []
-            }
-            
-            if hasattr(self.client, 'upload_typedefs'):
-                result = self.client.upload_typedefs(typedef_payload)
-                return True
-            elif hasattr(self.client, 'atlas'):
-                result = self.client.atlas.upload_typedefs(typedef_payload)
-                return True
-            else:
-                logger.error("Client does not have expected type definition upload methods")
-                return False
-                
-        except AtlasException as e:
-            error_msg = str(e)
-            # Check if the error is due to type already existing
-            if "already exists" in error_msg or "ATLAS-409-00-001" in error_msg:
-                logger.info(f"Type {type_definition.get('name', 'unknown')} already exists, skipping creation")
-                return True
-            else:
-                logger.error(f"AtlasException creating type {type_definition.get('name', 'unknown')}: {error_msg}")
-                return False
-        except Exception as e:
-            error_msg = str(e)
-            # Check if the error is due to type already existing
-            if "already exists" in error_msg or "409" in error_msg or "ATLAS-409" in error_msg:
-                logger.info(f"Type {type_definition.get('name', 'unknown')} already exists, skipping creation")
-                return True
-            else:
-                logger.error(f"Error creating type {type_definition.get('name', 'unknown')}: {error_msg}")
-                return False
 
 
 class CSVProcessor:
@@ -1160,7 +1105,9 @@ class EntityFactory:
             else:
                 return {'success': False, 'error': 'Client does not have expected entity upload methods'}
                 
-        except Exception as e:
+        except (Exception, AtlasException) as e:
+            # AtlasException derives from BaseException, so a batch still rejected after the
+            # governor's retries would otherwise stop the whole ingestion
             return {'success': False, 'error': str(e)}
             
     def get_created_entities(self) -> List[Dict[str, Any]]:
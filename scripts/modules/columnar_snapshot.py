@@ -0,0 +1,253 @@
+##! /usr/bin/env python3
+
+
+# Function Imports
+# ---------------
+from modules.entity_snapshot import *
+
+
+# Package Imports
+# ---------------
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# Constants
+# ---------------
+
+COLUMNAR_SNAPSHOT_ENTITIES_FILENAME = "entities.arrow"
+COLUMNAR_SNAPSHOT_COLUMNS_FILENAME = "columns.arrow"
+
+# Rows buffered before a record batch is written
+COLUMNAR_SNAPSHOT_BATCH_SIZE = 10000
+
+# Relationships that hold the columns of an entity. "columns" is read from the entry itself,
+# since resource sets keep theirs on the tabular schema.
+COLUMN_RELATIONSHIP_KINDS = ["columns", "view_columns", "primary_key_fields", "fields"]
+
+COLUMNAR_SNAPSHOT_ENTITIES_SCHEMA = pa.schema([
+    ("entity_type", pa.string()),
+    ("guid", pa.string()),
+    ("name", pa.string()),
+    ("qualified_name", pa.string())
+])
+
+COLUMNAR_SNAPSHOT_COLUMNS_SCHEMA = pa.schema([
+    ("entity_type", pa.string()),
+    ("entity_guid", pa.string()),
+    ("column_guid", pa.string()),
+    ("column_name", pa.string()),
+    ("relationship", pa.string())
+])
+
+
+# Functions
+# ---------------
+
+def get_columnar_snapshot_filename(purview_account_short_name: str, table_name: str):
+    """
+    Returns the path of a table of the columnar snapshot, ie. "prod_pulled_entities/columns.arrow".
+
+    Parameters:
+        purview_account_short_name (str): The short name of the Purview account.
+        table_name (str): "entities" or "columns".
+
+    Returns:
+        str: The path of the Arrow IPC file.
+    """
+    filename = COLUMNAR_SNAPSHOT_ENTITIES_FILENAME if table_name == "entities" else COLUMNAR_SNAPSHOT_COLUMNS_FILENAME
+    return os.path.join(get_snapshot_directory(purview_account_short_name, "pulled_entities"), filename)
+
+
+def get_columns_of_entry(entry: dict, relationship: str):
+    """
+    Returns the columns of an "all_entity_details" entry for one relationship kind.
+
+    Parameters:
+        entry (dict): The entry ({"guid", "entity", "columns"}).
+        relationship (str): One of COLUMN_RELATIONSHIP_KINDS.
+
+    Returns:
+        list: The related columns, or an empty list.
+    """
+    if relationship == "columns":
+        return entry.get("columns") or []
+    return (entry.get("entity").get("relationshipAttributes") or {}).get(relationship) or []
+
+
+class ColumnarTableWriter:
+    """
+    Buffers rows of one table and writes them to an Arrow IPC file in record batches.
+    """
+    def __init__(self, filename: str, schema: pa.Schema, batch_size: int = COLUMNAR_SNAPSHOT_BATCH_SIZE):
+        """
+        Opens the Arrow IPC file for writing.
+
+        Args:
+            filename (str): The path of the file.
+            schema (pyarrow.Schema): The schema of the table.
+            batch_size (int, optional): The number of rows per record batch.
+        """
+        self.schema = schema
+        self.batch_size = batch_size
+        self.rows = {field.name: [] for field in schema}
+        self.row_count = 0
+        self.sink = pa.OSFile(filename, "wb")
+        self.writer = pa.ipc.new_file(self.sink, schema)
+
+    def append(self, *values):
+        """
+        Adds one row, given in schema order, and writes a record batch once the buffer is full.
+        """
+        for field, value in zip(self.schema, values):
+            self.rows[field.name].append(value)
+        self.row_count += 1
+        if len(self.rows[self.schema[0].name]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows as a record batch.
+        """
+        if len(self.rows[self.schema[0].name]) > 0:
+            self.writer.write_batch(pa.record_batch(self.rows, schema=self.schema))
+            self.rows = {field.name: [] for field in self.schema}
+
+    def close(self):
+        """
+        Writes the remaining rows and closes the file.
+        """
+        self.flush()
+        self.writer.close()
+        self.sink.close()
+
+
+def write_columnar_snapshot(purview_account_short_name: str):
+    """
+    Writes the columnar snapshot of the most recent entity pull of a Purview account.
+
+    The snapshot has an "entities" table (entity_type, guid, name, qualified_name) and a flattened
+    "columns" table (entity_type, entity_guid, column_guid, column_name, relationship), each an
+    Arrow IPC file in "<account>_pulled_entities/". Rows are written in pull order, so the columns
+    of an entity are contiguous and follow the same order as the entities.
+
+    Parameters:
+        purview_account_short_name (str): The short name of the Purview account.
+
+    Returns:
+        dict: The number of rows written to each table.
+    """
+    os.makedirs(get_snapshot_directory(purview_account_short_name, "pulled_entities"), exist_ok=True)
+    entities_filename = get_columnar_snapshot_filename(purview_account_short_name, "entities")
+    columns_filename = get_columnar_snapshot_filename(purview_account_short_name, "columns")
+    entities_writer = ColumnarTableWriter(entities_filename + ".tmp", COLUMNAR_SNAPSHOT_ENTITIES_SCHEMA)
+    columns_writer = ColumnarTableWriter(columns_filename + ".tmp", COLUMNAR_SNAPSHOT_COLUMNS_SCHEMA)
+
+    for entity_type, all_entity_details in iterate_pulled_entity_types(purview_account_short_name):
+        for entry in all_entity_details:
+            attributes = entry.get("entity").get("attributes") or {}
+            entities_writer.append(entity_type, entry.get("guid"), attributes.get("name"), attributes.get("qualifiedName"))
+            for relationship in COLUMN_RELATIONSHIP_KINDS:
+                for column in get_columns_of_entry(entry, relationship):
+                    columns_writer.append(entity_type, entry.get("guid"), column.get("guid"), column.get("displayText"), relationship)
+
+    entities_writer.close()
+    columns_writer.close()
+    # The entities table is swapped in last, since its modification time marks the snapshot as up to date
+    os.replace(columns_filename + ".tmp", columns_filename)
+    os.replace(entities_filename + ".tmp", entities_filename)
+    print(f"Columnar snapshot written: {entities_writer.row_count} entities, {columns_writer.row_count} columns")
+
+    return {"entities": entities_writer.row_count, "columns": columns_writer.row_count}
+
+
+def is_columnar_snapshot_newest(purview_account_short_name: str):
+    """
+    Checks whether the columnar snapshot exists and is not older than the entity pull it was built from.
+
+    Parameters:
+        purview_account_short_name (str): The short name of the Purview account.
+
+    Returns:
+        bool: True if the columnar snapshot can be read instead of the pulled entities.
+    """
+    entities_filename = get_columnar_snapshot_filename(purview_account_short_name, "entities")
+    if not os.path.exists(entities_filename) or not os.path.exists(get_columnar_snapshot_filename(purview_account_short_name, "columns")):
+        return False
+    snapshot_directory = get_snapshot_directory(purview_account_short_name, "pulled_entities")
+    for pulled_filename in (snapshot_directory + ".json", os.path.join(snapshot_directory, SNAPSHOT_MANIFEST_FILENAME)):
+        if os.path.exists(pulled_filename) and os.path.getmtime(pulled_filename) > os.path.getmtime(entities_filename):
+            return False
+    return True
+
+
+def read_columnar_snapshot_table(purview_account_short_name: str, table_name: str, columns: list = None, entity_type: str = None):
+    """
+    Memory-maps a table of the columnar snapshot, reading only the requested fields.
+
+    Parameters:
+        purview_account_short_name (str): The short name of the Purview account.
+        table_name (str): "entities" or "columns".
+        columns (list, optional): The fields to read. All fields when not given.
+        entity_type (str, optional): Only keep the rows of this entity type.
+
+    Returns:
+        pyarrow.Table: The table.
+    """
+    source = pa.memory_map(get_columnar_snapshot_filename(purview_account_short_name, table_name), "r")
+    table = pa.ipc.open_file(source).read_all()
+    # Selecting is free on the memory map, filtering copies, so only the requested fields are filtered
+    if columns is not None:
+        table = table.select(list(columns) + (["entity_type"] if entity_type is not None and "entity_type" not in columns else []))
+    if entity_type is not None:
+        table = table.filter(pc.equal(table["entity_type"], entity_type))
+        if columns is not None:
+            table = table.select(columns)
+    return table
+
+
+def iterate_projected_entity_details(purview_account_short_name: str, entity_type: str):
+    """
+    Yields the entities of one type with only their guid, name and columns.
+
+    Each entry has the same shape as an "all_entity_details" entry, with "entity" cut down to its
+    "attributes" name and qualifiedName and the column relationships, so it can be passed to
+    anything that walks pulled entities by their columns. The columnar snapshot is read when it is
+    up to date, otherwise the pulled entities are read with iterate_pulled_entity_details.
+
+    Parameters:
+        purview_account_short_name (str): The short name of the Purview account.
+        entity_type (str): The name of the entity type, ie. "sap_s4hana_table".
+
+    Yields:
+        dict: {"guid", "entity": {"guid", "attributes", "relationshipAttributes"}, "columns"} of each entity.
+    """
+    if not is_columnar_snapshot_newest(purview_account_short_name):
+        yield from iterate_pulled_entity_details(purview_account_short_name, entity_type)
+        return
+
+    entities = read_columnar_snapshot_table(purview_account_short_name, "entities", ["guid", "name", "qualified_name"], entity_type)
+    columns = read_columnar_snapshot_table(purview_account_short_name, "columns", ["entity_guid", "column_guid", "column_name", "relationship"], entity_type)
+
+    def iterate_rows(table):
+        for batch in table.to_batches():
+            yield from batch.to_pylist()
+
+    column_rows = iterate_rows(columns)
+    column_row = next(column_rows, None)
+    for entity_row in iterate_rows(entities):
+        related_columns = {relationship: [] for relationship in COLUMN_RELATIONSHIP_KINDS}
+        while column_row is not None and column_row["entity_guid"] == entity_row["guid"]:
+            related_columns[column_row["relationship"]].append({"guid": column_row["column_guid"], "displayText": column_row["column_name"]})
+            column_row = next(column_rows, None)
+
+        yield {
+            "guid": entity_row["guid"],
+            "entity": {
+                "guid": entity_row["guid"],
+                "attributes": {"name": entity_row["name"], "qualifiedName": entity_row["qualified_name"]},
+                "relationshipAttributes": {relationship: related_columns[relationship] for relationship in COLUMN_RELATIONSHIP_KINDS if relationship != "columns"}
+            },
+            "columns": related_columns["columns"]
+        }
@@ -25,6 +25,14 @@ def build_lineage(client, json_file_path):
     connections = lineage_data["Connections"]
     print("connections:", connections)
 
+    # Resolve every source and target of the file up front in bulk
+    qualified_names = []
+    for details in connections.values():
+        if details["source_type"] == "microsoft_sql_services_analysis_services" or details["target_type"] == "microsoft_sql_services_analysis_services":
+            continue
+        qualified_names.extend([details["source"].replace('.', '/'), details["target"].replace('.', '/')])
+    resolved_entities = resolve_qualified_names(client, qualified_names)
+
     for connection_name, details in connections.items():
         source = details["source"].replace('.', '/')
         source_type = details["source_type"]
@@ -37,8 +45,8 @@ def build_lineage(client, json_file_path):
             continue
 
         # Fetch entities
-        source_entity = get_entity_from_qualified_name(client, source)
-        target_entity = get_entity_from_qualified_name(client, target)
+        source_entity = resolved_entities.get(source)
+        target_entity = resolved_entities.get(target)
         print("source:", source_entity, "\ntarget:", target_entity)
 
         # Ensure entities are found
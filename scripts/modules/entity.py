@@ -4,14 +4,28 @@
 # Function Imports
 # ---------------
 from utils import get_credentials, create_purview_client
-from modules.glossary_propagation.shared_glossary_functions import *
+from modules.entity_snapshot import *
+from modules.typedef_registry import *
+from modules.job_deadline import DeadlineExceededError, JobThreadPoolExecutor
 
 
 # Package Imports
 # ---------------
 from pyapacheatlas.core.typedef import EntityTypeDef, AtlasAttributeDef
 from pyapacheatlas.core import AtlasEntity, AtlasProcess, PurviewClient
+from pyapacheatlas.core.util import AtlasException
 from pathlib import Path
+import contextlib
+import json
+import os
+import re
+import string
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from concurrent.futures import as_completed
+from urllib.parse import quote
 
 
 # Constants
@@ -147,6 +161,136 @@ Column_Connection_Def = EntityTypeDef(
     ]
 )
 
+# Every custom entity type above, kept in sync with sync_custom_type_defs
+CUSTOM_ENTITY_TYPE_DEFS = [
+    INGESTION_FRAMEWORK_DEF,
+    DATA_WAREHOUSE_LOAD_ROUTINE_DEF,
+    DATA_WAREHOUSE_VIEW_CREATION_DEF,
+    DSP_CONNECTION_DEF,
+    SHAREPOINT_ENTITY_DEF,
+    SHAREPOINT_TO_PBI_DEF,
+    DATABRICKS_TO_PBI_DEF,
+    SQL_SERVER_TO_PBI_DEF,
+    ORACLE_SERVER_TO_PBI_DEF,
+    CUBE_TO_PBI_DEF,
+    DATA_LAKE_STAGE_TO_CURATED_DEF,
+    DATA_LAKE_CURATED_TO_DATA_WAREHOUSE_STAGE_DEF,
+    ORACLE_TO_DATA_LAKE_STAGE_DEF,
+    DATA_LAKE_MANUAL_FILE_TO_DATA_LAKE_STAGE_DEF,
+    SQL_VIEW_TO_DATA_LAKE_STAGE_DEF,
+    SQL_TABLE_TO_DATA_LAKE_STAGE_DEF,
+    DATA_LAKE_CURATED_TO_DATA_LAKE_CURATED_DEF,
+    SQL_DATABASE_EXTRACT_TYPEDEF,
+    PKMS_RECORD_DEF,
+    PKMS_COLUMN_DEF,
+    DW_TO_PBI_DATASET_DEF,
+    TABULAR_MODEL_TO_PBI_DATASET_DEF,
+    INFORMATICA_CONNECTION_DEF,
+    Column_Connection_Def
+]
+
+# Entity types that the qualified name index is built from by default
+QUALIFIED_NAME_INDEX_ENTITY_TYPES = [
+    "azure_sql_dw_table",
+    "azure_sql_dw_view",
+    "powerbi_dataset",
+    "sap_hana_view",
+    "sap_hana_table",
+    "sap_s4hana_view",
+    "sap_s4hana_table",
+    "oracle_table",
+    "oracle_view",
+    "oracle_synonym",
+    "mssql_table",
+    "mssql_view",
+    "azure_datalake_gen2_resource_set"
+]
+
+# Candidate entity types to resolve a qualified name against, by qualified name scheme
+QUALIFIED_NAME_SCHEME_ENTITY_TYPES = {
+    "oracle://": ["oracle_table", "oracle_view", "oracle_synonym"],
+    "mssql://": ["azure_sql_dw_table", "azure_sql_dw_view", "mssql_table", "mssql_view"],
+    "sap_hana://": ["sap_hana_view", "sap_hana_table"],
+    "sap_s4hana://": ["sap_s4hana_table", "sap_s4hana_view"],
+    "https://app.powerbi.com": ["powerbi_dataset"],
+    "https://": ["azure_datalake_gen2_resource_set", "azure_datalake_gen2_path"]
+}
+
+# The bulk uniqueAttribute endpoint takes the qualified names as query parameters,
+# so each request is kept under this URL length
+RESOLVE_MANY_MAX_URL_LENGTH = 6000
+RESOLVE_MANY_MAX_NAMES_PER_REQUEST = 100
+RESOLVE_MANY_MAX_WORKERS = 8
+
+# The error Atlas answers a uniqueAttribute request with when no entity has the qualified names
+UNIQUE_ATTRIBUTE_NOT_FOUND_ERROR = "ATLAS-404-00-009"
+
+# The error code of a GUID that does not exist, which fails a whole /entity/bulk request
+ENTITY_GUID_NOT_FOUND_ERROR = "ATLAS-404-00-005"
+
+# How long a browsed entity type stays cached for get_entity_from_qualified_name_using_type.
+# None keeps it for the rest of the run.
+TYPE_SCOPED_CACHE_TTL_SECONDS = None
+
+# Page size and number of pages fetched in parallel when enumerating browse/search results
+BROWSE_PAGE_SIZE = 100
+BROWSE_MAX_WORKERS = 8
+
+# Purview refuses offsets past this point, so larger result sets are split by qualifiedName prefix
+BROWSE_OFFSET_CEILING = 100000
+QUALIFIED_NAME_PREFIX_ALPHABET = string.ascii_letters + string.digits + "/:._-$#@ "
+
+# GUIDs per /entity/bulk request and the number of those requests run in parallel
+ENTITY_BULK_CHUNK_SIZE = 100
+ENTITY_BULK_MAX_WORKERS = 4
+
+# GUIDs per bulk delete request and the number of those requests run in parallel
+BULK_DELETE_BATCH_SIZE = 50
+BULK_DELETE_MAX_WORKERS = 4
+
+# Requests in flight at once across every entity type of a concurrent pull
+PULL_MAX_CONCURRENT_REQUESTS = 12
+
+# Data source -> entity types pulled into <account>_pulled_entities.json
+PULLED_ENTITY_TYPES = {
+    "powerbi": ["powerbi_dataset"],
+    "azure_sql_dw": ["azure_sql_dw_table"],
+    "sap_hana": ["sap_hana_view", "sap_hana_table"],
+    "sap_s4hana": ["sap_s4hana_view", "sap_s4hana_table"],
+    "azure_datalake_gen2": ["azure_datalake_gen2_resource_set"]
+}
+
+# A GUID in the message of an Atlas error, ie. the entity a 404 did not find
+GUID_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+
+# Process types pulled into <account>_pulled_lineage_connections.json
+PULLED_LINEAGE_CONNECTION_TYPES = [
+    "dsp_connection",
+    "dw_routine",
+    "dw_view_creation",
+    "ingestion_framework",
+    "sql_database_source",
+    "sharepoint_to_pbi"
+]
+
+
+# Global
+# ---------------
+
+# Normalized qualified name -> {"guid", "typeName", "name", "qualifiedName"}
+qualified_name_index = {}
+qualified_name_index_lock = threading.Lock()
+
+# Entity type -> {"loaded_on": time.time(), "entities": {qualifiedName: browse header}}
+type_scoped_entity_cache = {}
+type_scoped_entity_cache_lock = threading.Lock()
+
+# Entity type -> the lock held while the type is browsed, so only one thread browses it
+type_scoped_entity_cache_load_locks = {}
+
+# Entity type -> {qualifiedName: header} added while the type is being browsed, merged into the browse result
+type_scoped_entity_cache_added_during_load = {}
+
 # Functions
 # ---------------
 
@@ -166,12 +310,242 @@ def create_entity(client, name: str, type_name: str, qualified_name: str):
     """
     atlas_entity = AtlasEntity(name = name, typeName = type_name, qualified_name = qualified_name)
     result = client.upload_entities(atlas_entity)
+    update_qualified_name_index_from_upload([atlas_entity], result)
     return result
 
 
+def normalize_qualified_name(qualified_name: str):
+    """
+    Normalizes a qualified name so that lookups are case insensitive and ignore a trailing '/'.
+
+    Args:
+        qualified_name (str): The qualified name to normalize.
+
+    Returns:
+        str: The normalized qualified name.
+    """
+    return str(qualified_name).strip().rstrip("/").lower()
+
+
+def add_to_qualified_name_index(qualified_name: str, guid: str, type_name: str, name: str):
+    """
+    Adds or replaces a single entry in the qualified name index.
+
+    Args:
+        qualified_name (str): The qualified name of the entity.
+        guid (str): The GUID of the entity.
+        type_name (str): The type name of the entity.
+        name (str): The name of the entity.
+    """
+    if not qualified_name or not guid:
+        return
+    with qualified_name_index_lock:
+        qualified_name_index[normalize_qualified_name(qualified_name)] = {
+            "guid": guid,
+            "typeName": type_name,
+            "name": name,
+            "qualifiedName": qualified_name
+        }
+
+
+def lookup_qualified_name_index(qualified_name: str):
+    """
+    Looks up an entity in the qualified name index.
+
+    The result has the same keys as a search result ("id", "name", "qualifiedName", "entityType")
+    so it can be passed straight to the lineage functions.
+
+    Args:
+        qualified_name (str): The qualified name of the entity.
+
+    Returns:
+        dict or None: The entity header if it is indexed, otherwise None.
+    """
+    with qualified_name_index_lock:
+        entry = qualified_name_index.get(normalize_qualified_name(qualified_name))
+    if entry is None:
+        return None
+    return {
+        "id": entry["guid"],
+        "name": entry["name"],
+        "qualifiedName": entry["qualifiedName"],
+        "entityType": entry["typeName"]
+    }
+
+
+def remove_guids_from_qualified_name_index(guids):
+    """
+    Removes the entries of deleted entities from the qualified name index.
+
+    Args:
+        guids (iterable): The GUIDs of the deleted entities.
+    """
+    guids = set(guids)
+    with qualified_name_index_lock:
+        for key in [k for k, entry in qualified_name_index.items() if entry["guid"] in guids]:
+            del qualified_name_index[key]
+
+
+def get_qualified_name_index_filename(purview_account_short_name: str):
+    """
+    Returns the file name the qualified name index of a Purview account is persisted to.
+
+    Args:
+        purview_account_short_name (str): The short name of the Purview account (ie. "prod" or "qa").
+
+    Returns:
+        str: The file name of the index.
+    """
+    return purview_account_short_name + "_qualified_name_index.json"
+
+
+def save_qualified_name_index(purview_account_short_name: str):
+    """
+    Writes the qualified name index to "<account>_qualified_name_index.json".
+
+    Args:
+        purview_account_short_name (str): The short name of the Purview account (ie. "prod" or "qa").
+    """
+    output_filename = get_qualified_name_index_filename(purview_account_short_name)
+    with qualified_name_index_lock:
+        index_copy = dict(qualified_name_index)
+    with open(output_filename, "w", encoding="utf-8") as json_file:
+        json.dump(index_copy, json_file)
+    print(f'Qualified name index with {len(index_copy)} entries written to "{output_filename}"')
+
+
+def load_qualified_name_index(purview_account_short_name: str):
+    """
+    Loads a previously saved qualified name index into memory.
+
+    Args:
+        purview_account_short_name (str): The short name of the Purview account (ie. "prod" or "qa").
+
+    Returns:
+        int: The number of entries in the index after loading, 0 if there was no saved index.
+    """
+    input_filename = get_qualified_name_index_filename(purview_account_short_name)
+    if not os.path.exists(input_filename):
+        return 0
+    with open(input_filename, "r", encoding="utf-8") as json_file:
+        saved_index = json.load(json_file)
+    with qualified_name_index_lock:
+        qualified_name_index.update(saved_index)
+        return len(qualified_name_index)
+
+
+def clear_qualified_name_index():
+    """
+    Removes every entry from the in-memory qualified name index.
+    """
+    with qualified_name_index_lock:
+        qualified_name_index.clear()
+
+
+def build_qualified_name_index(client, purview_account_short_name: str, entity_types: list = None):
+    """
+    Fills the qualified name index with one paged browse pull per entity type and saves it to disk.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        purview_account_short_name (str): The short name of the Purview account (ie. "prod" or "qa").
+        entity_types (list, optional): The entity types to index. Defaults to QUALIFIED_NAME_INDEX_ENTITY_TYPES.
+
+    Returns:
+        int: The number of entries in the index.
+    """
+    if entity_types is None:
+        entity_types = QUALIFIED_NAME_INDEX_ENTITY_TYPES
+
+    for entity_type in entity_types:
+        count = 0
+        for value_dict in browse_entities_with_type(client, entity_type):
+            add_to_qualified_name_index(value_dict.get("qualifiedName"), value_dict.get("id"), value_dict.get("entityType", entity_type), value_dict.get("name"))
+            count += 1
+        print("Indexed " + str(count) + " " + entity_type + " assets")
+
+    save_qualified_name_index(purview_account_short_name)
+    return len(qualified_name_index)
+
+
+@contextlib.contextmanager
+def persistent_qualified_name_index(client, purview_account_short_name: str, build_if_missing: bool = True):
+    """
+    Loads the saved qualified name index of an account for the block, so lookups start from it instead of
+    searching for every qualified name, and saves it afterwards with the entries resolved or uploaded in the
+    block. When no index was saved yet, it is built first with build_qualified_name_index.
+
+        with persistent_qualified_name_index(prod_client, "prod"):
+            build_mass_lineage_for_folders(prod_client, connection_names_excel, directories)
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        purview_account_short_name (str): The short name of the Purview account (ie. "prod" or "qa").
+        build_if_missing (bool, optional): Build the index when there is no saved one.
+    """
+    if load_qualified_name_index(purview_account_short_name) == 0 and build_if_missing:
+        build_qualified_name_index(client, purview_account_short_name)
+    try:
+        yield
+    finally:
+        save_qualified_name_index(purview_account_short_name)
+
+
+def remove_missing_guids_from_qualified_name_index(error):
+    """
+    Removes the GUIDs named by an Atlas 404 from the qualified name index, ie. entities deleted since they
+    were indexed, so their qualified names are resolved again on the next lookup.
+
+    Args:
+        error (BaseException or str): The error of the request.
+
+    Returns:
+        list: The GUIDs named by the error.
+    """
+    guids = GUID_PATTERN.findall(str(error))
+    if len(guids) > 0:
+        remove_guids_from_qualified_name_index(guids)
+    return guids
+
+
+def update_qualified_name_index_from_upload(entities: list, upload_result: dict):
+    """
+    Adds uploaded entities to the qualified name index, using the guidAssignments of the upload
+    result to swap placeholder (negative) GUIDs for the GUIDs Purview assigned.
+
+    Args:
+        entities (list): The AtlasEntity objects or entity dicts that were uploaded.
+        upload_result (dict): The result of client.upload_entities.
+    """
+    if not isinstance(upload_result, dict):
+        return
+    guid_assignments = upload_result.get("guidAssignments") or {}
+
+    for entity in entities:
+        entity_dict = entity.to_json() if hasattr(entity, "to_json") else entity
+        if not isinstance(entity_dict, dict):
+            continue
+        attributes = entity_dict.get("attributes") or {}
+        placeholder_guid = str(entity_dict.get("guid"))
+        if placeholder_guid in guid_assignments:
+            guid = guid_assignments[placeholder_guid]
+        elif entity_dict.get("guid") is not None and not placeholder_guid.startswith("-"):
+            guid = placeholder_guid
+        else:
+            continue
+        add_to_qualified_name_index(attributes.get("qualifiedName"), guid, entity_dict.get("typeName"), attributes.get("name"))
+        add_to_type_scoped_entity_cache(entity_dict.get("typeName"), {
+            "id": guid,
+            "name": attributes.get("name"),
+            "qualifiedName": attributes.get("qualifiedName"),
+            "entityType": entity_dict.get("typeName")
+        })
+
+
 def get_entity_from_qualified_name(client, qualified_name):
     """
     Retrieves an entity from the catalog based on the provided qualified name.
+    The qualified name index is checked first and search is only used on a miss.
 
     Args:
         qualified_name (str): The qualified name of the entity.
@@ -179,20 +553,297 @@ def get_entity_from_qualified_name(client, qualified_name):
     Returns:
         dict: The entity found based on the qualified name.
     """
+    indexed_entity = lookup_qualified_name_index(qualified_name)
+    if indexed_entity is not None:
+        return indexed_entity
+
     entities_found = client.discovery.search_entities(query=qualified_name)
     for entity in entities_found:
         # Since the input qualified_name is all lowercase, we cannot do a direct str comparison, we must check length
         # This is to avoid qualified names that have the same beginning and different extensions
         # Allow length to differ by 1 for potential '/' at the end
         if ((len(entity["qualifiedName"]) == len(qualified_name)) or (len(entity["qualifiedName"]) == len(qualified_name) + 1)) and qualified_name in entity["qualifiedName"]:
+            add_to_qualified_name_index(entity["qualifiedName"], entity["id"], entity["entityType"], entity["name"])
             return entity
 
     return None
 
 
+def get_candidate_entity_types(qualified_name: str):
+    """
+    Returns the entity types a qualified name can belong to, based on its scheme (ie. "oracle://").
+
+    Args:
+        qualified_name (str): The qualified name of the entity.
+
+    Returns:
+        list: The candidate entity type names, or an empty list if the scheme is not known.
+    """
+    lowercase_qualified_name = str(qualified_name).lower()
+    for scheme, entity_types in QUALIFIED_NAME_SCHEME_ENTITY_TYPES.items():
+        if lowercase_qualified_name.startswith(scheme):
+            return entity_types
+    return []
+
+
+def chunk_qualified_names_for_bulk_request(type_name: str, qualified_names: list, max_url_length: int = RESOLVE_MANY_MAX_URL_LENGTH,
+                                           max_names_per_request: int = RESOLVE_MANY_MAX_NAMES_PER_REQUEST):
+    """
+    Splits qualified names into chunks whose bulk uniqueAttribute request URL stays under max_url_length.
+
+    Args:
+        type_name (str): The entity type the qualified names are resolved against.
+        qualified_names (list): The qualified names to split.
+        max_url_length (int, optional): The maximum length of a request URL.
+        max_names_per_request (int, optional): The maximum number of qualified names in one request.
+
+    Returns:
+        list: A list of lists of qualified names.
+    """
+    # Account endpoint plus "/datamap/api/atlas/v2/entity/bulk/uniqueAttribute/type/<type>?minExtInfo=True&ignoreRelationships=True"
+    base_length = 200 + len(quote(type_name, safe=""))
+    chunks = []
+    current_chunk = []
+    current_length = base_length
+    for qualified_name in qualified_names:
+        parameter_length = len("&attr_" + str(len(current_chunk)) + ":qualifiedName=") + len(quote(qualified_name, safe=""))
+        if current_chunk and (current_length + parameter_length > max_url_length or len(current_chunk) >= max_names_per_request):
+            chunks.append(current_chunk)
+            current_chunk = []
+            current_length = base_length
+        current_chunk.append(qualified_name)
+        current_length += parameter_length
+
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+
+def get_entities_by_unique_attributes(client, type_name: str, qualified_names: list):
+    """
+    Resolves one chunk of qualified names of a single entity type with the bulk uniqueAttribute endpoint.
+
+    Args:
+        client (PurviewClient): The Purview client.
+        type_name (str): The entity type of the qualified names.
+        qualified_names (list): The qualified names to resolve.
+
+    Returns:
+        list: The entity headers found ("id", "name", "qualifiedName", "entityType").
+    """
+    try:
+        pulled = client.get_entity(qualifiedName=qualified_names, typeName=type_name, ignoreRelationships=True, minExtInfo=True)
+    except AtlasException as e:
+        # Atlas answers with a 404 when none of the qualified names exist for the type. Anything else, ie. a
+        # throttle that outlasted the retries, is raised so a lineage edge is not dropped as "not found".
+        if UNIQUE_ATTRIBUTE_NOT_FOUND_ERROR not in str(e):
+            raise
+        print(f"No {type_name} entities resolved for {len(qualified_names)} qualified names")
+        return []
+
+    headers = []
+    for entity in pulled.get("entities", []):
+        attributes = entity.get("attributes") or {}
+        headers.append({
+            "id": entity.get("guid"),
+            "name": attributes.get("name"),
+            "qualifiedName": attributes.get("qualifiedName"),
+            "entityType": entity.get("typeName", type_name)
+        })
+    return headers
+
+
+def resolve_many(client, types_and_qualified_names: list, max_workers: int = RESOLVE_MANY_MAX_WORKERS, search_on_miss: bool = True):
+    """
+    Resolves many (typeName, qualifiedName) pairs with as few requests as possible.
+
+    Names already in the qualified name index are served from it when the indexed entry has the exact
+    qualified name and one of the requested types. The rest are grouped by type, chunked to fit the
+    URL limit, and resolved concurrently with the bulk uniqueAttribute endpoint.
+    A qualified name can be listed with several types; they are tried in the order given and a
+    later type is only requested for the names the earlier types did not resolve.
+
+    Args:
+        client (PurviewClient): The Purview client.
+        types_and_qualified_names (list): A list of (typeName, qualifiedName) tuples. typeName may be None
+            when the type is not known, in which case only the index and search are used.
+        max_workers (int, optional): The number of requests to run concurrently.
+        search_on_miss (bool, optional): Whether to fall back to get_entity_from_qualified_name for names
+            the bulk requests did not resolve (ie. partial or lowercase qualified names).
+
+    Returns:
+        dict: The entity header of every requested qualified name, or None if it was not found.
+    """
+    requested_types = {}
+    for type_name, qualified_name in types_and_qualified_names:
+        requested_types.setdefault(qualified_name, [])
+        if type_name is not None and type_name not in requested_types[qualified_name]:
+            requested_types[qualified_name].append(type_name)
+
+    def is_requested_entity(qualified_name, header, exact_qualified_name=True):
+        # The index is keyed case-insensitively and holds every type, so a hit only counts when it is the
+        # exact qualified name and one of the types requested for it
+        if header is None:
+            return False
+        if exact_qualified_name and header["qualifiedName"] != qualified_name:
+            return False
+        return not requested_types[qualified_name] or header["entityType"] in requested_types[qualified_name]
+
+    resolved = {}
+    types_to_try = {}
+    for qualified_name, type_names in requested_types.items():
+        indexed_entity = lookup_qualified_name_index(qualified_name)
+        resolved[qualified_name] = indexed_entity if is_requested_entity(qualified_name, indexed_entity) else None
+        types_to_try[qualified_name] = list(type_names)
+
+    with JobThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            # Each round requests the next untried type of every name that is still unresolved
+            qualified_names_by_type = {}
+            for qualified_name, remaining_types in types_to_try.items():
+                if resolved[qualified_name] is None and remaining_types:
+                    qualified_names_by_type.setdefault(remaining_types.pop(0), []).append(qualified_name)
+            if not qualified_names_by_type:
+                break
+
+            requests_to_send = []
+            for type_name, qualified_names in qualified_names_by_type.items():
+                for chunk in chunk_qualified_names_for_bulk_request(type_name, qualified_names):
+                    requests_to_send.append((type_name, chunk))
+
+            chunk_results = executor.map(lambda request: get_entities_by_unique_attributes(client, request[0], request[1]), requests_to_send)
+            for headers in chunk_results:
+                for header in headers:
+                    add_to_qualified_name_index(header["qualifiedName"], header["id"], header["entityType"], header["name"])
+                    if resolved.get(header["qualifiedName"], False) is None and is_requested_entity(header["qualifiedName"], header):
+                        resolved[header["qualifiedName"]] = header
+
+    if search_on_miss:
+        for qualified_name, header in resolved.items():
+            if header is None:
+                # Search matches lowercase and partial qualified names, so only the type is checked
+                searched_entity = get_entity_from_qualified_name(client, qualified_name)
+                if is_requested_entity(qualified_name, searched_entity, exact_qualified_name=False):
+                    resolved[qualified_name] = searched_entity
+
+    return resolved
+
+
+def resolve_qualified_names(client, qualified_names: list, max_workers: int = RESOLVE_MANY_MAX_WORKERS, search_on_miss: bool = True):
+    """
+    Resolves many qualified names whose entity types are not known. Each name is tried against the candidate
+    types of its scheme (see get_candidate_entity_types) with resolve_many, and only against the index and
+    search when its scheme is not known.
+
+    Args:
+        client (PurviewClient): The Purview client.
+        qualified_names (list): The qualified names to resolve.
+        max_workers (int, optional): The number of requests to run concurrently.
+        search_on_miss (bool, optional): Whether to fall back to search for names the bulk requests did not resolve.
+
+    Returns:
+        dict: The entity header of every requested qualified name, or None if it was not found.
+    """
+    types_and_qualified_names = []
+    for qualified_name in qualified_names:
+        for entity_type in get_candidate_entity_types(qualified_name) or [None]:
+            types_and_qualified_names.append((entity_type, qualified_name))
+    return resolve_many(client, types_and_qualified_names, max_workers, search_on_miss)
+
+
+def load_type_scoped_entity_cache(client, entity_type: str, ttl_seconds: float = TYPE_SCOPED_CACHE_TTL_SECONDS):
+    """
+    Browses every entity of a type once and caches the headers by qualified name.
+    The browse is only repeated once the cached copy is older than ttl_seconds.
+
+    Threads that need the same type while it is being browsed wait for that browse instead of starting their own,
+    and entities added with add_to_type_scoped_entity_cache during the browse are kept.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_type (str): The name of the entity type.
+        ttl_seconds (float, optional): The age after which the type is browsed again. None never expires.
+
+    Returns:
+        dict: The cached headers of the entity type keyed by qualified name.
+    """
+    def get_fresh_entities():
+        with type_scoped_entity_cache_lock:
+            cached = type_scoped_entity_cache.get(entity_type)
+        if cached is not None and (ttl_seconds is None or time.time() - cached["loaded_on"] < ttl_seconds):
+            return cached["entities"]
+        return None
+
+    entities = get_fresh_entities()
+    if entities is not None:
+        return entities
+
+    with type_scoped_entity_cache_lock:
+        load_lock = type_scoped_entity_cache_load_locks.setdefault(entity_type, threading.Lock())
+    with load_lock:
+        # Another thread may have browsed the type while this one waited
+        entities = get_fresh_entities()
+        if entities is not None:
+            return entities
+
+        with type_scoped_entity_cache_lock:
+            type_scoped_entity_cache_added_during_load[entity_type] = {}
+        try:
+            entities = {}
+            for value_dict in browse_entities_with_type(client, entity_type):
+                entities[value_dict.get("qualifiedName")] = value_dict
+        except BaseException:
+            with type_scoped_entity_cache_lock:
+                type_scoped_entity_cache_added_during_load.pop(entity_type, None)
+            raise
+        print("Cached " + str(len(entities)) + " " + entity_type + " assets for type-scoped lookups")
+
+        with type_scoped_entity_cache_lock:
+            # Entities added during the browse are newer than what it returned
+            entities.update(type_scoped_entity_cache_added_during_load.pop(entity_type))
+            type_scoped_entity_cache[entity_type] = {
+                "loaded_on": time.time(),
+                "entities": entities
+            }
+        return entities
+
+
+def add_to_type_scoped_entity_cache(entity_type: str, entity_header: dict):
+    """
+    Adds an entity created during the run to the type-scoped cache of its type, and to the browse of the type
+    that is running, if any. Types that have not been browsed yet are left alone so that they are still fully
+    loaded on first use.
+
+    Parameters:
+        entity_type (str): The name of the entity type.
+        entity_header (dict): The entity header ("id", "name", "qualifiedName", "entityType").
+    """
+    with type_scoped_entity_cache_lock:
+        cached = type_scoped_entity_cache.get(entity_type)
+        if cached is not None:
+            cached["entities"][entity_header.get("qualifiedName")] = entity_header
+        if entity_type in type_scoped_entity_cache_added_during_load:
+            type_scoped_entity_cache_added_during_load[entity_type][entity_header.get("qualifiedName")] = entity_header
+
+
+def clear_type_scoped_entity_cache(entity_type: str = None):
+    """
+    Drops the type-scoped cache of one entity type, or of every type when entity_type is None.
+
+    Parameters:
+        entity_type (str, optional): The name of the entity type.
+    """
+    with type_scoped_entity_cache_lock:
+        if entity_type is None:
+            type_scoped_entity_cache.clear()
+        else:
+            type_scoped_entity_cache.pop(entity_type, None)
+
+
 def get_entity_from_qualified_name_using_type(client, qualified_name, entity_type):
     """
     Retrieves an entity's details from Purview using its qualified name and entity type.
+    The entity type is browsed once per run (or per TTL) and later lookups are served from memory.
 
     Parameters:
     - client: Purview client for making API requests.
@@ -203,24 +854,8 @@ def get_entity_from_qualified_name_using_type(client, qualified_name, entity_typ
     - dict or None: A dictionary containing the details of the entity if found, 
       or None if the entity is not found.
     """
-    browse_result = client.discovery.browse(entityType=entity_type)
-    # utilize offset to skip the first results, until you reach the count number
-    # result of browse is a dict of @search.count and value
-    
-    # the "value" gives results in increments of 100
-    total_search_count = browse_result.get("@search.count")
-    count = 0
-    list_of_guids = []
-    while count < total_search_count:
-        browse_result = client.discovery.browse(entityType = entity_type, offset = count)
-        entities = browse_result.get("value")
-        count += len(entities)
-        
-        for value_dict in entities:
-            if value_dict.get("qualifiedName") == qualified_name:
-                return value_dict
-
-    return None
+    entities = load_type_scoped_entity_cache(client, entity_type)
+    return entities.get(qualified_name)
 
 
 def get_entity_typename_from_qualified_name(client, qualified_name):
@@ -237,6 +872,10 @@ def get_entity_typename_from_qualified_name(client, qualified_name):
     Raises:
         ValueError: If more than one entity or no entity is found for the given qualified name.
     """
+    indexed_entity = lookup_qualified_name_index(qualified_name)
+    if indexed_entity is not None:
+        return indexed_entity["entityType"]
+
     entities_found = client.discovery.search_entities(query=qualified_name)
     entities = []
     for entity in entities_found:
@@ -248,6 +887,7 @@ def get_entity_typename_from_qualified_name(client, qualified_name):
     elif len(entities) == 0:
         raise ValueError(f"No entity was found with this qualified name: {qualified_name}")
 
+    add_to_qualified_name_index(entities[0]["qualifiedName"], entities[0]["id"], entities[0]["entityType"], entities[0]["name"])
     entity_typename = entities[0]["entityType"]
     return entity_typename
 
@@ -262,8 +902,7 @@ def get_all_typedefs(client):
     Returns:
         list: A list of unique relationship type names.
     """
-    all_typedefs = client.get_all_typedefs()
-    entity_defs = all_typedefs["entityDefs"]
+    entity_defs = get_cached_typedefs(client)["entityDefs"].values()
     all_type_names = []
 
     for entity in entity_defs:
@@ -292,6 +931,21 @@ def upload_custom_type_def(client, type_def: EntityTypeDef):
     return result
 
 
+def sync_custom_type_defs(client, dry_run: bool = False):
+    """
+    Uploads the custom entity types in CUSTOM_ENTITY_TYPE_DEFS that are missing from the catalog or changed,
+    in one request, instead of one upload_custom_type_def per type.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        dry_run (bool, optional): Only report what would be uploaded.
+
+    Returns:
+        dict: The names of the "missing" and "changed" types and the "result" of the upload.
+    """
+    return sync_typedefs(client, entity_defs=CUSTOM_ENTITY_TYPE_DEFS, dry_run=dry_run)
+
+
 def search_by_entity_type(client, entity_type_name):
     """
     Searches and retrieves entities of a specific type in Purview.
@@ -315,14 +969,330 @@ def delete_by_entity_type(client, entity_type_name):
         client (PurviewClient): The Purview client.
         entity_type_name (str): The name of the entity type to delete.
     """
-    entities = client.discovery.browse(entity_type_name).get("value")
-    guids = []
-    for e in entities:
-        guid = e.get("id")
-        guids.append(guid)
-        delete_guid = client.delete_entity(guid)
-        print(delete_guid)
-        print("Above, deleted GUID: " + guid + "\n\n")
+    return delete_all_entities_with_type(client, entity_type_name)
+
+
+def get_bulk_delete_checkpoint_filename(entity_type: str, qualified_name_prefix: str = None):
+    """
+    Returns the checkpoint file of a bulk delete, ie. "dsp_connection_bulk_delete_checkpoint.ndjson".
+
+    Parameters:
+        entity_type (str): The name of the entity type.
+        qualified_name_prefix (str, optional): The qualified name prefix the delete is limited to.
+
+    Returns:
+        str: The file name.
+    """
+    suffix = ""
+    if qualified_name_prefix:
+        suffix = "_" + "".join(c if c.isalnum() else "_" for c in qualified_name_prefix)
+    return entity_type + suffix + "_bulk_delete_checkpoint.ndjson"
+
+
+def load_bulk_delete_checkpoint(checkpoint_filename: str):
+    """
+    Loads the checkpoint of an interrupted bulk delete.
+
+    The first line of the checkpoint holds every GUID that was enumerated, and each later line the
+    GUIDs of one batch that was deleted.
+
+    Parameters:
+        checkpoint_filename (str): The checkpoint file.
+
+    Returns:
+        tuple or None: The enumerated GUIDs and the set of deleted GUIDs, or None if there is no checkpoint.
+    """
+    if not os.path.exists(checkpoint_filename):
+        return None
+    deleted_guids = set()
+    with open(checkpoint_filename, "r", encoding="utf-8") as checkpoint_file:
+        guids = json.loads(checkpoint_file.readline()).get("guids", [])
+        for line in checkpoint_file:
+            if line.strip():
+                deleted_guids.update(json.loads(line).get("deleted", []))
+    return guids, deleted_guids
+
+
+def bulk_delete_entities(client, guids: list, batch_size: int = BULK_DELETE_BATCH_SIZE, max_workers: int = BULK_DELETE_MAX_WORKERS,
+                         checkpoint_filename: str = None):
+    """
+    Deletes entities by GUID in batches with the bulk delete endpoint, running up to max_workers batches at once.
+
+    A batch that fails is reported and left out of the checkpoint, so it is retried when the delete is run again.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        guids (list): The GUIDs of the entities.
+        batch_size (int, optional): The number of GUIDs sent in one request.
+        max_workers (int, optional): The number of requests run in parallel.
+        checkpoint_filename (str, optional): A checkpoint to append each deleted batch to.
+
+    Returns:
+        dict: The "deleted" and "failed" GUIDs.
+    """
+    batches = [guids[i : i + batch_size] for i in range(0, len(guids), batch_size)]
+    deleted_guids = []
+    failed_guids = []
+    if not batches:
+        return {"deleted": deleted_guids, "failed": failed_guids}
+
+    with JobThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(client.delete_entity, guid=batch): batch for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Failed to delete a batch of {len(batch)} guids: {e}")
+                failed_guids.extend(batch)
+                continue
+            deleted_guids.extend(batch)
+            remove_guids_from_qualified_name_index(batch)
+            if checkpoint_filename is not None:
+                with open(checkpoint_filename, "a", encoding="utf-8") as checkpoint_file:
+                    checkpoint_file.write(json.dumps({"deleted": batch}) + "\n")
+            print("Deleted " + str(len(deleted_guids)) + "/" + str(len(guids)) + " guids")
+
+    return {"deleted": deleted_guids, "failed": failed_guids}
+
+
+def delete_all_entities_with_type(client, entity_type, qualified_name_prefix: str = None, dry_run: bool = False,
+                                  batch_size: int = BULK_DELETE_BATCH_SIZE, max_workers: int = BULK_DELETE_MAX_WORKERS):
+    """
+    Deletes every entity of a type, ie. thousands of mis-created dsp_connection or sap_hana_table_column entities.
+
+    Every page of the type is enumerated first and the GUIDs are saved to a checkpoint file. The GUIDs
+    are then deleted in batches, and each deleted batch is appended to the checkpoint. If the delete is
+    interrupted, running it again resumes from the checkpoint without enumerating again. The checkpoint
+    is removed once everything is deleted.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_type (str): The name of the entity type.
+        qualified_name_prefix (str, optional): Only delete entities whose qualified name starts with this.
+        dry_run (bool, optional): Only count the entities that would be deleted.
+        batch_size (int, optional): The number of GUIDs sent in one request.
+        max_workers (int, optional): The number of requests run in parallel.
+
+    Returns:
+        dict: The "entity_type", the number of entities "to_delete", and the "deleted" and "failed" counts.
+    """
+    checkpoint_filename = get_bulk_delete_checkpoint_filename(entity_type, qualified_name_prefix)
+    checkpoint = load_bulk_delete_checkpoint(checkpoint_filename)
+    if checkpoint is not None:
+        guids, deleted_guids = checkpoint
+        print(f"Resuming the delete of {entity_type} from {checkpoint_filename}: {len(deleted_guids)}/{len(guids)} already deleted")
+    else:
+        guids = [value_dict.get("id") for value_dict in browse_entities_with_type(client, entity_type, qualified_name_prefix)]
+        deleted_guids = set()
+        print(f"Enumerated {len(guids)} {entity_type} assets to delete")
+
+    remaining_guids = [guid for guid in guids if guid not in deleted_guids]
+    summary = {"entity_type": entity_type, "to_delete": len(remaining_guids), "deleted": 0, "failed": 0}
+    if dry_run:
+        print(f"Dry run: {len(remaining_guids)} {entity_type} assets would be deleted")
+        return summary
+
+    if checkpoint is None:
+        with open(checkpoint_filename, "w", encoding="utf-8") as checkpoint_file:
+            checkpoint_file.write(json.dumps({"entity_type": entity_type, "qualified_name_prefix": qualified_name_prefix, "guids": guids}) + "\n")
+
+    result = bulk_delete_entities(client, remaining_guids, batch_size, max_workers, checkpoint_filename)
+    summary["deleted"] = len(result["deleted"])
+    summary["failed"] = len(result["failed"])
+    if summary["failed"] == 0:
+        os.remove(checkpoint_filename)
+        print(f"Deleted all {summary['deleted']} {entity_type} assets")
+    else:
+        print(f"Deleted {summary['deleted']} {entity_type} assets, {summary['failed']} failed. Run again to retry them from {checkpoint_filename}")
+    return summary
+
+
+def delete_entities_by_qualified_names(client, type_name: str, qualified_names: list, dry_run: bool = False,
+                                       batch_size: int = BULK_DELETE_BATCH_SIZE, max_workers: int = BULK_DELETE_MAX_WORKERS):
+    """
+    Resolves qualified names of one type with the bulk uniqueAttribute endpoint and deletes them in batches.
+    Only entities of exactly that type are deleted.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        type_name (str): The entity type of the qualified names.
+        qualified_names (list): The qualified names to delete.
+        dry_run (bool, optional): Only count the entities that would be deleted.
+        batch_size (int, optional): The number of GUIDs sent in one delete request.
+        max_workers (int, optional): The number of requests run in parallel.
+
+    Returns:
+        dict: The "deleted" and "failed" GUIDs and the qualified names that were "not_found".
+    """
+    # The qualified name index is not used here: a stale entry would delete the wrong asset, or a GUID that
+    # no longer exists and fails the whole batch
+    chunks = chunk_qualified_names_for_bulk_request(type_name, list(dict.fromkeys(qualified_names)))
+    with JobThreadPoolExecutor(max_workers=max_workers) as executor:
+        chunk_results = list(executor.map(lambda chunk: get_entities_by_unique_attributes(client, type_name, chunk), chunks))
+
+    guids_by_qualified_name = {}
+    for headers in chunk_results:
+        for header in headers:
+            if header["entityType"] == type_name:
+                guids_by_qualified_name[header["qualifiedName"]] = header["id"]
+    not_found = [qualified_name for qualified_name in dict.fromkeys(qualified_names) if qualified_name not in guids_by_qualified_name]
+    guids = list(dict.fromkeys(guids_by_qualified_name.values()))
+    print(f"{len(guids)} {type_name} assets to delete, {len(not_found)} qualified names not found")
+    if dry_run:
+        return {"deleted": [], "failed": [], "not_found": not_found}
+
+    result = bulk_delete_entities(client, guids, batch_size, max_workers)
+    result["not_found"] = not_found
+    return result
+
+
+def map_concurrently_in_order(function, items, max_workers: int):
+    """
+    Yields function(item) for every item, in order, running the calls on a bounded thread pool.
+
+    Only a window of max_workers * 2 calls is submitted ahead of the one being yielded, so results
+    are never all held in memory at once.
+
+    Parameters:
+        function (function): Takes one item and returns its result.
+        items (iterable): The items.
+        max_workers (int): The number of calls run in parallel.
+
+    Yields:
+        The result of each call.
+    """
+    items = iter(items)
+    with JobThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= max_workers * 2:
+                break
+        while pending:
+            result = pending.popleft().result()
+            next_item = next(items, None)
+            if next_item is not None:
+                pending.append(executor.submit(function, next_item))
+            yield result
+
+
+def iterate_pages_concurrently(fetch_page, first_page: dict = None, max_workers: int = BROWSE_MAX_WORKERS, offset_ceiling: int = BROWSE_OFFSET_CEILING):
+    """
+    Yields every value of a paged browse or search result, in order.
+
+    The first page gives the "@search.count", so every remaining offset is planned up front and
+    the pages are fetched on a bounded thread pool. Only a window of pages is held in memory.
+
+    Parameters:
+        fetch_page (function): Takes an offset and returns a page ({"@search.count": int, "value": list}).
+        first_page (dict, optional): The page at offset 0 if it has already been fetched.
+        max_workers (int, optional): The number of pages fetched in parallel.
+        offset_ceiling (int, optional): No offset at or past this value is requested.
+
+    Yields:
+        dict: Each value of each page.
+    """
+    if first_page is None:
+        first_page = fetch_page(0)
+    total_search_count = first_page.get("@search.count") or 0
+    values = first_page.get("value") or []
+    yield from values
+    if len(values) == 0:
+        return
+
+    # The server may cap the page size below the requested limit, so step by what it actually returned
+    offsets = range(len(values), min(total_search_count, offset_ceiling), len(values))
+    for page in map_concurrently_in_order(fetch_page, offsets, max_workers):
+        yield from page.get("value") or []
+
+
+def query_entities_with_qualified_name_prefix(client, entity_type, qualified_name_prefix: str = "", seen_ids: set = None,
+                                              page_size: int = BROWSE_PAGE_SIZE, max_workers: int = BROWSE_MAX_WORKERS):
+    """
+    Yields the search result of every entity of a type whose qualified name starts with a prefix.
+
+    When the result set is larger than BROWSE_OFFSET_CEILING, it is split into one query per next
+    character of the prefix until every part fits under the ceiling.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_type (str): The name of the entity type.
+        qualified_name_prefix (str, optional): The prefix the qualified names must start with.
+        seen_ids (set, optional): GUIDs already yielded, so overlapping parts are not yielded twice.
+        page_size (int, optional): The number of results requested per page.
+        max_workers (int, optional): The number of pages fetched in parallel.
+
+    Yields:
+        dict: The search value of each entity ("id", "name", "qualifiedName", "entityType", ...).
+    """
+    if seen_ids is None:
+        seen_ids = set()
+    search_filter = {"entityType": entity_type}
+    if qualified_name_prefix:
+        search_filter = {
+            "and": [
+                {"entityType": entity_type},
+                {"attributeName": "qualifiedName", "operator": "startswith", "attributeValue": qualified_name_prefix}
+            ]
+        }
+
+    def fetch_page(offset):
+        return client.discovery.query(filter=search_filter, limit=page_size, offset=offset)
+
+    first_page = fetch_page(0)
+    total_search_count = first_page.get("@search.count") or 0
+    first_page_ids = [value_dict.get("id") for value_dict in first_page.get("value") or []]
+    if qualified_name_prefix and first_page_ids and all(guid in seen_ids for guid in first_page_ids):
+        # The prefix filter is case insensitive, so this prefix repeats one that was already enumerated
+        return
+    seen_before = len(seen_ids)
+
+    if total_search_count <= BROWSE_OFFSET_CEILING:
+        for value_dict in iterate_pages_concurrently(fetch_page, first_page, max_workers):
+            if value_dict.get("id") not in seen_ids:
+                seen_ids.add(value_dict.get("id"))
+                yield value_dict
+        return
+
+    print(f"{total_search_count} {entity_type} assets start with '{qualified_name_prefix}', splitting on the next character")
+    for character in QUALIFIED_NAME_PREFIX_ALPHABET:
+        yield from query_entities_with_qualified_name_prefix(client, entity_type, qualified_name_prefix + character, seen_ids, page_size, max_workers)
+
+    if len(seen_ids) - seen_before < total_search_count:
+        print(f"Warning: only {len(seen_ids) - seen_before} of {total_search_count} {entity_type} assets starting with '{qualified_name_prefix}' were enumerated")
+
+
+def browse_entities_with_type(client, entity_type, qualified_name_prefix: str = None,
+                              page_size: int = BROWSE_PAGE_SIZE, max_workers: int = BROWSE_MAX_WORKERS):
+    """
+    Yields the browse result of every entity with a specific type in Purview.
+
+    Pages are fetched concurrently and yielded in order. When the type has more entities than
+    BROWSE_OFFSET_CEILING, or a qualified name prefix is given, the enumeration is done with
+    search queries filtered on the qualified name prefix instead.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_type (str): The name of the entity type.
+        qualified_name_prefix (str, optional): Only enumerate entities whose qualified name starts with this.
+        page_size (int, optional): The number of results requested per page.
+        max_workers (int, optional): The number of pages fetched in parallel.
+
+    Yields:
+        dict: The browse value of each entity ("id", "name", "qualifiedName", "entityType", ...).
+    """
+    if qualified_name_prefix is None:
+        def fetch_page(offset):
+            return client.discovery.browse(entityType=entity_type, offset=offset, limit=page_size)
+
+        first_page = fetch_page(0)
+        if (first_page.get("@search.count") or 0) <= BROWSE_OFFSET_CEILING:
+            yield from iterate_pages_concurrently(fetch_page, first_page, max_workers)
+            return
+        qualified_name_prefix = ""
+
+    yield from query_entities_with_qualified_name_prefix(client, entity_type, qualified_name_prefix, page_size=page_size, max_workers=max_workers)
 
 
 def get_guids_of_entities_with_specific_type(client, entity_type):
@@ -334,31 +1304,150 @@ def get_guids_of_entities_with_specific_type(client, entity_type):
     Returns:
         list: A list of GUIDs for entities with the specified type.
     """
-    browse_result = client.discovery.browse(entityType=entity_type)
-    # utilize offset to skip the first results, until you reach the count number
-    # result of browse is a dict of @search.count and value
-    
-    # the "value" gives results in increments of 100
-    total_search_count = browse_result.get("@search.count")
-    count = 0
     list_of_guids = []
-    while count < total_search_count:
-        browse_result = client.discovery.browse(entityType = entity_type, offset = count)
-        entities = browse_result.get("value")
-        count += len(entities)
-        
-        for value_dict in entities:
-            list_of_guids.append(value_dict.get("id"))
-
-        #filtered_list = [e for e in entities if e.get("entityType") == entity_type]
-        #list_of_guids.extend(filtered_list)
-        """for value_dict in entities:
-            if value_dict.get("entityType") == entity_type:
-                list_of_guids.append(value_dict.get("id"))"""
+    for value_dict in browse_entities_with_type(client, entity_type):
+        list_of_guids.append(value_dict.get("id"))
 
     return list_of_guids
 
-def get_subset_of_entities_with_type(client, entity_type, list_of_guids, subset_start_inclusive, subset_end_exclusive):
+def get_existing_entities_by_guids(client, guids: list):
+    """
+    Retrieves one chunk of entities with the bulk entity-by-guids endpoint, skipping GUIDs that no longer exist.
+
+    Purview answers the whole request with a 404 when one of the GUIDs was deleted. The GUIDs the error names
+    are then reported, removed from the qualified name index and left out, and the rest of the chunk is
+    requested again. When the error names none of them, the chunk is split in halves instead.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        guids (list): The GUIDs of the entities.
+
+    Returns:
+        list: The entities that exist.
+    """
+    if len(guids) == 0:
+        return []
+    try:
+        return client.get_entity(guid=guids).get("entities", [])
+    except AtlasException as e:
+        if ENTITY_GUID_NOT_FOUND_ERROR not in str(e):
+            raise
+        named_guids = set(GUID_PATTERN.findall(str(e)))
+        missing_guids = [g for g in guids if g in named_guids]
+        if len(missing_guids) == 0 and len(guids) > 1:
+            middle = len(guids) // 2
+            return get_existing_entities_by_guids(client, guids[:middle]) + get_existing_entities_by_guids(client, guids[middle:])
+        if len(missing_guids) == 0:
+            missing_guids = guids
+        print(f"Skipping {len(missing_guids)} guids that no longer exist: {', '.join(missing_guids)}")
+        remove_guids_from_qualified_name_index(missing_guids)
+        return get_existing_entities_by_guids(client, [g for g in guids if g not in missing_guids])
+
+
+def get_entities_by_guids(client, guids: list, chunk_size: int = ENTITY_BULK_CHUNK_SIZE, max_workers: int = ENTITY_BULK_MAX_WORKERS):
+    """
+    Retrieves the full details of many entities with the bulk entity-by-guids endpoint.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        guids (list): The GUIDs of the entities.
+        chunk_size (int, optional): The number of GUIDs sent in one request.
+        max_workers (int, optional): The number of requests run in parallel.
+
+    Returns:
+        dict: The entity details keyed by GUID. GUIDs that no longer exist are left out.
+    """
+    unique_guids = list(dict.fromkeys(g for g in guids if g is not None))
+    chunks = [unique_guids[i : i + chunk_size] for i in range(0, len(unique_guids), chunk_size)]
+    entities_by_guid = {}
+    for pulled in map_concurrently_in_order(lambda chunk: get_existing_entities_by_guids(client, chunk), chunks, max_workers):
+        for entity in pulled:
+            entities_by_guid[entity.get("guid")] = entity
+        print("Pulled details for " + str(len(entities_by_guid)) + "/" + str(len(unique_guids)) + " guids")
+
+    return entities_by_guid
+
+
+def iterate_entity_details_for_guids(client, entity_type, list_of_guids, chunk_size: int = ENTITY_BULK_CHUNK_SIZE, max_workers: int = ENTITY_BULK_MAX_WORKERS):
+    """
+    Yields the "all_entity_details" entries for a list of GUIDs as each bulk page arrives.
+
+    The GUIDs are pulled in chunks on a bounded thread pool and yielded in order, with only a window
+    of chunks held in memory. Resource sets keep their columns on a tabular schema entity, so the
+    tabular schema GUIDs of each chunk are fetched with one more bulk request.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_type (str): The name of the entity type.
+        list_of_guids (list): The GUIDs of the entities.
+        chunk_size (int, optional): The number of GUIDs sent in one request.
+        max_workers (int, optional): The number of requests run in parallel.
+
+    Yields:
+        dict: The "guid", "entity" and "columns" of each entity.
+    """
+    chunks = [list_of_guids[i : i + chunk_size] for i in range(0, len(list_of_guids), chunk_size)]
+
+    def pull_chunk(chunk):
+        entities_by_guid = {}
+        for entity in get_existing_entities_by_guids(client, [g for g in chunk if g is not None]):
+            entities_by_guid[entity.get("guid")] = entity
+
+        entity_details = []
+        tabular_schema_guids = {}
+        for guid in chunk:
+            entity = entities_by_guid.get(guid)
+            if entity is None:
+                print("No entity details returned for guid: " + str(guid))
+                continue
+            entry = {
+                "guid": guid, 
+                "entity": entity,
+                "columns": entity.get("relationshipAttributes").get("columns")
+            }
+            if entity_type == "azure_datalake_gen2_resource_set" and "tabular_schema" in entity.get("relationshipAttributes"):
+                tabular_schema = entity.get("relationshipAttributes").get("tabular_schema")
+                if tabular_schema is not None:
+                    tabular_schema_guids[guid] = tabular_schema.get("guid")
+            entity_details.append(entry)
+
+        if len(tabular_schema_guids) > 0:
+            tabular_schemas_by_guid = {}
+            for tabular_schema in get_existing_entities_by_guids(client, list(set(tabular_schema_guids.values()))):
+                tabular_schemas_by_guid[tabular_schema.get("guid")] = tabular_schema
+            for entry in entity_details:
+                tabular_schema = tabular_schemas_by_guid.get(tabular_schema_guids.get(entry["guid"]))
+                if tabular_schema is not None:
+                    entry["columns"] = tabular_schema.get("relationshipAttributes").get("columns")
+
+        return entity_details
+
+    pulled_count = 0
+    for entity_details in map_concurrently_in_order(pull_chunk, chunks, max_workers):
+        yield from entity_details
+        pulled_count += len(entity_details)
+        print("Pulled details for " + str(pulled_count) + "/" + str(len(list_of_guids)) + " " + entity_type + " guids")
+
+
+def get_entity_details_for_guids(client, entity_type, list_of_guids, chunk_size: int = ENTITY_BULK_CHUNK_SIZE, max_workers: int = ENTITY_BULK_MAX_WORKERS):
+    """
+    Builds the "all_entity_details" entries for a list of GUIDs using bulk requests.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_type (str): The name of the entity type.
+        list_of_guids (list): The GUIDs of the entities.
+        chunk_size (int, optional): The number of GUIDs sent in one request.
+        max_workers (int, optional): The number of requests run in parallel.
+
+    Returns:
+        list: A list of dictionaries with the "guid", "entity" and "columns" of each entity.
+    """
+    return list(iterate_entity_details_for_guids(client, entity_type, list_of_guids, chunk_size, max_workers))
+
+
+def get_subset_of_entities_with_type(client, entity_type, list_of_guids, subset_start_inclusive, subset_end_exclusive,
+                                     chunk_size: int = ENTITY_BULK_CHUNK_SIZE, max_workers: int = ENTITY_BULK_MAX_WORKERS):
     """
     Retrieves a subset of entities with a specific type in Purview.
     
@@ -368,26 +1457,14 @@ def get_subset_of_entities_with_type(client, entity_type, list_of_guids, subset_
         list_of_guids (list): A list of GUIDs for entities with the specified type.
         subset_start_inclusive (int): The starting index for the subset (inclusive).
         subset_end_exclusive (int): The ending index for the subset (exclusive).
+        chunk_size (int, optional): The number of GUIDs sent in one bulk request.
+        max_workers (int, optional): The number of bulk requests run in parallel.
 
     Returns:
         list: A list of dictionaries containing details of entities in the subset.
     """
     subset_list_of_guids = list_of_guids[subset_start_inclusive : subset_end_exclusive]
-    entity_details = []
-    count = 0
-    for guid in subset_list_of_guids:
-        print(count)
-        pulled = client.get_entity(guid)
-        entity = pulled.get("entities")[0]
-        entry = {
-            "guid": guid, 
-            "entity": entity, # just use the first entry
-            "columns": entity.get("relationshipAttributes").get("columns")
-        }
-        entity_details.append(entry)
-        count += 1
-
-    return entity_details
+    return get_entity_details_for_guids(client, entity_type, subset_list_of_guids, chunk_size, max_workers)
 
 
 def get_columns_from_datalake(client, tabular_schema_guid):
@@ -405,13 +1482,15 @@ def get_columns_from_datalake(client, tabular_schema_guid):
     return tabular_schema_details.get("relationshipAttributes").get("columns")
             
 
-def get_all_entities_with_type(client, entity_type):
+def get_all_entities_with_type(client, entity_type, chunk_size: int = ENTITY_BULK_CHUNK_SIZE, max_workers: int = ENTITY_BULK_MAX_WORKERS):
     """
     Retrieves all entities of a specific type in Purview.
 
     Parameters:
         client (PurviewClient): The Purview client.
         entity_type (str): The name of the entity type.
+        chunk_size (int, optional): The number of GUIDs sent in one bulk request.
+        max_workers (int, optional): The number of bulk requests run in parallel.
 
     Returns:
         dict: Information about all entities of the specified type.
@@ -420,24 +1499,7 @@ def get_all_entities_with_type(client, entity_type):
     print("Pulled all guids for type: " + entity_type)
     print("Now pulling the entity details for each guid")
 
-    all_entity_details = []
-    count = 0
-    for guid in list_of_guids:
-        count = count + 1
-        print(count)
-
-        pulled = client.get_entity(guid)
-        entity = pulled.get("entities")[0]
-        entry = {
-            "guid": guid, 
-            "entity": entity, # just use the first entry
-            "columns": entity.get("relationshipAttributes").get("columns")
-        }
-        if entity_type == "azure_datalake_gen2_resource_set" and "tabular_schema" in entity.get("relationshipAttributes"):
-            resource_set_tabular_schema_guid = entity.get("relationshipAttributes").get("tabular_schema").get("guid")
-            entry["columns"] = get_columns_from_datalake(client, resource_set_tabular_schema_guid)
-            print(entry["columns"])
-        all_entity_details.append(entry)
+    all_entity_details = get_entity_details_for_guids(client, entity_type, list_of_guids, chunk_size, max_workers)
 
     all_entities_with_type = {
         "entity_type": entity_type,
@@ -447,80 +1509,439 @@ def get_all_entities_with_type(client, entity_type):
     return all_entities_with_type
 
 
-def pull_entities_from_purview(purview_account_short_name, purview_account_full_name, client):
+def get_entity_update_times_with_type(client, entity_type):
+    """
+    Retrieves the GUID and updateTime of every entity of a type from search, without pulling the entity details.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_type (str): The name of the entity type.
+
+    Returns:
+        dict: The search header of each entity keyed by GUID, in enumeration order.
+    """
+    headers = {}
+    for value_dict in query_entities_with_qualified_name_prefix(client, entity_type):
+        headers[value_dict.get("id")] = value_dict
+    return headers
+
+
+def is_entity_changed(header, previous_entity):
+    """
+    Checks whether an entity changed since it was pulled, from its updateTime and version.
+
+    The search header of an entity has its updateTime but no version: Purview search does not return
+    one, and the only other source is the entity itself. A version is therefore compared when the header
+    has one, and otherwise checked on the entity details once they are pulled again.
+
+    Parameters:
+        header (dict): The search header, or the entity details just pulled.
+        previous_entity (dict): The entity stored in the previous pull.
+
+    Returns:
+        bool: True when the updateTime or the version differs, or the header has no updateTime.
+    """
+    if header.get("updateTime") is None or header.get("updateTime") != previous_entity.get("updateTime"):
+        return True
+    return header.get("version") is not None and header.get("version") != previous_entity.get("version")
+
+
+def refresh_all_entities_with_type(client, entity_type, previous_all_entities_with_type, chunk_size: int = ENTITY_BULK_CHUNK_SIZE, max_workers: int = ENTITY_BULK_MAX_WORKERS):
+    """
+    Incrementally refreshes a previously pulled entity type.
+
+    Only entities that are new, or whose updateTime or version differs from the one stored in the previous
+    pull (see is_entity_changed), have their details pulled again. Entities that no longer exist are moved
+    to "tombstones". A changed entity whose details could not be pulled keeps its previous entry.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_type (str): The name of the entity type.
+        previous_all_entities_with_type (dict): The result of a previous get_all_entities_with_type for this type.
+        chunk_size (int, optional): The number of GUIDs sent in one bulk request.
+        max_workers (int, optional): The number of bulk requests run in parallel.
+
+    Returns:
+        dict: Information about all entities of the specified type, in the same format as get_all_entities_with_type.
+    """
+    previous_entries = {}
+    for entry in previous_all_entities_with_type.get("all_entity_details", []):
+        previous_entries[entry.get("guid")] = entry
+
+    headers = get_entity_update_times_with_type(client, entity_type)
+    changed_guids = []
+    for guid, header in headers.items():
+        previous_entry = previous_entries.get(guid)
+        if previous_entry is None or is_entity_changed(header, previous_entry.get("entity")):
+            changed_guids.append(guid)
+
+    refreshed_entries = {}
+    for entry in get_entity_details_for_guids(client, entity_type, changed_guids, chunk_size, max_workers):
+        refreshed_entries[entry.get("guid")] = entry
+
+    all_entity_details = []
+    unchanged_count = 0
+    changed_count = 0
+    missing_guids = []
+    for guid in headers:
+        if guid in refreshed_entries:
+            all_entity_details.append(refreshed_entries[guid])
+            if guid in previous_entries:
+                # Only an updateTime was compared before the pull, the version is compared now
+                if is_entity_changed(refreshed_entries[guid].get("entity"), previous_entries[guid].get("entity")):
+                    changed_count += 1
+                else:
+                    unchanged_count += 1
+        elif guid in previous_entries:
+            all_entity_details.append(previous_entries[guid])
+            if guid in changed_guids:
+                # Deleted between the search and the pull, or in a chunk that failed
+                missing_guids.append(guid)
+            else:
+                unchanged_count += 1
+        elif guid in changed_guids:
+            missing_guids.append(guid)
+    if len(missing_guids) > 0:
+        print(f"{entity_type}: the details of {len(missing_guids)} changed entities could not be pulled, "
+              f"their previous entries are kept: {', '.join(missing_guids[:10])}")
+        remove_guids_from_qualified_name_index(missing_guids)
+
+    deleted_on = datetime.now().strftime("%m/%d/%Y %H:%M")
+    tombstones = [t for t in previous_all_entities_with_type.get("tombstones", []) if t.get("guid") not in headers]
+    remove_guids_from_qualified_name_index([guid for guid in previous_entries if guid not in headers])
+    for guid, entry in previous_entries.items():
+        if guid not in headers:
+            tombstones.append({
+                "guid": guid,
+                "qualifiedName": entry.get("entity").get("attributes").get("qualifiedName"),
+                "version": entry.get("entity").get("version"),
+                "deleted_on": deleted_on
+            })
+
+    new_count = len([guid for guid in changed_guids if guid not in previous_entries and guid in refreshed_entries])
+    print(f"{entity_type}: {new_count} new, {changed_count} changed, {unchanged_count} unchanged, {len(missing_guids)} not pulled, {len(tombstones)} tombstones")
+
+    return {
+        "entity_type": entity_type,
+        "info_pulled_on": datetime.now().strftime("%m/%d/%Y %H:%M"),
+        "all_entity_details": all_entity_details,
+        "tombstones": tombstones
+    }
+
+
+def load_pulled_snapshot(input_filename):
+    """
+    Loads a previously written pull snapshot, if there is one.
+
+    Parameters:
+        input_filename (str): The file name of the snapshot.
+
+    Returns:
+        dict or None: The snapshot, or None if the file does not exist.
+    """
+    if not os.path.exists(input_filename):
+        return None
+    with open(input_filename, "r", encoding="utf-8") as json_file:
+        return json.load(json_file)
+
+
+def write_pulled_snapshot(output_filename, pulled_entities: dict, serialized_sections: dict):
+    """
+    Writes a pull snapshot with the same layout as json.dump(pulled_entities, indent=3).
+
+    The text of each entity type's section is kept in serialized_sections, so when the snapshot is written
+    again after another type finishes, only the sections that changed are serialized again. The file is
+    written to a temporary file first so a failure while writing does not lose the previous snapshot.
+
+    Parameters:
+        output_filename (str): The file name of the snapshot.
+        pulled_entities (dict): The snapshot, with "data_sources" -> data source -> entity type -> section.
+        serialized_sections (dict): Entity type -> (section, text), filled in as sections are serialized.
+    """
+    def serialize_section(entity_type, section):
+        cached = serialized_sections.get(entity_type)
+        if cached is None or cached[0] is not section:
+            # The section sits three levels deep in the snapshot
+            cached = (section, json.dumps(section, indent=3).replace("\n", "\n" + " " * 9))
+            serialized_sections[entity_type] = cached
+        return cached[1]
+
+    def write_object(json_file, items, indent, write_value):
+        # Writes the members one at a time, so the whole snapshot is never joined into one string
+        if not items:
+            json_file.write("{}")
+            return
+        json_file.write("{")
+        for i, (key, value) in enumerate(items):
+            json_file.write(("," if i else "") + "\n" + " " * (indent + 3) + json.dumps(key) + ": ")
+            write_value(json_file, key, value)
+        json_file.write("\n" + " " * indent + "}")
+
+    def write_entity_type(json_file, entity_type, section):
+        json_file.write(serialize_section(entity_type, section))
+
+    def write_data_source(json_file, data_source, entity_types):
+        write_object(json_file, list(entity_types.items()), 6, write_entity_type)
+
+    def write_top_level_member(json_file, key, value):
+        if key == "data_sources":
+            write_object(json_file, list(value.items()), 3, write_data_source)
+        else:
+            json_file.write(json.dumps(value, indent=3).replace("\n", "\n" + " " * 3))
+
+    with open(output_filename + ".tmp", "w", encoding="utf-8") as json_file:
+        write_object(json_file, list(pulled_entities.items()), 0, write_top_level_member)
+    os.replace(output_filename + ".tmp", output_filename)
+
+
+def pull_or_refresh_entities_with_type(client, entity_type, previous_all_entities_with_type = None):
+    """
+    Pulls every entity of a type, or incrementally refreshes it when a previous pull is given.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_type (str): The name of the entity type.
+        previous_all_entities_with_type (dict, optional): The previous pull of this type.
+
+    Returns:
+        dict: Information about all entities of the specified type.
+    """
+    if previous_all_entities_with_type is None:
+        all_entities_with_type = get_all_entities_with_type(client, entity_type)
+    else:
+        all_entities_with_type = refresh_all_entities_with_type(client, entity_type, previous_all_entities_with_type)
+    print("Successfully pulled all: " + entity_type + " assets")
+    print(str(len(all_entities_with_type["all_entity_details"])) + " " + entity_type + " assets pulled")
+    return all_entities_with_type
+
+
+def pull_or_refresh_entities_into_snapshot(client, snapshot_directory, entity_type, previous_entity_type_manifest = None):
+    """
+    Pulls every entity of a type into a streamed snapshot, writing each bulk page as it arrives.
+
+    When the manifest section of a previous streamed pull is given, the type is refreshed
+    incrementally against the entities in its "<entity_type>.ndjson" file instead.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        snapshot_directory (str): The snapshot directory.
+        entity_type (str): The name of the entity type.
+        previous_entity_type_manifest (dict, optional): The manifest section of the previous pull of this type.
+
+    Returns:
+        dict: The manifest section of the type ("entity_type", "info_pulled_on", "file", "entity_count", "tombstones").
+    """
+    entity_type_manifest = {
+        "entity_type": entity_type,
+        "info_pulled_on": datetime.now().strftime("%m/%d/%Y %H:%M"),
+        "file": get_snapshot_entities_filename(entity_type)
+    }
+    if previous_entity_type_manifest is None:
+        list_of_guids = get_guids_of_entities_with_specific_type(client, entity_type)
+        print("Pulled all guids for type: " + entity_type)
+        print("Now pulling the entity details for each guid")
+        all_entity_details = iterate_entity_details_for_guids(client, entity_type, list_of_guids)
+    else:
+        previous_all_entities_with_type = {
+            "all_entity_details": iterate_snapshot_entities(snapshot_directory, entity_type),
+            "tombstones": previous_entity_type_manifest.get("tombstones", [])
+        }
+        all_entities_with_type = refresh_all_entities_with_type(client, entity_type, previous_all_entities_with_type)
+        all_entity_details = all_entities_with_type["all_entity_details"]
+        entity_type_manifest["tombstones"] = all_entities_with_type["tombstones"]
+
+    entity_type_manifest["entity_count"] = write_snapshot_entities(snapshot_directory, entity_type, all_entity_details)
+    print("Successfully pulled all: " + entity_type + " assets")
+    print(str(entity_type_manifest["entity_count"]) + " " + entity_type + " assets pulled")
+    return entity_type_manifest
+
+
+class ConcurrencyLimitedClient:
+    """
+    Wraps a PurviewClient so that every request made through it, including through client.discovery,
+    waits on a semaphore shared by all the threads using it.
+    """
+    def __init__(self, client, semaphore):
+        """
+        Args:
+            client (PurviewClient): The Purview client, or one of its sub-clients.
+            semaphore (threading.Semaphore): The semaphore bounding the requests in flight.
+        """
+        self._client = client
+        self._semaphore = semaphore
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if callable(attribute):
+            def limited_call(*args, **kwargs):
+                with self._semaphore:
+                    return attribute(*args, **kwargs)
+            return limited_call
+        if hasattr(attribute, "__dict__"):
+            return ConcurrencyLimitedClient(attribute, self._semaphore)
+        return attribute
+
+
+def pull_entity_types_concurrently(client, entity_types: list, pull_entity_type, on_entity_type_pulled = None,
+                                   max_concurrent_requests: int = PULL_MAX_CONCURRENT_REQUESTS):
+    """
+    Pulls several entity types at the same time, with one limit on the requests in flight shared by all of them.
+
+    Each type reports its entity count, time taken and throughput when it finishes, and on_entity_type_pulled
+    is called for it right away, one type at a time, so its section can be written without waiting for the others.
+    A type that fails is reported and left out, and the other types still finish. A passed job deadline is
+    raised once every type has stopped.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_types (list): The names of the entity types.
+        pull_entity_type (function): Takes a client and an entity type and returns the pulled section of the type,
+            ie. pull_or_refresh_entities_with_type.
+        on_entity_type_pulled (function, optional): Takes an entity type and its pulled section.
+        max_concurrent_requests (int, optional): The number of requests in flight at once across all the types.
+
+    Returns:
+        dict: The pulled section of each entity type that did not fail.
+    """
+    limited_client = ConcurrencyLimitedClient(client, threading.BoundedSemaphore(max_concurrent_requests))
+
+    def pull_and_time_entity_type(entity_type):
+        start_time = time.time()
+        print("Started pulling: " + entity_type)
+        return pull_entity_type(limited_client, entity_type), time.time() - start_time
+
+    pulled_entity_types = {}
+    failed_entity_types = {}
+    start_time = time.time()
+    with JobThreadPoolExecutor(max_workers=max(len(entity_types), 1)) as executor:
+        futures = {executor.submit(pull_and_time_entity_type, entity_type): entity_type for entity_type in entity_types}
+        for future in as_completed(futures):
+            entity_type = futures[future]
+            try:
+                pulled_entity_type, elapsed_seconds = future.result()
+            except (Exception, AtlasException) as e:
+                failed_entity_types[entity_type] = e
+                print(f"Failed to pull {entity_type}: {type(e).__name__}: {e}")
+                continue
+            entity_count = pulled_entity_type.get("entity_count", len(pulled_entity_type.get("all_entity_details", [])))
+            pulled_entity_types[entity_type] = pulled_entity_type
+            print(f"Finished {entity_type}: {entity_count} entities in {round(elapsed_seconds)}s ({round(entity_count / max(elapsed_seconds, 0.001), 1)} entities/s), "
+                  f"{len(pulled_entity_types) + len(failed_entity_types)}/{len(entity_types)} types done")
+            if on_entity_type_pulled is not None:
+                on_entity_type_pulled(entity_type, pulled_entity_type)
+
+    print(f"Pulled {len(pulled_entity_types)} entity types in {round(time.time() - start_time)}s")
+    if failed_entity_types:
+        print(f"{len(failed_entity_types)} entity types failed: {', '.join(failed_entity_types)}")
+        for error in failed_entity_types.values():
+            if isinstance(error, DeadlineExceededError):
+                raise error
+    return pulled_entity_types
+
+
+def pull_entities_from_purview(purview_account_short_name, purview_account_full_name, client, incremental: bool = False,
+                               snapshot_format: str = "json", columnar_snapshot: bool = False,
+                               max_concurrent_requests: int = PULL_MAX_CONCURRENT_REQUESTS):
     """
     Pulls entities from Purview for various data sources.
 
+    All the entity types are pulled at the same time, sharing max_concurrent_requests.
+
     Parameters:
         purview_account_short_name (str): The short name of the Purview account.
         purview_account_full_name (str): The full name of the Purview account.
         client (PurviewClient): The Purview client.
+        incremental (bool, optional): Refresh the previous "<account>_pulled_entities.json" instead of pulling
+            everything again. Only new and changed entities are pulled and deleted ones become tombstones.
+        snapshot_format (str, optional): "json" rewrites "<account>_pulled_entities.json" as each type finishes.
+            "ndjson" streams each entity type to "<account>_pulled_entities/<entity_type>.ndjson" as it is pulled,
+            updates "manifest.json" as each type finishes, and returns the manifest. Read it back with
+            iterate_pulled_entity_details.
+        columnar_snapshot (bool, optional): Also write the columnar "entities.arrow" and "columns.arrow" tables to
+            "<account>_pulled_entities/", for iterate_projected_entity_details.
+        max_concurrent_requests (int, optional): The number of requests in flight at once across all the types.
+
+    Types that fail, or have not finished yet, keep their section from the previous pull.
 
     Returns:
         dict: Information about the pulled entities.
     """
-    entity_type = "powerbi_dataset"
-    powerbi_dataset_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(powerbi_dataset_all_entities_with_type)) + " " + entity_type + " assets pulled")   
-    
-    entity_type = "azure_sql_dw_table"
-    azure_sql_dw_table_all_entities_with_type = get_all_entities_with_type(client, entity_type) 
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(azure_sql_dw_table_all_entities_with_type)) + " " + entity_type + " assets pulled")   
-    
-    entity_type = "sap_hana_view"
-    sap_hana_view_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(sap_hana_view_all_entities_with_type)) + " " + entity_type + " assets pulled")   
-    
-    entity_type = "sap_hana_table"
-    sap_hana_table_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(sap_hana_table_all_entities_with_type)) + " " + entity_type + " assets pulled")   
-    
-    entity_type = "sap_s4hana_view"
-    sap_s4hana_view_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(sap_s4hana_view_all_entities_with_type)) + " " + entity_type + " assets pulled")   
+    entity_type_data_sources = {}
+    for data_source, entity_types in PULLED_ENTITY_TYPES.items():
+        for entity_type in entity_types:
+            entity_type_data_sources[entity_type] = data_source
+
+    if snapshot_format == "ndjson":
+        snapshot_directory = get_snapshot_directory(purview_account_short_name, "pulled_entities")
+        previous_manifest = load_snapshot_manifest(snapshot_directory)
+
+        # Types that have not finished yet keep their section from the previous pull
+        data_sources = {}
+        for data_source, entity_types in PULLED_ENTITY_TYPES.items():
+            data_sources[data_source] = {}
+            for entity_type in entity_types:
+                if previous_manifest is not None and entity_type in previous_manifest.get("data_sources", {}).get(data_source, {}):
+                    data_sources[data_source][entity_type] = previous_manifest["data_sources"][data_source][entity_type]
+        manifest = {
+            "purview_account": purview_account_full_name,
+            "data_sources": data_sources
+        }
 
-    entity_type = "sap_s4hana_table"
-    sap_s4hana_table_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(sap_s4hana_table_all_entities_with_type)) + " " + entity_type + " assets pulled") 
-
-    entity_type = "azure_datalake_gen2_resource_set"
-    azure_datalake_gen2_resource_set_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(azure_datalake_gen2_resource_set_all_entities_with_type)) + " " + entity_type + " assets pulled") 
+        def pull_entity_type(limited_client, entity_type):
+            previous_entity_type_manifest = None
+            if incremental:
+                previous_entity_type_manifest = data_sources[entity_type_data_sources[entity_type]].get(entity_type)
+            return pull_or_refresh_entities_into_snapshot(limited_client, snapshot_directory, entity_type, previous_entity_type_manifest)
+
+        def write_entity_type_section(entity_type, entity_type_manifest):
+            data_source = entity_type_data_sources[entity_type]
+            data_sources[data_source][entity_type] = entity_type_manifest
+            data_sources[data_source] = {t: data_sources[data_source][t] for t in PULLED_ENTITY_TYPES[data_source] if t in data_sources[data_source]}
+            write_snapshot_manifest(snapshot_directory, manifest)
+
+        pull_entity_types_concurrently(client, list(entity_type_data_sources), pull_entity_type, write_entity_type_section, max_concurrent_requests)
+        print(f'Data has been streamed to "{snapshot_directory}".')
+        if columnar_snapshot:
+            # pyarrow is only loaded when a columnar snapshot is asked for
+            from modules.columnar_snapshot import write_columnar_snapshot
+            write_columnar_snapshot(purview_account_short_name)
+        return manifest
 
+    output_filename = purview_account_short_name + "_pulled_entities.json"
+    previous_pulled_entities = load_pulled_snapshot(output_filename)
+
+    # Types that have not finished yet keep their section from the previous pull
+    data_sources = {}
+    for data_source, entity_types in PULLED_ENTITY_TYPES.items():
+        data_sources[data_source] = {}
+        for entity_type in entity_types:
+            if previous_pulled_entities is not None and entity_type in previous_pulled_entities.get("data_sources", {}).get(data_source, {}):
+                data_sources[data_source][entity_type] = previous_pulled_entities["data_sources"][data_source][entity_type]
     pulled_entities = {
         "purview_account": purview_account_full_name,
-        "data_sources": {
-            "powerbi": {
-                "powerbi_dataset": powerbi_dataset_all_entities_with_type
-            },
-            "azure_sql_dw": {
-                "azure_sql_dw_table" : azure_sql_dw_table_all_entities_with_type
-            },
-            "sap_hana": {
-                "sap_hana_view": sap_hana_view_all_entities_with_type,
-                "sap_hana_table": sap_hana_table_all_entities_with_type
-            },
-            "sap_s4hana": {
-                "sap_s4hana_view": sap_s4hana_view_all_entities_with_type,
-                "sap_s4hana_table": sap_s4hana_table_all_entities_with_type,
-            },
-            "azure_datalake_gen2": {
-                "azure_datalake_gen2_resource_set": azure_datalake_gen2_resource_set_all_entities_with_type
-            }
-        }
+        "data_sources": data_sources
     }
-    
-    output_filename = purview_account_short_name + "_pulled_entities.json"
-    with open(output_filename, "w", encoding="utf-8") as json_file:
-        json.dump(pulled_entities, json_file, indent=3)
+    if not incremental:
+        previous_pulled_entities = None
+    serialized_sections = {}
+
+    def pull_entity_type(limited_client, entity_type):
+        previous_all_entities_with_type = None
+        if previous_pulled_entities is not None:
+            previous_all_entities_with_type = previous_pulled_entities.get("data_sources", {}).get(entity_type_data_sources[entity_type], {}).get(entity_type)
+        return pull_or_refresh_entities_with_type(limited_client, entity_type, previous_all_entities_with_type)
+
+    def write_entity_type_section(entity_type, all_entities_with_type):
+        data_source = entity_type_data_sources[entity_type]
+        data_sources[data_source][entity_type] = all_entities_with_type
+        data_sources[data_source] = {t: data_sources[data_source][t] for t in PULLED_ENTITY_TYPES[data_source] if t in data_sources[data_source]}
+        write_pulled_snapshot(output_filename, pulled_entities, serialized_sections)
+
+    pull_entity_types_concurrently(client, list(entity_type_data_sources), pull_entity_type, write_entity_type_section, max_concurrent_requests)
     print(f'Data has been written to "{output_filename}" with the desired formatting.')
+    if columnar_snapshot:
+        from modules.columnar_snapshot import write_columnar_snapshot
+        write_columnar_snapshot(purview_account_short_name)
 
     return pulled_entities
 
@@ -570,61 +1991,75 @@ def get_all_entities_nested_from_qualified_name(client, qualified_name):
     return entities
 
 
-def pull_lineage_connections_from_purview(purview_account_short_name, purview_account_full_name, client):
+def pull_lineage_connections_from_purview(purview_account_short_name, purview_account_full_name, client, incremental: bool = False,
+                                          snapshot_format: str = "json", max_concurrent_requests: int = PULL_MAX_CONCURRENT_REQUESTS):
     """
     Retrieves lineage connections from Purview for various entity types.
 
+    All the process types are pulled at the same time, sharing max_concurrent_requests.
+
     Parameters:
     - purview_account_short_name (str): Short name of the Purview account.
     - purview_account_full_name (str): Full name of the Purview account.
     - client: Purview client for making API requests.
+    - incremental (bool, optional): Refresh the previous "<account>_pulled_lineage_connections.json" instead of
+      pulling everything again.
+    - snapshot_format (str, optional): "json", or "ndjson" to stream each type to
+      "<account>_pulled_lineage_connections/<entity_type>.ndjson" with a "manifest.json" updated as each type finishes.
+    - max_concurrent_requests (int, optional): The number of requests in flight at once across all the types.
 
     Returns:
     - dict: Dictionary containing pulled lineage connections organized by entity type.
     """
-    entity_type = "dsp_connection"
-    dsp_connection_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(dsp_connection_all_entities_with_type)) + " " + entity_type + " assets pulled")   
-    
-    entity_type = "dw_routine"
-    dw_routine_all_entities_with_type = get_all_entities_with_type(client, entity_type) 
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(dw_routine_all_entities_with_type)) + " " + entity_type + " assets pulled")   
-    
-    entity_type = "dw_view_creation"
-    dw_view_creation_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(dw_view_creation_all_entities_with_type)) + " " + entity_type + " assets pulled")   
-    
-    entity_type = "ingestion_framework"
-    ingestion_framework_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(ingestion_framework_all_entities_with_type)) + " " + entity_type + " assets pulled")   
-    
-    entity_type = "sql_database_source"
-    sql_database_source_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(sql_database_source_all_entities_with_type)) + " " + entity_type + " assets pulled") 
+    if snapshot_format == "ndjson":
+        snapshot_directory = get_snapshot_directory(purview_account_short_name, "pulled_lineage_connections")
+        previous_manifest = load_snapshot_manifest(snapshot_directory)
+
+        # Types that have not finished yet keep their section from the previous pull
+        lineage_connections = {}
+        for entity_type in PULLED_LINEAGE_CONNECTION_TYPES:
+            if previous_manifest is not None and entity_type in previous_manifest.get("lineage_connections", {}):
+                lineage_connections[entity_type] = previous_manifest["lineage_connections"][entity_type]
+        manifest = {
+            "purview_account": purview_account_full_name,
+            "lineage_connections": lineage_connections
+        }
 
-    entity_type = "sharepoint_to_pbi"
-    sharepoint_to_pbi_all_entities_with_type = get_all_entities_with_type(client, entity_type)
-    print("Successfully pulled all: " + entity_type + " assets")
-    print(str(len(sharepoint_to_pbi_all_entities_with_type)) + " " + entity_type + " assets pulled") 
+        previous_lineage_connections = dict(lineage_connections)
+
+        def pull_entity_type(limited_client, entity_type):
+            previous_entity_type_manifest = previous_lineage_connections.get(entity_type) if incremental else None
+            return pull_or_refresh_entities_into_snapshot(limited_client, snapshot_directory, entity_type, previous_entity_type_manifest)
+
+        def write_entity_type_section(entity_type, entity_type_manifest):
+            lineage_connections[entity_type] = entity_type_manifest
+            manifest["lineage_connections"] = {t: lineage_connections[t] for t in PULLED_LINEAGE_CONNECTION_TYPES if t in lineage_connections}
+            write_snapshot_manifest(snapshot_directory, manifest)
+
+        pull_entity_types_concurrently(client, PULLED_LINEAGE_CONNECTION_TYPES, pull_entity_type, write_entity_type_section, max_concurrent_requests)
+        print(f'Data has been streamed to "{snapshot_directory}".')
+        return manifest
+
+    output_filename = purview_account_short_name + "_pulled_lineage_connections.json"
+    previous_pulled_entities = load_pulled_snapshot(output_filename) if incremental else None
+
+    def pull_entity_type(limited_client, entity_type):
+        previous_all_entities_with_type = None
+        if previous_pulled_entities is not None:
+            previous_all_entities_with_type = previous_pulled_entities.get("lineage_connections", {}).get(entity_type)
+        return pull_or_refresh_entities_with_type(limited_client, entity_type, previous_all_entities_with_type)
+
+    pulled_entity_types = pull_entity_types_concurrently(client, PULLED_LINEAGE_CONNECTION_TYPES, pull_entity_type, max_concurrent_requests=max_concurrent_requests)
+
+    lineage_connections = {}
+    for entity_type in PULLED_LINEAGE_CONNECTION_TYPES:
+        lineage_connections[entity_type] = pulled_entity_types[entity_type]
 
     pulled_entities = {
         "purview_account": purview_account_full_name,
-        "lineage_connections": {
-            "dsp_connection": dsp_connection_all_entities_with_type,
-            "dw_routine": dw_routine_all_entities_with_type,
-            "dw_view_creation": dw_view_creation_all_entities_with_type,
-            "ingestion_framework": ingestion_framework_all_entities_with_type,
-            "sql_database_source": sql_database_source_all_entities_with_type,
-            "sharepoint_to_pbi": sharepoint_to_pbi_all_entities_with_type
-        }
+        "lineage_connections": lineage_connections
     }
     
-    output_filename = purview_account_short_name + "_pulled_lineage_connections.json"
     with open(output_filename, "w", encoding="utf-8") as json_file:
         json.dump(pulled_entities, json_file, indent=3)
     print(f'Data has been written to "{output_filename}" with the desired formatting.')
@@ -0,0 +1,218 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import json
+import os
+
+
+# Constants
+# ---------------
+
+SNAPSHOT_MANIFEST_FILENAME = "manifest.json"
+SNAPSHOT_ENTITIES_EXTENSION = ".ndjson"
+
+
+# Functions
+# ---------------
+
+def get_snapshot_directory(purview_account_short_name: str, snapshot_name: str = "pulled_entities"):
+    """
+    Returns the directory of a streamed snapshot, ie. "prod_pulled_entities" next to "prod_pulled_entities.json".
+
+    Parameters:
+        purview_account_short_name (str): The short name of the Purview account.
+        snapshot_name (str, optional): "pulled_entities" or "pulled_lineage_connections".
+
+    Returns:
+        str: The snapshot directory.
+    """
+    return purview_account_short_name + "_" + snapshot_name
+
+
+def get_snapshot_entities_filename(entity_type: str):
+    """
+    Returns the file name, relative to the snapshot directory, that holds the entities of a type.
+
+    Parameters:
+        entity_type (str): The name of the entity type.
+
+    Returns:
+        str: The file name.
+    """
+    return entity_type + SNAPSHOT_ENTITIES_EXTENSION
+
+
+def write_snapshot_entities(snapshot_directory: str, entity_type: str, entity_details):
+    """
+    Streams the entities of one type to "<entity_type>.ndjson", one entity per line.
+
+    Entries are written as they are produced, so a generator is never materialized. The file is
+    written to a temporary name first and swapped in at the end, so the previous file of the type
+    can still be read while the new one is being written.
+
+    Parameters:
+        snapshot_directory (str): The snapshot directory.
+        entity_type (str): The name of the entity type.
+        entity_details (iterable): The "all_entity_details" entries ({"guid", "entity", "columns"}).
+
+    Returns:
+        int: The number of entities written.
+    """
+    os.makedirs(snapshot_directory, exist_ok=True)
+    output_filename = os.path.join(snapshot_directory, get_snapshot_entities_filename(entity_type))
+    temporary_filename = output_filename + ".tmp"
+
+    count = 0
+    with open(temporary_filename, "w", encoding="utf-8") as ndjson_file:
+        for entry in entity_details:
+            ndjson_file.write(json.dumps(entry) + "\n")
+            count += 1
+    os.replace(temporary_filename, output_filename)
+    return count
+
+
+def iterate_snapshot_entities(snapshot_directory: str, entity_type: str):
+    """
+    Lazily yields the entities of one type from a streamed snapshot.
+
+    Parameters:
+        snapshot_directory (str): The snapshot directory.
+        entity_type (str): The name of the entity type.
+
+    Yields:
+        dict: Each "all_entity_details" entry ({"guid", "entity", "columns"}).
+    """
+    input_filename = os.path.join(snapshot_directory, get_snapshot_entities_filename(entity_type))
+    if not os.path.exists(input_filename):
+        return
+    with open(input_filename, "r", encoding="utf-8") as ndjson_file:
+        for line in ndjson_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_snapshot_manifest(snapshot_directory: str, manifest: dict):
+    """
+    Writes the manifest of a streamed snapshot.
+
+    The manifest has the same layout as the JSON snapshot, except that each entity type holds
+    "file" and "entity_count" instead of "all_entity_details".
+
+    Parameters:
+        snapshot_directory (str): The snapshot directory.
+        manifest (dict): The manifest.
+    """
+    os.makedirs(snapshot_directory, exist_ok=True)
+    output_filename = os.path.join(snapshot_directory, SNAPSHOT_MANIFEST_FILENAME)
+    with open(output_filename, "w", encoding="utf-8") as json_file:
+        json.dump(manifest, json_file, indent=3)
+
+
+def load_snapshot_manifest(snapshot_directory: str):
+    """
+    Loads the manifest of a streamed snapshot, if there is one.
+
+    Parameters:
+        snapshot_directory (str): The snapshot directory.
+
+    Returns:
+        dict or None: The manifest, or None if the snapshot does not exist.
+    """
+    input_filename = os.path.join(snapshot_directory, SNAPSHOT_MANIFEST_FILENAME)
+    if not os.path.exists(input_filename):
+        return None
+    with open(input_filename, "r", encoding="utf-8") as json_file:
+        return json.load(json_file)
+
+
+def find_snapshot_entity_type(snapshot: dict, entity_type: str):
+    """
+    Finds the section of an entity type in a JSON snapshot or a manifest.
+
+    Parameters:
+        snapshot (dict): The JSON snapshot or manifest.
+        entity_type (str): The name of the entity type.
+
+    Returns:
+        dict or None: The section of the entity type, or None if it was not pulled.
+    """
+    for entity_types in snapshot.get("data_sources", {}).values():
+        if entity_type in entity_types:
+            return entity_types[entity_type]
+    return snapshot.get("lineage_connections", {}).get(entity_type)
+
+
+def is_streamed_snapshot_newest(snapshot_directory: str):
+    """
+    Checks whether the streamed snapshot in a directory is more recent than the JSON snapshot next to it.
+
+    Parameters:
+        snapshot_directory (str): The snapshot directory, ie. "prod_pulled_entities".
+
+    Returns:
+        bool: True if the streamed snapshot exists and is not older than "<snapshot_directory>.json".
+    """
+    manifest_filename = os.path.join(snapshot_directory, SNAPSHOT_MANIFEST_FILENAME)
+    input_filename = snapshot_directory + ".json"
+    if not os.path.exists(manifest_filename):
+        return False
+    return not os.path.exists(input_filename) or os.path.getmtime(manifest_filename) >= os.path.getmtime(input_filename)
+
+
+def iterate_pulled_entity_details(purview_account_short_name: str, entity_type: str, snapshot_name: str = "pulled_entities"):
+    """
+    Yields the pulled entities of one type for a Purview account.
+
+    The streamed snapshot is read lazily when it is the most recent pull, so only the requested type
+    is read. Otherwise the "<account>_<snapshot_name>.json" file is loaded and its section for the type is yielded.
+
+    Parameters:
+        purview_account_short_name (str): The short name of the Purview account.
+        entity_type (str): The name of the entity type, ie. "sap_s4hana_table".
+        snapshot_name (str, optional): "pulled_entities" or "pulled_lineage_connections".
+
+    Yields:
+        dict: Each "all_entity_details" entry ({"guid", "entity", "columns"}).
+    """
+    snapshot_directory = get_snapshot_directory(purview_account_short_name, snapshot_name)
+    if is_streamed_snapshot_newest(snapshot_directory):
+        yield from iterate_snapshot_entities(snapshot_directory, entity_type)
+        return
+
+    with open(snapshot_directory + ".json", "r", encoding="utf-8") as json_file:
+        pulled_entities = json.load(json_file)
+    all_entities_with_type = find_snapshot_entity_type(pulled_entities, entity_type) or {}
+    yield from all_entities_with_type.get("all_entity_details", [])
+
+
+def iterate_pulled_entity_types(purview_account_short_name: str, snapshot_name: str = "pulled_entities"):
+    """
+    Yields every pulled entity type of a Purview account with a lazy iterator over its entities.
+
+    The JSON snapshot, when it is the most recent pull, is only loaded once.
+
+    Parameters:
+        purview_account_short_name (str): The short name of the Purview account.
+        snapshot_name (str, optional): "pulled_entities" or "pulled_lineage_connections".
+
+    Yields:
+        tuple: The entity type and an iterable of its "all_entity_details" entries.
+    """
+    snapshot_directory = get_snapshot_directory(purview_account_short_name, snapshot_name)
+    streamed = is_streamed_snapshot_newest(snapshot_directory)
+    if streamed:
+        snapshot = load_snapshot_manifest(snapshot_directory)
+    else:
+        with open(snapshot_directory + ".json", "r", encoding="utf-8") as json_file:
+            snapshot = json.load(json_file)
+
+    sections = list(snapshot.get("lineage_connections", {}).items())
+    for entity_types in snapshot.get("data_sources", {}).values():
+        sections.extend(entity_types.items())
+    for entity_type, section in sections:
+        if streamed:
+            yield entity_type, iterate_snapshot_entities(snapshot_directory, entity_type)
+        else:
+            yield entity_type, section.get("all_entity_details", [])
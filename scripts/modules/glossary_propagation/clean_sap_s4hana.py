@@ -7,7 +7,8 @@ from pyapacheatlas.core import AtlasEntity ,AtlasClassification
 from pyapacheatlas.core.entity import AtlasEntity, AtlasProcess
 from pyapacheatlas.core.typedef import EntityTypeDef, AtlasAttributeDef
 from pyapacheatlas.readers import ExcelConfiguration,ExcelReader
-from utils import get_credentials,create_purview_client
+from utils import get_credentials,create_purview_client, LazyPurviewClient
+from modules.entity import delete_entities_by_qualified_names, bulk_delete_entities
 from pyapacheatlas.core.glossary import *
 
 # Imports
@@ -25,13 +26,11 @@ import time
 
 REFERENCE_NAME_PURVIEW = "hbi-qa01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-qa_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+qa_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 REFERENCE_NAME_PURVIEW = "hbi-pd01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-prod_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+prod_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 def fetch_display_name(file_path):
 	with open(file_path, 'r') as file:
@@ -44,82 +43,29 @@ def fetch_display_name(file_path):
 			return Display_Text
 	
 
+def delete_with_retries(client,type_name,qualified_names,attempts):
+	# Resolves the qualified names in bulk and deletes them in GUID batches.
+	# Batches that fail, ie. a parent whose children are in a later batch, are retried.
+	result=delete_entities_by_qualified_names(client,type_name,qualified_names)
+	print(result['not_found'])
+	Failed_Guids=result['failed']
+	for attempt in range(attempts-1):
+		if len(Failed_Guids)==0:
+			break
+		Failed_Guids=bulk_delete_entities(client,Failed_Guids)['failed']
+	print(Failed_Guids)
+
 def delete_SAP_S4_Hana_Packages(client,qualified_name,type_name):
 	Display_Text=fetch_display_name('SAP_S4_Hana_Packages.json')
-	Failed_Display_Text=[]
-	for i in Display_Text:
-		try:
-			fully_qualified_name=qualified_name+i
-			client.delete_entity(qualifiedName=fully_qualified_name, typeName=type_name)
-		except:
-			Failed_Display_Text.append(i)
-
-	Failed_Display_Text_two=[]
-	for i in Failed_Display_Text:
-		try:
-			fully_qualified_name=qualified_name+i
-			client.delete_entity(qualifiedName=fully_qualified_name, typeName=type_name)
-		except:
-			Failed_Display_Text_two.append(i)
-	print(Failed_Display_Text_two)
+	delete_with_retries(client,type_name,[qualified_name+i for i in Display_Text],2)
 
 def delete_SAP_S4_Hana_Sub_Application_Components(client,qualified_name,type_name):
 	Display_Text=fetch_display_name('SAP_S4_Hana_Sub_Application_Components.json')
-	Failed_Display_Text=[]
-	for i in Display_Text:
-		try:
-			fully_qualified_name=qualified_name+i
-			client.delete_entity(qualifiedName=fully_qualified_name, typeName=type_name)
-		except:
-			Failed_Display_Text.append(i)
-	print(Failed_Display_Text)
-
-	Failed_Display_Text_two=[]
-	for i in Failed_Display_Text:
-		try:
-			fully_qualified_name=qualified_name+i
-			client.delete_entity(qualifiedName=fully_qualified_name, typeName=type_name)
-		except:
-			Failed_Display_Text_two.append(i)
-	print(Failed_Display_Text_two)
-
-	Failed_Display_Text_three=[]
-	for i in Failed_Display_Text_two:
-		try:
-			fully_qualified_name=qualified_name+i
-			client.delete_entity(qualifiedName=fully_qualified_name, typeName=type_name)
-		except:
-			Failed_Display_Text_three.append(i)
-	print(Failed_Display_Text_three)
+	delete_with_retries(client,type_name,[qualified_name+i for i in Display_Text],3)
 
 def delete_SAP_S4_Hana_Application_Components(client,qualified_name,type_name):
 	Display_Text=fetch_display_name('SAP_S4_Hana_Application_Components.json')
-	Failed_Display_Text=[]
-	for i in Display_Text:
-		try:
-			fully_qualified_name=qualified_name+i
-			client.delete_entity(qualifiedName=fully_qualified_name, typeName=type_name)
-		except:
-			Failed_Display_Text.append(i)
-	print(Failed_Display_Text)
-
-	Failed_Display_Text_two=[]
-	for i in Failed_Display_Text:
-		try:
-			fully_qualified_name=qualified_name+i
-			client.delete_entity(qualifiedName=fully_qualified_name, typeName=type_name)
-		except:
-			Failed_Display_Text_two.append(i)
-	print(Failed_Display_Text_two)
-
-	Failed_Display_Text_three=[]
-	for i in Failed_Display_Text_two:
-		try:
-			fully_qualified_name=qualified_name+i
-			client.delete_entity(qualifiedName=fully_qualified_name, typeName=type_name)
-		except:
-			Failed_Display_Text_three.append(i)
-	print(Failed_Display_Text_three)
+	delete_with_retries(client,type_name,[qualified_name+i for i in Display_Text],3)
 
             
 
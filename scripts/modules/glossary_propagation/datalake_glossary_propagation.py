@@ -87,18 +87,14 @@ def glossary_propagation_of_datalake(client, purview_acct_short_name):
     # RUN BELOW FOR REFRESHED PULL OF PROD INSTANCES
     #pull_prod_entities_from_purview("prod", "hbi-pd01-datamgmt-pview", client)
 
-    input_filename = purview_acct_short_name + "_pulled_entities.json"
-    pulled_entities = {}
-    with open(input_filename, "r", encoding="utf-8") as json_file:
-        pulled_entities = json.load(json_file)
-
     glossary_terms_dict = get_glossary_terms_dict()
     directory = 'outputs/glossary_propagation_outputs/datalake_outputs/' + purview_acct_short_name
     output_file_path = purview_acct_short_name + "_datalake_glossary_propagation_results"
     os.makedirs(directory, exist_ok=True) # Create the directory if it doesn't exist
     output_file_path = os.path.join(directory, output_file_path)
 
-    datalake_resource_set_entities = pulled_entities.get("data_sources").get("azure_datalake_gen2").get("azure_datalake_gen2_resource_set").get("all_entity_details")
+    # Every glossary term walks all of the resource sets again, so they are kept in memory
+    datalake_resource_set_entities = list(iterate_projected_entity_details(purview_acct_short_name, "azure_datalake_gen2_resource_set"))
 
     with open(output_file_path, 'w') as file:
         file.flush()
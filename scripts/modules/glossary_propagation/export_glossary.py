@@ -7,7 +7,7 @@ from pyapacheatlas.core import AtlasEntity ,AtlasClassification
 from pyapacheatlas.core.entity import AtlasEntity, AtlasProcess
 from pyapacheatlas.core.typedef import EntityTypeDef, AtlasAttributeDef
 from pyapacheatlas.readers import ExcelConfiguration,ExcelReader
-from utils import get_credentials,create_purview_client
+from utils import get_credentials,create_purview_client, LazyPurviewClient
 from pyapacheatlas.core.glossary import *
 
 # Imports
@@ -25,13 +25,11 @@ from datetime import date
 
 REFERENCE_NAME_PURVIEW = "hbi-qa01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-qa_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+qa_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 REFERENCE_NAME_PURVIEW = "hbi-pd01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-prod_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+prod_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 
 def glossary_terms_details(client):
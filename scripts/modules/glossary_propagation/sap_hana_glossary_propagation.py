@@ -7,6 +7,8 @@
 from utils import get_credentials, create_purview_client
 from modules.entity import *
 from modules.glossary_propagation.shared_glossary_functions import *
+from modules.request_governor import CircuitOpenError
+from modules.job_deadline import DeadlineExceededError, job_deadline, load_job_checkpoint, write_job_checkpoint, clear_job_checkpoint
 
 
 # Package Imports
@@ -54,7 +56,7 @@ def delete_glossary_terms_from_all_sap_hana_tables(client):
         delete_term_from_entity_and_columns(view_guid)
 
 
-def apply_glossary_terms_and_write_output_of_sap_hana(client, file, updated_dict_for_string_matches, updated_dict_for_guids_of_a_glossary_term, start, end):
+def apply_glossary_terms_and_write_output_of_sap_hana(client, file, updated_dict_for_string_matches, updated_dict_for_guids_of_a_glossary_term, start, end, job_name = "sap_hana_glossary_propagation"):
     '''
     Apply glossary terms to SAP HANA views, write output to a file, and log the results.
 
@@ -65,9 +67,13 @@ def apply_glossary_terms_and_write_output_of_sap_hana(client, file, updated_dict
         updated_dict_for_guids_of_a_glossary_term (dict): Dictionary with glossary term names as keys and lists of GUIDs.
         start (int): Start index for glossary term propagation.
         end (int): End index for glossary term propagation.
+        job_name (str, optional): The name of the checkpoint written when the run is stopped.
 
     Returns:
         file: Updated file object.
+
+    If the job's deadline passes, or the glossary circuit breaker opens, the loop stops and writes a
+    checkpoint holding the glossary term number to start the next run from.
     '''
     count = 0
     for glossary_term_name, list_of_guids in updated_dict_for_guids_of_a_glossary_term.items():
@@ -88,6 +94,8 @@ def apply_glossary_terms_and_write_output_of_sap_hana(client, file, updated_dict
                     try:
                         applied_result = client.glossary.assignTerm(entities = upload_formatted_list, termName = glossary_term_name)
                         print(applied_result)
+                    except (CircuitOpenError, DeadlineExceededError):
+                        raise
                     except Exception as x:
                         print(f"{x}")
                     assignment_str = "Assigned glossary term, " + glossary_term_name + ", to " + str(len(unique_guids)) + " entities\n"
@@ -101,6 +109,10 @@ def apply_glossary_terms_and_write_output_of_sap_hana(client, file, updated_dict
                         file.write("   " + column_name + "\n")
                     file.write("\n")
                     print()
+                except (CircuitOpenError, DeadlineExceededError) as e:
+                    file.write("Stopped before glossary term number " + str(count) + ": " + str(e) + "\n")
+                    write_job_checkpoint(job_name, {"start": count, "end": end}, str(e))
+                    return file
                 except Exception as e:
                     file.write(f"{e}\n\n")
                     file.write("Error with a guid for glossary term: " + glossary_term_name + "\n\n")
@@ -111,6 +123,7 @@ def apply_glossary_terms_and_write_output_of_sap_hana(client, file, updated_dict
                 print(count_str + "\n" + assignment_str)
                 file.write(count_str + "\n" + assignment_str)
             
+    clear_job_checkpoint(job_name)
     return file
 
 
@@ -120,7 +133,7 @@ def prepare_for_propagation_of_sap_hana(client, sap_hana_view_details, file, sta
 
     Args:
         client: The Purview Atlas client for glossary term propagation.
-        sap_hana_view_details (list): List of SAP HANA view entities.
+        sap_hana_view_details (iterable): SAP HANA view entities.
         file: File object for writing the output log.
         start (int): Start index for glossary term propagation.
         end (int): End index for glossary term propagation.
@@ -165,14 +178,16 @@ def glossary_propagation_of_sap_hana(client, purview_acct_short_name, import_fil
     # pull_entities_from_purview("prod", "hbi-pd01-datamgmt-pview", prod_client)
 
     short_name = purview_acct_short_name
-    input_filename = short_name + "_pulled_entities.json"
-    pulled_entities = {}
-    with open(input_filename, "r", encoding="utf-8") as json_file:
-        pulled_entities = json.load(json_file)
 
     # NOTE: HARDCODING
     start = 0 
     end = 716
+
+    # Carry on from the glossary term a run stopped by an outage or its deadline got to
+    job_name = "sap_hana_glossary_propagation_" + short_name
+    checkpoint = load_job_checkpoint(job_name)
+    if checkpoint is not None and checkpoint.get("end") == end:
+        start = checkpoint["start"]
     output_file_path = str(start) + "_to_" + str(end) + "_" + short_name + "_sap_hana_glossary_propagation_results.txt"
     # NOTE: HARDCODING
     #output_file_path = "451_to_500_qa_sap_hana_glossary_propagation_results.txt"
@@ -181,8 +196,8 @@ def glossary_propagation_of_sap_hana(client, purview_acct_short_name, import_fil
     os.makedirs(directory, exist_ok=True) # Create the directory if it doesn't exist
     output_file_path = os.path.join(directory, output_file_path)
 
-    sap_hana_view_details = pulled_entities.get("data_sources").get("sap_hana").get("sap_hana_view").get("all_entity_details")
-    with open(output_file_path, 'w') as file:
+    sap_hana_view_details = iterate_projected_entity_details(short_name, "sap_hana_view")
+    with open(output_file_path, 'w') as file, job_deadline(job_name):
         file.flush()
         file_and_dicts = prepare_for_propagation_of_sap_hana(client, sap_hana_view_details, file, start, end, import_file_name)
         file = file_and_dicts[0]
@@ -191,7 +206,7 @@ def glossary_propagation_of_sap_hana(client, purview_acct_short_name, import_fil
         
         # hardcoded to only prop certain glossary term numbers
         # MODIFY HARDCODED NUMBERS
-        file = apply_glossary_terms_and_write_output_of_sap_hana(client, file, updated_dict_for_string_matches,updated_dict_for_guids_of_a_glossary_term, start, end)
+        file = apply_glossary_terms_and_write_output_of_sap_hana(client, file, updated_dict_for_string_matches,updated_dict_for_guids_of_a_glossary_term, start, end, job_name)
         file.flush()
         file.close()
         print("Propagation across SAP HANA in " + short_name + " is complete\n\n")
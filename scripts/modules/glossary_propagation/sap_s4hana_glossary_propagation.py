@@ -7,6 +7,8 @@
 from utils import get_credentials, create_purview_client
 from modules.entity import *
 from modules.glossary_propagation.shared_glossary_functions import *
+from modules.request_governor import CircuitOpenError
+from modules.job_deadline import DeadlineExceededError, job_deadline, load_job_checkpoint, write_job_checkpoint, clear_job_checkpoint
 
 
 # Package Imports
@@ -32,7 +34,7 @@ import pandas as pd
 # Functions
 # ---------------
 
-def apply_glossary_terms_and_write_output_of_sap_s4hana(client, file, updated_dict_for_string_matches, updated_dict_for_guids_of_a_glossary_term, start, end):
+def apply_glossary_terms_and_write_output_of_sap_s4hana(client, file, updated_dict_for_string_matches, updated_dict_for_guids_of_a_glossary_term, start, end, job_name = "sap_s4hana_glossary_propagation"):
     '''
     Apply glossary terms to SAP S/4HANA views and tables, write output to a file, and log the results.
 
@@ -43,9 +45,13 @@ def apply_glossary_terms_and_write_output_of_sap_s4hana(client, file, updated_di
         updated_dict_for_guids_of_a_glossary_term (dict): Dictionary with glossary term names as keys and lists of GUIDs.
         start (int): Start index for glossary term propagation.
         end (int): End index for glossary term propagation.
+        job_name (str, optional): The name of the checkpoint written when the run is stopped.
 
     Returns:
         file: Updated file object.
+
+    If the job's deadline passes, or the glossary circuit breaker opens, the loop stops and writes a
+    checkpoint holding the glossary term number to start the next run from.
     '''
     count = 0
     for glossary_term_name, list_of_guids in updated_dict_for_guids_of_a_glossary_term.items():
@@ -73,6 +79,10 @@ def apply_glossary_terms_and_write_output_of_sap_s4hana(client, file, updated_di
                         file.write("   " + column_name + "\n")
                     file.write("\n")
                     print()
+                except (CircuitOpenError, DeadlineExceededError) as e:
+                    file.write("Stopped before glossary term number " + str(count) + ": " + str(e) + "\n")
+                    write_job_checkpoint(job_name, {"start": count, "end": end}, str(e))
+                    return file
                 except:
                     file.write("Error with a guid for glossary term: " + glossary_term_name + "\n\n")
                     print("Error with a guid for glossary term: " + glossary_term_name + "\n")
@@ -81,6 +91,7 @@ def apply_glossary_terms_and_write_output_of_sap_s4hana(client, file, updated_di
                 print(count_str + "\n" + assignment_str)
                 file.write(count_str + "\n" + assignment_str)
             
+    clear_job_checkpoint(job_name)
     return file
 
 
@@ -90,8 +101,8 @@ def prepare_for_propagation_of_sap_s4hana(client, sap_s4hana_view_details, sap_s
 
     Args:
         client: The Purview Atlas client for glossary term propagation.
-        sap_s4hana_view_details (list): List of SAP S/4HANA view entities.
-        sap_s4hana_table_details (list): List of SAP S/4HANA table entities.
+        sap_s4hana_view_details (iterable): SAP S/4HANA view entities.
+        sap_s4hana_table_details (iterable): SAP S/4HANA table entities.
         file: File object for writing the output log.
         start (int): Start index for glossary term propagation.
         end (int): End index for glossary term propagation.
@@ -150,24 +161,26 @@ def glossary_propagation_of_sap_s4hana(client, purview_acct_short_name, import_f
     # pull_entities_from_purview("prod", "hbi-pd01-datamgmt-pview", CLIENT)
 
     short_name = purview_acct_short_name
-    input_filename = short_name + "_pulled_entities.json"
-    pulled_entities = {}
-    with open(input_filename, "r", encoding="utf-8") as json_file:
-        pulled_entities = json.load(json_file)
 
     # NOTE: HARDCODING
     start = 651
     end = 716
+
+    # Carry on from the glossary term a run stopped by an outage or its deadline got to
+    job_name = "sap_s4hana_glossary_propagation_" + short_name
+    checkpoint = load_job_checkpoint(job_name)
+    if checkpoint is not None and checkpoint.get("end") == end:
+        start = checkpoint["start"]
     output_file_path = str(start) + "_to_" + str(end) + "_" + short_name + "_sap_s4hana_glossary_propagation_results.txt"
    
     directory = "glossary_propagation_outputs/sap_s4hana_outputs/" + short_name
     os.makedirs(directory, exist_ok=True) # Create the directory if it doesn't exist
     output_file_path = os.path.join(directory, output_file_path)
 
-    sap_s4hana_view_details = pulled_entities.get("data_sources").get("sap_s4hana").get("sap_s4hana_view").get("all_entity_details")
-    sap_s4hana_table_details = pulled_entities.get("data_sources").get("sap_s4hana").get("sap_s4hana_table").get("all_entity_details")
+    sap_s4hana_view_details = iterate_projected_entity_details(short_name, "sap_s4hana_view")
+    sap_s4hana_table_details = iterate_projected_entity_details(short_name, "sap_s4hana_table")
 
-    with open(output_file_path, 'w') as file:
+    with open(output_file_path, 'w') as file, job_deadline(job_name):
         file.flush()
         file_and_dicts = prepare_for_propagation_of_sap_s4hana(client, sap_s4hana_view_details, sap_s4hana_table_details, file, start, end, import_file_name)
         file = file_and_dicts[0]
@@ -176,7 +189,7 @@ def glossary_propagation_of_sap_s4hana(client, purview_acct_short_name, import_f
         
         # hardcoded to only prop certain glossary term numbers
         # MODIFY HARDCODED NUMBERS
-        file = apply_glossary_terms_and_write_output_of_sap_s4hana(client, file, merged_string_matches, merged_guids, start, end)
+        file = apply_glossary_terms_and_write_output_of_sap_s4hana(client, file, merged_string_matches, merged_guids, start, end, job_name)
         file.flush()
         file.close()
         print("Propagation across SAP S4HANA tables and views in " + short_name + " is complete\n\n")
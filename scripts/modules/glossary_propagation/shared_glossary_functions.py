@@ -6,6 +6,8 @@
 
 from utils import get_credentials, create_purview_client
 from modules.entity import *
+from modules.entity_snapshot import *
+from modules.columnar_snapshot import iterate_projected_entity_details
 
 # Package Imports
 # ---------------
@@ -249,7 +251,7 @@ def propagate_glossary_term_by_specific_entity_type_and_return_string(all_entity
     Propagates a glossary term to entities of a specific type and returns relevant information.
 
     Parameters:
-        all_entity_details (list): List of entity details.
+        all_entity_details (iterable): Entity details, ie. from iterate_projected_entity_details.
         client (object): The Purview client object.
         glossary_term_name (str): The name of the glossary term.
         fields (list): List of fields related to the glossary term.
@@ -426,7 +428,7 @@ def propagate_all_glossary_terms_across_specific_entity_type(client, all_entity_
 
     Parameters:
         client (object): The Purview client object.
-        all_entity_details (list): List of entity details.
+        all_entity_details (iterable): Entity details, ie. from iterate_projected_entity_details.
         column_type_name (str): The type of column.
         glossary_dict_with_fields_as_keys (dict): Dictionary with field names as keys and glossary term names as values.
         dict_for_string_matches (dict): Dictionary for storing string matches during propagation.
@@ -520,12 +522,7 @@ def pull_sap_s4hana_table_columns_without_glossary_terms(purview_acct_short_name
     Returns:
         None
     '''
-    input_filename = purview_acct_short_name + "_pulled_entities.json"
-    pulled_entities = {}
-    with open(input_filename, "r", encoding="utf-8") as json_file:
-        pulled_entities = json.load(json_file)
-
-    sap_s4hana_table_details = pulled_entities.get("data_sources").get("sap_s4hana").get("sap_s4hana_table").get("all_entity_details")
+    sap_s4hana_table_details = iterate_projected_entity_details(purview_acct_short_name, "sap_s4hana_table")
 
     for table in sap_s4hana_table_details:
         if table.get("entity").get("attributes").get("name") == table_name:
@@ -578,12 +575,7 @@ def pull_sap_s4hana_columns_of_table(purview_acct_short_name, table_name):
     Returns:
         None
     '''
-    input_filename = purview_acct_short_name + "_pulled_entities.json"
-    pulled_entities = {}
-    with open(input_filename, "r", encoding="utf-8") as json_file:
-        pulled_entities = json.load(json_file)
-
-    sap_s4hana_table_details = pulled_entities.get("data_sources").get("sap_s4hana").get("sap_s4hana_table").get("all_entity_details")
+    sap_s4hana_table_details = iterate_projected_entity_details(purview_acct_short_name, "sap_s4hana_table")
 
     for table in sap_s4hana_table_details:
         if table.get("entity").get("attributes").get("name") == table_name:
@@ -623,12 +615,7 @@ def pull_s4_table_columns():
     print()
     
     client = CLIENT
-    input_filename = "qa_pulled_entities.json"
-    qa_pulled_entities = {}
-    with open(input_filename, "r", encoding="utf-8") as json_file:
-        qa_pulled_entities = json.load(json_file)
-
-    sap_s4hana_table_details = qa_pulled_entities.get("data_sources").get("sap_s4hana").get("sap_s4hana_table").get("all_entity_details")
+    sap_s4hana_table_details = iterate_projected_entity_details("qa", "sap_s4hana_table")
     sought_table = "KNVV"
 
     for table in sap_s4hana_table_details:
@@ -43,11 +43,6 @@ def glossary_propagation_azure_dw(client, purview_acct_short_name):
     Returns:
     - None: Outputs results to files, detailing the glossary term propagation.
     """
-    input_filename = purview_acct_short_name + "_pulled_entities.json"
-    pulled_entities = {}
-    with open(input_filename, "r", encoding="utf-8") as json_file:
-        pulled_entities = json.load(json_file)
-
     # use the new regex sheet, extract the glossary term name and regex 
     file_path = "1_to_500_Glossary_with_Field_Duplicates_at_End_10.2.23.xlsx"
     glossary_terms_sheet = pd.read_excel(file_path)
@@ -64,7 +59,8 @@ def glossary_propagation_azure_dw(client, purview_acct_short_name):
     os.makedirs(directory, exist_ok=True) # Create the directory if it doesn't exist
     output_file_path = os.path.join(directory, output_file_path)
 
-    sql_dw_table_entities = pulled_entities.get("data_sources").get("azure_sql_dw").get("azure_sql_dw_table").get("all_entity_details")
+    # Every glossary term walks all of the tables again, so they are kept in memory
+    sql_dw_table_entities = list(iterate_projected_entity_details(purview_acct_short_name, "azure_sql_dw_table"))
 
     with open(output_file_path, 'w') as file:
         file.flush()
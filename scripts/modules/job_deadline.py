@@ -0,0 +1,157 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import contextlib
+import contextvars
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+# Constants
+# ---------------
+
+# Set to a number of seconds to give every job run through job_deadline a deadline by default
+JOB_DEADLINE_SECONDS = float(os.environ.get("PURVIEW_JOB_DEADLINE_SECONDS") or 0) or None
+
+# Checkpoints are written to <job name>_checkpoint.json in the working directory
+JOB_CHECKPOINT_SUFFIX = "_checkpoint.json"
+
+
+# Global
+# ---------------
+
+# The deadline of the running job. Each job sees only its own, so jobs that overlap in one process do not
+# reset each other's, and JobThreadPoolExecutor carries it into the threads a job starts.
+current_job_deadline = contextvars.ContextVar("current_job_deadline", default=None)
+
+
+# Classes
+# ---------------
+
+class DeadlineExceededError(Exception):
+    """
+    Raised instead of making a Purview call once the deadline of the running job has passed.
+    """
+    def __init__(self, job_name: str, seconds: float):
+        super().__init__(f"The {seconds:g}s deadline of {job_name} has passed.")
+        self.job_name = job_name
+        self.seconds = seconds
+
+
+class JobDeadline:
+    """
+    The time budget of one job, which every Purview call made while it runs is checked against.
+    """
+    def __init__(self, job_name: str, seconds: float):
+        """
+        Args:
+            job_name (str): The name of the job, used for its checkpoint file.
+            seconds (float): The budget of the job.
+        """
+        self.job_name = job_name
+        self.seconds = float(seconds)
+        self.expires_on = time.monotonic() + self.seconds
+
+    def get_remaining_seconds(self):
+        return max(0.0, self.expires_on - time.monotonic())
+
+    def check(self):
+        """
+        Raises DeadlineExceededError when the budget is spent.
+        """
+        if time.monotonic() >= self.expires_on:
+            raise DeadlineExceededError(self.job_name, self.seconds)
+
+
+class JobThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    A ThreadPoolExecutor whose tasks run with the job deadline of the code that submitted them, so the calls
+    a job makes from a thread pool are checked against its deadline.
+    """
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+# Functions
+# ---------------
+
+@contextlib.contextmanager
+def job_deadline(job_name: str, seconds: float = JOB_DEADLINE_SECONDS):
+    """
+    Gives the calls made inside the block a shared deadline. Once it passes, governed clients raise
+    DeadlineExceededError instead of calling Purview, stop retrying and cut their request timeouts
+    to the time left, so the job can write a checkpoint and stop.
+
+    Parameters:
+        job_name (str): The name of the job.
+        seconds (float, optional): The budget of the job. Defaults to $PURVIEW_JOB_DEADLINE_SECONDS, no deadline when unset.
+
+    Yields:
+        JobDeadline or None: The deadline of the job.
+    """
+    deadline = JobDeadline(job_name, seconds) if seconds else None
+    token = current_job_deadline.set(deadline) if deadline is not None else None
+    try:
+        yield deadline
+    finally:
+        if token is not None:
+            current_job_deadline.reset(token)
+
+
+def get_remaining_seconds():
+    """
+    Returns the seconds left before the deadline of the running job, or None when there is no deadline.
+    """
+    deadline = current_job_deadline.get()
+    return None if deadline is None else deadline.get_remaining_seconds()
+
+
+def check_job_deadline():
+    """
+    Raises DeadlineExceededError when the deadline of the running job has passed.
+    """
+    deadline = current_job_deadline.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def get_checkpoint_filename(job_name: str):
+    return job_name + JOB_CHECKPOINT_SUFFIX
+
+
+def write_job_checkpoint(job_name: str, checkpoint: dict, reason: str = None):
+    """
+    Writes where a job stopped, so the next run can carry on from there.
+
+    Parameters:
+        job_name (str): The name of the job.
+        checkpoint (dict): What the job needs to resume, ie. {"start": 120}.
+        reason (str, optional): Why the job stopped.
+    """
+    with open(get_checkpoint_filename(job_name), "w", encoding="utf-8") as json_file:
+        json.dump({"job_name": job_name, "stopped_on": datetime.now().strftime("%m/%d/%Y %H:%M"), "reason": reason, "checkpoint": checkpoint}, json_file, indent=3)
+    print(f'Stopped {job_name}: {reason}. Checkpoint written to "{get_checkpoint_filename(job_name)}".')
+
+
+def load_job_checkpoint(job_name: str):
+    """
+    Returns the checkpoint a job last wrote, or None.
+    """
+    try:
+        with open(get_checkpoint_filename(job_name), "r", encoding="utf-8") as json_file:
+            return json.load(json_file).get("checkpoint")
+    except (OSError, ValueError):
+        return None
+
+
+def clear_job_checkpoint(job_name: str):
+    """
+    Removes the checkpoint of a job once it has run to the end.
+    """
+    if os.path.exists(get_checkpoint_filename(job_name)):
+        os.remove(get_checkpoint_filename(job_name))
@@ -0,0 +1,136 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import importlib
+import re
+import threading
+from pathlib import Path
+
+
+# Constants
+# ---------------
+
+MODULES_PATH = Path(__file__).resolve().parent
+
+# Top-level functions and classes, found without importing the file
+PUBLIC_DEFINITION_PATTERN = re.compile(r"^(?:async\s+)?(?:def|class)\s+([A-Za-z]\w*)", re.MULTILINE)
+
+# Files that are not searched for modules.<function>: the utils.py copies, scratch files and entry points
+EXCLUDED_FILENAMES = {"utils.py", "test.py", "__init__.py", "lazy_loading.py"}
+EXCLUDED_NAMES = {"main"}
+
+
+# Global
+# ---------------
+
+# function or class name -> the dotted name of the submodule that defines it, see get_function_index
+function_index = None
+function_index_lock = threading.Lock()
+
+
+# Functions
+# ---------------
+
+def get_module_filename(module_name: str) -> Path:
+    """
+    Returns the source file of a submodule of modules, ie. "modules.lineage.cube_lineage".
+    """
+    return MODULES_PATH.joinpath(*module_name.split(".")[1:]).with_suffix(".py")
+
+
+def get_module_name(filename: Path) -> str:
+    return ".".join(("modules",) + filename.relative_to(MODULES_PATH).with_suffix("").parts)
+
+
+def get_public_definitions(module_name: str):
+    """
+    Returns the names of the top-level functions and classes of a submodule, read from its source so nothing is imported.
+
+    Parameters:
+        module_name (str): The dotted name of the submodule, ie. "modules.lineage.cube_lineage".
+
+    Returns:
+        list: The names, in the order they are defined.
+    """
+    with open(get_module_filename(module_name), "r", encoding="utf-8") as source_file:
+        return PUBLIC_DEFINITION_PATTERN.findall(source_file.read())
+
+
+def get_function_index():
+    """
+    Returns the submodule that defines each function and class under modules, scanning the sources on first use.
+    Top-level modules are scanned before the subpackages, and the first definition of a name wins.
+    """
+    global function_index
+    with function_index_lock:
+        if function_index is None:
+            filenames = sorted(MODULES_PATH.glob("*.py")) + sorted(MODULES_PATH.glob("*/*.py"))
+            submodule_names = {f.stem for f in filenames} | {d.name for d in MODULES_PATH.iterdir() if d.is_dir()}
+            index = {}
+            for filename in filenames:
+                if filename.name in EXCLUDED_FILENAMES:
+                    continue
+                module_name = get_module_name(filename)
+                for name in get_public_definitions(module_name):
+                    if name not in EXCLUDED_NAMES and name not in submodule_names:
+                        index.setdefault(name, module_name)
+            function_index = index
+        return function_index
+
+
+def get_lazy_attribute(name: str):
+    """
+    Imports the submodule that defines a function or class and returns it, for modules.<name>.
+
+    Raises:
+        AttributeError: If no submodule defines the name, so the import system falls back to submodules.
+    """
+    module_name = None if name.startswith("_") else get_function_index().get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'modules' has no attribute '{name}'")
+    return getattr(importlib.import_module(module_name), name)
+
+
+def lazy_import(namespace: dict, *module_names: str):
+    """
+    Stands in for "from <module> import *" of each submodule: every top-level function and class of the
+    submodules is added to the namespace as a LazyFunction, which imports its submodule when first called.
+    As with star imports, a name defined by a later submodule replaces the one of an earlier submodule.
+
+    Parameters:
+        namespace (dict): The globals() of the importing module.
+        *module_names (str): The dotted names of the submodules, ie. "modules.lineage.cube_lineage".
+    """
+    for module_name in module_names:
+        for name in get_public_definitions(module_name):
+            namespace[name] = LazyFunction(module_name, name)
+
+
+# Classes
+# ---------------
+
+class LazyFunction:
+    """
+    Stands in for a function or class of a submodule and only imports the submodule, with its dependencies,
+    when it is first called or one of its attributes is read.
+    """
+    def __init__(self, module_name: str, name: str):
+        self.module_name = module_name
+        self.name = name
+        self.target = None
+
+    def load(self):
+        if self.target is None:
+            self.target = getattr(importlib.import_module(self.module_name), self.name)
+        return self.target
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        return f"<lazy {self.module_name}.{self.name}>"
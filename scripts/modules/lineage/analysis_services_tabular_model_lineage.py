@@ -4,14 +4,7 @@
 # Import Functions
 # ---------------
 from modules import entity
-from modules.classification.test_case_generator import *
-from modules.classification.regex_generator import *
-from modules.classification.shared_generator_functions import *
-from modules.classification.classification import *
-from modules.lineage.json_payload_lineage import *
 from modules.lineage.shared_lineage_functions import *
-from modules.collection.collection_shared_functions import *
-from modules.glossary_propagation.shared_glossary_functions import *
 from modules.entity import *
 from utils import get_credentials, create_purview_client
 from pyapacheatlas.core.util import GuidTracker
@@ -105,15 +98,23 @@ def get_all_tables_from_tabular_model(client, tables, start_of_source_qualified_
     list: A list of dictionaries, each containing details of a table, including powerbi_table_name, source_schema, source_table_name, and source entity details.
     '''
     all_tables = []
-    for t in tables:
-        source_info = extract_source_schema_and_table_name(t.get("partitions"))
+    source_infos = [extract_source_schema_and_table_name(t.get("partitions")) for t in tables]
+
+    # Resolve the sources of every table of the model in bulk before building the table details
+    source_qualified_names = []
+    for source_schema, source_table_name in source_infos:
+        if source_schema != "" and source_table_name != "":
+            source_qualified_names.append(start_of_source_qualified_name + source_schema + "/" + source_table_name)
+    resolved_entities = resolve_qualified_names(client, source_qualified_names)
+
+    for source_info in source_infos:
         source_schema = source_info[0]
         source_table_name = source_info[1]
 
         if source_schema != "" and source_table_name != "":
             source_qualified_name = start_of_source_qualified_name + source_schema + "/" + source_table_name
             
-            source_entity_details = get_entity_from_qualified_name(client, source_qualified_name)
+            source_entity_details = resolved_entities.get(source_qualified_name)
             print(source_qualified_name)
             try:
                 table_details = {
@@ -3,7 +3,7 @@
 # Function Imports
 # ---------------
 
-from utils import get_credentials, create_purview_client
+from utils import get_credentials, create_purview_client, LazyPurviewClient
 from pyapacheatlas.core import AtlasEntity
 from pyapacheatlas.core.entity import AtlasEntity, AtlasProcess
 from pyapacheatlas.core.typedef import EntityTypeDef, AtlasAttributeDef
@@ -22,13 +22,11 @@ from pathlib import Path
 
 REFERENCE_NAME_PURVIEW = "hbi-qa01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-qa_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+qa_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 REFERENCE_NAME_PURVIEW = "hbi-pd01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-prod_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+prod_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 def get_all_column_from_guid(client,asset_name,source_type_name,source_guid,source_qualified_name,target_type_name,target_guid,target_qualified_name):
     """
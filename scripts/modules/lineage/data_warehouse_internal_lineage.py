@@ -6,11 +6,13 @@
 from utils import get_credentials, create_purview_client
 from modules import *
 from modules.lineage.shared_lineage_functions import *
+from modules.sql_parse_cache import parse_sql_with_cache
 
 
 # Imports
 # ---------------
 
+import os
 import re
 import sys
 from pathlib import Path
@@ -19,6 +21,22 @@ from pathlib import Path
 # Constants
 # ---------------
 
+DW_VIEWS_PATH = "inputs/BIDW/DataWarehouse/hbidw/Resources/Install/Views/"
+DW_ROUTINES_PATH = "inputs/BIDW/DataWarehouse/hbidw/Resources/Install/Routines/"
+DW_QUALIFIED_NAME_HEADER = "mssql://hbi-pd01-analytics-dwsrv.database.windows.net/hbipd01dw/"
+
+# Bump when the view or load routine parsers extract something different, so cached parses are not reused
+DW_PARSER_VERSION = "1"
+
+# The entity types data warehouse objects are resolved against, tables first
+DW_ENTITY_TYPES = ["azure_sql_dw_table", "azure_sql_dw_view"]
+
+# Load routines that do not follow the <schema>.Load<table>.sql naming, by lowercase table path
+DW_LOAD_ROUTINE_EXCEPTIONS = {
+    "common/factsales": "Common.LoadFactSalesDaily.sql",
+    "common/dimflathierarchalbom": "Common.LoadFlatHierarchalBOM.sql"
+}
+
 
 # Functions
 # ---------------
@@ -54,7 +72,7 @@ def alternate_parse_load_routine_for_data_warehouse(load_routine_file):
         return sources
     
 
-def parse_load_routine_for_data_warehouse(load_routine_file):
+def parse_load_routine_for_data_warehouse_without_cache(load_routine_file):
     '''
     Parses a data warehouse load routine SQL file to extract source paths.
 
@@ -62,7 +80,7 @@ def parse_load_routine_for_data_warehouse(load_routine_file):
     - load_routine_file (str): The file path of the data warehouse load routine SQL file.
 
     Returns:
-    list: A list of unique source paths extracted from the load routine.
+    list: A list of unique source paths extracted from the load routine, empty when it has none.
     '''
     with open(load_routine_file, 'r') as file:
         sources = []
@@ -87,11 +105,26 @@ def parse_load_routine_for_data_warehouse(load_routine_file):
         sources = [s for s in sources if '/' in s] # removes empty strings and only allows paths
         if len(sources) == 0:
             print("No stage sources for this table.")
-            sys.exit(0)
 
         return sources
 
 
+def parse_load_routine_for_data_warehouse(load_routine_file):
+    '''
+    Returns the source paths of a data warehouse load routine SQL file, parsed once per file content
+    and then read from the SQL parse cache.
+
+    Parameters:
+    - load_routine_file (str): The file path of the data warehouse load routine SQL file.
+
+    Returns:
+    list: A list of unique source paths extracted from the load routine, empty when it has none.
+    '''
+    with open(load_routine_file, 'r') as file:
+        sql_query = file.read()
+    return parse_sql_with_cache("dw_load_routine", DW_PARSER_VERSION, sql_query,
+                                lambda: parse_load_routine_for_data_warehouse_without_cache(load_routine_file))
+
 
 def alternate_parse_view_for_data_warehouse(view_file):
     '''
@@ -124,7 +157,7 @@ def alternate_parse_view_for_data_warehouse(view_file):
         return sources
 
 
-def parse_view_for_data_warehouse(view_file):
+def parse_view_for_data_warehouse_without_cache(view_file):
     '''
     Parses a data warehouse view SQL file to extract source paths.
 
@@ -132,7 +165,7 @@ def parse_view_for_data_warehouse(view_file):
     - view_file (str): The file path of the data warehouse view SQL file.
 
     Returns:
-    list: A list of unique source paths extracted from the view.
+    list: A list of unique source paths extracted from the view, empty when it has none.
     '''
     with open(view_file, 'r') as file:
         sources = []
@@ -153,13 +186,57 @@ def parse_view_for_data_warehouse(view_file):
         sources = [s for s in sources if '/' in s] # removes empty strings and only allows paths
         if len(sources) == 0:
             print("No sources for this view.")
-            sys.exit(0)
 
         print(sources)
 
         return sources
     
 
+def parse_view_for_data_warehouse(view_file):
+    '''
+    Returns the source paths of a data warehouse view SQL file, parsed once per file content
+    and then read from the SQL parse cache.
+
+    Parameters:
+    - view_file (str): The file path of the data warehouse view SQL file.
+
+    Returns:
+    list: A list of unique source paths extracted from the view, empty when it has none.
+    '''
+    with open(view_file, 'r') as file:
+        sql_query = file.read()
+    return parse_sql_with_cache("dw_view", DW_PARSER_VERSION, sql_query,
+                                lambda: parse_view_for_data_warehouse_without_cache(view_file))
+
+
+def get_load_routine_file_name(table: str):
+    '''
+    Returns the file name of the load routine of a data warehouse table.
+
+    Parameters:
+    - table (str): The path of the table, ie. "Common/DimProduct".
+
+    Returns:
+    str: The file name, ie. "Common.LoadDimProduct.sql".
+    '''
+    split_table = table.split("/")
+    if table.lower() in DW_LOAD_ROUTINE_EXCEPTIONS:
+        return DW_LOAD_ROUTINE_EXCEPTIONS[table.lower()]
+    elif table.lower().startswith("master"):
+        return "master.load_" + split_table[1] + ".sql"
+    elif table.lower().startswith("dbo"):
+        return "dbo.load_" + split_table[1] + ".sql"
+    return split_table[0] + ".Load" + split_table[1] + ".sql"
+
+
+def is_data_warehouse_view(path: str):
+    '''
+    Checks whether a data warehouse object path, ie. "Inventory/vwDimProduct", names a view.
+    '''
+    name = path.split("/")[-1].lower()
+    return name.startswith("mvw") or name.startswith("vw")
+
+
 def build_table_to_source_data_warehouse_internal_lineage(client, qualified_name_header, table, source):
     '''
     Builds internal lineage from a source to a table in a data warehouse.
@@ -214,62 +291,45 @@ def build_stage_to_common_data_warehouse_internal_lineage(client, qualified_name
 
 def prod_parse_data_warehouse_view_internal_lineage(client, view_file_name):
     '''
-    Parses a data warehouse view file to establish internal lineage relationships.
+    Parses a data warehouse view file, the views it reads and the load routines of the tables it reads,
+    and establishes their internal lineage relationships. Each file is parsed, and each connection uploaded, once.
 
     Parameters:
     - client: The client object for interacting with the metadata repository.
     - view_file_name (str): The name of the data warehouse view file.
 
     Returns:
-    None    
+    dict: The run, see DataWarehouseLineageGraph.build_lineage.
     '''
     try:
-        views_path = "inputs/BIDW/DataWarehouse/hbidw/Resources/Install/Views/"
-        routines_path = "inputs/BIDW/DataWarehouse/hbidw/Resources/Install/Routines/"
-        qualified_name_header = "mssql://hbi-pd01-analytics-dwsrv.database.windows.net/hbipd01dw/"
         #Example: view_file_name = "Inventory.vwDimMarketingResponsibilityHierarchy.sql"
-        view_file_path = views_path + view_file_name
-        view_purview_partial_path = view_file_name.replace(".sql", "").replace(".", "/")
-        common_sources_for_the_view = parse_view_for_data_warehouse(view_file_path)
-        print(common_sources_for_the_view)
-
-        for common_source in common_sources_for_the_view:
-            print(common_source)
-            split_common_source = common_source.split("/")
-            load_routine_file_path = routines_path + split_common_source[0] + ".Load" + split_common_source[1] + ".sql"
-            
-            if common_source == "Common/FactSales" or common_source == "common/FactSales": # ERROR IN NAMING SCHEMA FOR THIS TABLE LOAD ROUTINE
-                load_routine_file_path = routines_path + "Common.LoadFactSalesDaily.sql"
-            elif common_source == "Common/DimFlatHierarchalBOM": # ERROR IN NAMING SCHEMA FOR THIS TABLE LOAD ROUTINE
-                load_routine_file_path = routines_path + "Common.LoadFlatHierarchalBOM.sql"
-            elif common_source.lower().startswith("master"):
-                split_table = common_source.split("/")
-                load_routine_file_path = routines_path + "master.load_" + split_table[1] + ".sql"
-            elif common_source.lower().startswith("dbo"):
-                split_table = common_source.split("/")
-                load_routine_file_path = routines_path + "dbo.load_" + split_table[1] + ".sql"
-
-            if split_common_source[1].startswith("mvw") or split_common_source[1].startswith("vw"):
-                new_view_file_name = split_common_source[0] + "." + split_common_source[1] + ".sql"
-                prod_parse_data_warehouse_view_internal_lineage(client, new_view_file_name)
-                # still need to connect this to the original view
-                source_entity = get_entity_from_qualified_name(client, qualified_name_header + common_source)
-                target_entity = get_entity_from_qualified_name(client, qualified_name_header + view_purview_partial_path)
-                if source_entity.get("qualifiedName") != target_entity.get("qualifiedName"):
-                    result = add_manual_lineage(client, [source_entity], [target_entity], process_type_name = "dw_view_creation")
-                    print(result)
-            else:  
-                stage_sources_for_common = parse_load_routine_for_data_warehouse(load_routine_file_path)
-                for stage_source in stage_sources_for_common:
-                    if stage_source != common_source: # prevent loop to itself
-                        build_stage_to_common_data_warehouse_internal_lineage(client, qualified_name_header, common_source, stage_source, view_purview_partial_path)
-                
+        graph = DataWarehouseLineageGraph()
+        graph.add_view(view_file_name.replace(".sql", "").replace(".", "/"))
+        result = graph.build_lineage(client)
         print("\n\nLineage build was a success.\n\n")
+        return result
         
     except Exception as e:
         print(f"\n\nAn error occurred: {e}\n\n")   
 
 
+def build_data_warehouse_schema_lineage(client, schema: str = None):
+    '''
+    Establishes the internal lineage of every view in the BIDW views folder, or of the views of one schema.
+    Shared views and load routines are parsed once however many views read them.
+
+    Parameters:
+    - client: The client object for interacting with the metadata repository.
+    - schema (str, optional): Only the views of this schema, ie. "Inventory".
+
+    Returns:
+    dict: The run, see DataWarehouseLineageGraph.build_lineage.
+    '''
+    graph = DataWarehouseLineageGraph()
+    graph.add_all_views(schema)
+    return graph.build_lineage(client)
+
+
 def prod_parse_data_warehouse_table_internal_lineage(client, table_file_name):
     '''
     Parses a data warehouse table file to establish internal lineage relationships.
@@ -322,15 +382,217 @@ def prod_parse_data_warehouse_table_internal_lineage(client, table_file_name):
         
         load_routine_file_paths.append(load_routine_file_path)
 
-        for routine in load_routine_file_paths:
-            sources_for_table = parse_load_routine_for_data_warehouse(routine)
-            print('here')
-            for source in sources_for_table:
-                if source != table: # prevent loop to itself
-                    build_table_to_source_data_warehouse_internal_lineage(client, qualified_name_header, table, source)
+        with LineageAccumulator(client):
+            for routine in load_routine_file_paths:
+                sources_for_table = parse_load_routine_for_data_warehouse(routine)
+                print('here')
+                for source in sources_for_table:
+                    if source != table: # prevent loop to itself
+                        build_table_to_source_data_warehouse_internal_lineage(client, qualified_name_header, table, source)
         
         print("\n\nLineage build was a success.\n\n")
         
     except Exception as e:
         print(f"\n\nAn error occurred: {e}\n\n")   
 
+
+
+# Classes
+# ---------------
+
+class DataWarehouseLineageGraph:
+    '''
+    The dependency graph of the data warehouse: views read views and tables, and tables are loaded from
+    the sources of their load routine. Every SQL file is parsed once, however many views read the object it
+    defines, and each connection is kept once, so the lineage of a whole schema costs one upload per connection.
+
+    Views are connected to the objects they read with "dw_view_creation" processes, and tables read by a view
+    to the sources of their load routine with "dw_routine" processes, as prod_parse_data_warehouse_view_internal_lineage
+    always did. Cycles between views are reported, and their connections uploaded after the rest.
+    '''
+    def __init__(self, views_path: str = DW_VIEWS_PATH, routines_path: str = DW_ROUTINES_PATH):
+        '''
+        Parameters:
+        - views_path (str, optional): The folder of the view definitions.
+        - routines_path (str, optional): The folder of the load routines.
+        '''
+        self.views_path = views_path
+        self.routines_path = routines_path
+
+        # The folders are listed once, and file names are matched without case as the SQL is read in lowercase
+        self.view_files = {f.lower(): f for f in os.listdir(views_path) if f.lower().endswith(".sql")} if os.path.isdir(views_path) else {}
+        self.routine_files = {f.lower(): f for f in os.listdir(routines_path) if f.lower().endswith(".sql")} if os.path.isdir(routines_path) else {}
+
+        # Object paths are keyed in lowercase, with the path as first written kept for the qualified names
+        self.names = {}
+        self.edges = {}
+        self.parsed_objects = set()
+        self.parsed_file_count = 0
+        self.files_without_sources = []
+        self.missing_files = []
+
+    def get_key(self, path: str):
+        key = path.lower()
+        self.names.setdefault(key, path)
+        return key
+
+    def add_edge(self, source: str, target: str, process_type_name: str):
+        source_key = self.get_key(source)
+        target_key = self.get_key(target)
+        if source_key != target_key: # prevent loop to itself
+            self.edges.setdefault((source_key, target_key), process_type_name)
+
+    def parse_file(self, files: dict, path: str, file_name: str, parse_function):
+        '''
+        Parses the SQL file of an object, or reports it as missing or without sources.
+
+        Returns:
+        list: The source paths of the object.
+        '''
+        if file_name.lower() not in files:
+            self.missing_files.append(file_name)
+            return []
+        self.parsed_file_count += 1
+        sources = parse_function(os.path.join(path, files[file_name.lower()]))
+        if not sources:
+            self.files_without_sources.append(file_name)
+        return sources
+
+    def add_view(self, view: str):
+        '''
+        Adds a view, and everything it reads, to the graph.
+
+        Parameters:
+        - view (str): The path of the view, ie. "Inventory/vwDimMarketingResponsibilityHierarchy".
+        '''
+        # Upstream views are followed with a stack instead of recursion, so long chains and cycles are safe
+        views_to_parse = [view]
+        while views_to_parse:
+            view = views_to_parse.pop()
+            view_key = self.get_key(view)
+            if view_key in self.parsed_objects:
+                continue
+            self.parsed_objects.add(view_key)
+            # A view read by another view is named in lowercase, the file name has the case of the view
+            view_file_name = view.replace("/", ".") + ".sql"
+            self.names[view_key] = self.view_files.get(view_file_name.lower(), view_file_name)[:-len(".sql")].replace(".", "/")
+
+            for common_source in self.parse_file(self.view_files, self.views_path, view_file_name, parse_view_for_data_warehouse):
+                self.add_edge(common_source, view, "dw_view_creation")
+                if is_data_warehouse_view(common_source):
+                    views_to_parse.append(common_source)
+                else:
+                    self.add_table(common_source)
+
+    def add_table(self, table: str):
+        '''
+        Adds a table read by a view, and the sources of its load routine, to the graph.
+        '''
+        table_key = self.get_key(table)
+        if table_key in self.parsed_objects:
+            return
+        self.parsed_objects.add(table_key)
+        for stage_source in self.parse_file(self.routine_files, self.routines_path, get_load_routine_file_name(table), parse_load_routine_for_data_warehouse):
+            self.add_edge(stage_source, table, "dw_routine")
+
+    def add_all_views(self, schema: str = None):
+        '''
+        Adds every view in the views folder, or the views of one schema, to the graph.
+        '''
+        for view_file_name in sorted(self.view_files.values()):
+            if schema is None or view_file_name.lower().startswith(schema.lower() + "."):
+                self.add_view(view_file_name[:-len(".sql")].replace(".", "/"))
+
+    def get_cycles(self):
+        '''
+        Returns the cycles of the graph, each as the list of object paths around it.
+        '''
+        adjacency = {}
+        for source_key, target_key in self.edges:
+            adjacency.setdefault(source_key, []).append(target_key)
+
+        cycles = []
+        state = {}
+        for start in sorted(adjacency):
+            if start in state:
+                continue
+            state[start] = "visiting"
+            path = [start]
+            stack = [iter(sorted(adjacency.get(start, [])))]
+            while stack:
+                child = next(stack[-1], None)
+                if child is None:
+                    state[path.pop()] = "done"
+                    stack.pop()
+                elif state.get(child) == "visiting":
+                    cycles.append([self.names[k] for k in path[path.index(child):] + [child]])
+                elif child not in state:
+                    state[child] = "visiting"
+                    path.append(child)
+                    stack.append(iter(sorted(adjacency.get(child, []))))
+        return cycles
+
+    def get_topological_order(self):
+        '''
+        Returns the objects upstream first. The objects of a cycle, and those downstream of it, come last.
+        '''
+        incoming_counts = {key: 0 for key in self.names}
+        downstream = {}
+        for source_key, target_key in self.edges:
+            incoming_counts[target_key] += 1
+            downstream.setdefault(source_key, []).append(target_key)
+
+        order = []
+        ready = sorted(k for k, count in incoming_counts.items() if count == 0)
+        while ready:
+            key = ready.pop()
+            order.append(key)
+            for target_key in downstream.get(key, []):
+                incoming_counts[target_key] -= 1
+                if incoming_counts[target_key] == 0:
+                    ready.append(target_key)
+        ordered = set(order)
+        return order + sorted(k for k in self.names if k not in ordered)
+
+    def build_lineage(self, client, qualified_name_header: str = DW_QUALIFIED_NAME_HEADER):
+        '''
+        Uploads the lineage of every connection in the graph once, upstream first, in bulk.
+
+        Parameters:
+        - client: The client object for interacting with the metadata repository.
+        - qualified_name_header (str, optional): The common prefix for generating qualified names.
+
+        Returns:
+        dict: The "edges" uploaded (the edges of LineageAccumulator), the "cycles", the "files_without_sources",
+        the "missing_files" and the "missing_entities" of the run, and the "parsed_file_count".
+        '''
+        cycles = self.get_cycles()
+        for cycle in cycles:
+            print("Cycle in the data warehouse lineage: " + " -> ".join(cycle))
+
+        # Every object of the graph is resolved at once
+        qualified_names = {key: qualified_name_header + self.names[key] for key in self.names}
+        resolved_entities = resolve_many(client, [(t, q) for q in qualified_names.values() for t in DW_ENTITY_TYPES])
+        missing_entities = sorted(q for q in qualified_names.values() if resolved_entities.get(q) is None)
+
+        position = {key: i for i, key in enumerate(self.get_topological_order())}
+        with LineageAccumulator(client) as accumulator:
+            for source_key, target_key in sorted(self.edges, key=lambda edge: (position[edge[0]], position[edge[1]])):
+                source_entity = resolved_entities.get(qualified_names[source_key])
+                target_entity = resolved_entities.get(qualified_names[target_key])
+                if source_entity is not None and target_entity is not None and source_entity.get("qualifiedName") != target_entity.get("qualifiedName"):
+                    add_manual_lineage(client, [source_entity], [target_entity], process_type_name = self.edges[(source_key, target_key)])
+
+        for file_name in self.files_without_sources:
+            print("No sources in " + file_name)
+        for file_name in self.missing_files:
+            print("File not found: " + file_name)
+        print(f"{len(self.edges)} data warehouse connections between {len(self.names)} objects, parsed from {self.parsed_file_count} files.")
+        return {
+            "edges": accumulator.edges,
+            "cycles": cycles,
+            "files_without_sources": self.files_without_sources,
+            "missing_files": self.missing_files,
+            "missing_entities": missing_entities,
+            "parsed_file_count": self.parsed_file_count
+        }
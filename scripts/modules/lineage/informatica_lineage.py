@@ -5,6 +5,8 @@
 
 from modules.entity import *
 from modules.lineage.shared_lineage_functions import *
+from modules.request_governor import CircuitOpenError
+from modules.job_deadline import DeadlineExceededError, job_deadline, load_job_checkpoint, write_job_checkpoint, clear_job_checkpoint
 import requests
 from pyapacheatlas.core.util import AtlasException
 from typing import List
@@ -322,9 +324,12 @@ def parse_informatica_xml_export(client, excel_file_path, xml_file_path):
                 entity["entityType"] = "oracle_table"
             source_entities.append(entity)"""
     
+    # Resolve every source and target of the export in a handful of bulk requests
+    resolved_entities = resolve_qualified_names(client, source_qualified_names + target_qualified_names)
+
     for source_qual_name in source_qualified_names:
         
-        entity = get_entity_from_qualified_name(client, source_qual_name)
+        entity = resolved_entities.get(source_qual_name)
         if entity is not None:
             source_entities.append(entity)
             print("Source Found! source_qual_name: " + source_qual_name)
@@ -333,7 +338,7 @@ def parse_informatica_xml_export(client, excel_file_path, xml_file_path):
 # TODO: to check if target_qualifiendname is empty. Result: Not empty
     for target_qual_name in target_qualified_names:
         
-        entity = get_entity_from_qualified_name(client, target_qual_name) #FIXME: entity is empty for QA
+        entity = resolved_entities.get(target_qual_name) #FIXME: entity is empty for QA
         if entity is not None:
             target_entities.append(entity)
             print("Target Found! target_qual_name: " + target_qual_name)
@@ -345,43 +350,52 @@ def parse_informatica_xml_export(client, excel_file_path, xml_file_path):
         print("Empty targets!")
         return "Empty targets!"
 
-    # Iterate through each of the sources and build lineage to each of the targets
-    for source_entity in source_entities:
-        for target_entity in target_entities:
-            # Scenario 1: Skip if source and target are the same entity
-            if source_entity["id"] == target_entity["id"]:
-                print("Skipping Scenario 1: Source and Target are the same.")
-                continue
+    # Iterate through each of the sources and build lineage to each of the targets. The Scenario 3 processes are
+    # uploaded in bulk, with each table sent once, when the accumulator exits.
+    with LineageAccumulator(client) as accumulator:
+        for source_entity in source_entities:
+            for target_entity in target_entities:
+                # Scenario 1: Skip if source and target are the same entity
+                if source_entity["id"] == target_entity["id"]:
+                    print("Skipping Scenario 1: Source and Target are the same.")
+                    continue
+
+                # Scenario 2: Source is not oracle_synonym, Target is oracle_synonym
+                if source_entity["entityType"] != "oracle_synonym" and target_entity["entityType"] == "oracle_synonym":
+                    print("Scenario 2: Target is oracle_synonym.")
+                    upload_relationships(client, source_entity["id"], target_entity["id"])
+
+                # Scenario 3: Source and Target are anything other than oracle_synonym
+                elif source_entity["entityType"] != "oracle_synonym" and target_entity["entityType"] != "oracle_synonym":
+                    try:
+                        result = add_manual_lineage(client, [source_entity], [target_entity], "Informatica_Connection")
+                        if result is not None:
+                            print("Scenario 3: Connection queued: \n\n", result)
+                        else:
+                            print("Scenario 3: Lineage not added!")
+                    except (CircuitOpenError, DeadlineExceededError):
+                        raise
+                    except Exception as e:
+                        print(f"Error adding lineage from {source_entity['qualifiedName']} to {target_entity['qualifiedName']}: {e}")
+                    print("\n\n")
+
+                # Scenario 4: Both source and target are different and are oracle_synonym
+                elif (source_entity["entityType"] == "oracle_synonym" and target_entity["entityType"] == "oracle_synonym" and source_entity["id"] != target_entity["id"]):
+                    print("Scenario 4: Both source and target are different and are oracle_synonym.")
+                    upload_relationships(client, source_entity["id"], target_entity["id"])
+
+                # Scenario 5: Source is oracle_synonym, Target is anything other than oracle_synonym
+                elif source_entity["entityType"] == "oracle_synonym" and target_entity["entityType"] != "oracle_synonym":
+                    print(f"Scenario 5: Uploading relationship between {source_entity['qualifiedName']} and {target_entity['qualifiedName']}")
+                    upload_relationships(client, source_entity["id"], target_entity["id"])
 
-            # Scenario 2: Source is not oracle_synonym, Target is oracle_synonym
-            if source_entity["entityType"] != "oracle_synonym" and target_entity["entityType"] == "oracle_synonym":
-                print("Scenario 2: Target is oracle_synonym.")
-                upload_relationships(client, source_entity["id"], target_entity["id"])
-
-            # Scenario 3: Source and Target are anything other than oracle_synonym
-            elif source_entity["entityType"] != "oracle_synonym" and target_entity["entityType"] != "oracle_synonym":
-                try:
-                    result = add_manual_lineage(client, [source_entity], [target_entity], "Informatica_Connection")
-                    if result is not None:
-                        print("Scenario 3: Connections successfully built: \n\n", result)
-                    else:
-                        print("Scenario 3: Lineage not added!")
-                except Exception as e:
-                    print(f"Error adding lineage from {source_entity['qualifiedName']} to {target_entity['qualifiedName']}: {e}")
-                print("\n\n")
-
-            # Scenario 4: Both source and target are different and are oracle_synonym
-            elif (source_entity["entityType"] == "oracle_synonym" and target_entity["entityType"] == "oracle_synonym" and source_entity["id"] != target_entity["id"]):
-                print("Scenario 4: Both source and target are different and are oracle_synonym.")
-                upload_relationships(client, source_entity["id"], target_entity["id"])
-
-            # Scenario 5: Source is oracle_synonym, Target is anything other than oracle_synonym
-            elif source_entity["entityType"] == "oracle_synonym" and target_entity["entityType"] != "oracle_synonym":
-                print(f"Scenario 5: Uploading relationship between {source_entity['qualifiedName']} and {target_entity['qualifiedName']}")
-                upload_relationships(client, source_entity["id"], target_entity["id"])
+                else:
+                    print("\nScenario 6: Skipping unknown scenario\n\n")
 
-            else:
-                print("\nScenario 6: Skipping unknown scenario\n\n")
+    for edge in accumulator.edges:
+        if edge["status"] == "failed":
+            print(f"Error adding lineage {edge['process_qualified_name']}: {edge['error']}")
+    print(f"Scenario 3: {sum(e['status'] == 'uploaded' for e in accumulator.edges)} connections successfully built.")
 
 
 def build_mass_lineage_for_folders(client, connection_names_excel, directories):
@@ -398,17 +412,32 @@ def build_mass_lineage_for_folders(client, connection_names_excel, directories):
 
     Returns:
         None: This function does not return a value but processes each XML file to build lineage.
+
+    The run has the deadline of $PURVIEW_JOB_DEADLINE_SECONDS, when set. If it passes, or Purview keeps failing
+    so its circuit breaker opens, the files done so far are written to a checkpoint and the next run over the
+    same directories skips them.
     """
-    # Iterate through each directory and each file in the directory
-    for directory_path in directories:
-        for filename in os.listdir(directory_path):
-            # Construct the full file path
-            file_path = os.path.join(directory_path, filename)
-            
-            # Check if it's a file (and not a directory)
-            if os.path.isfile(file_path):
-                print(file_path + "\n")
-                parse_informatica_xml_export(client, connection_names_excel, file_path)
+    job_name = "build_mass_lineage_for_folders"
+    checkpoint = load_job_checkpoint(job_name) or {}
+    completed_files = set(checkpoint.get("completed_files", [])) if checkpoint.get("directories") == directories else set()
+
+    with job_deadline(job_name):
+        try:
+            # Iterate through each directory and each file in the directory
+            for directory_path in directories:
+                for filename in os.listdir(directory_path):
+                    # Construct the full file path
+                    file_path = os.path.join(directory_path, filename)
+
+                    # Check if it's a file (and not a directory), skipping the files a stopped run already did
+                    if os.path.isfile(file_path) and file_path not in completed_files:
+                        print(file_path + "\n")
+                        parse_informatica_xml_export(client, connection_names_excel, file_path)
+                        completed_files.add(file_path)
+        except (CircuitOpenError, DeadlineExceededError) as e:
+            write_job_checkpoint(job_name, {"directories": directories, "completed_files": sorted(completed_files)}, str(e))
+            return
+    clear_job_checkpoint(job_name)
 
 def upload_relationships(client, entity_a_guid: str, entity_c_guid: str):
     rel_type = "oracle_synonym_source_synonym"
@@ -110,25 +110,27 @@ def upload_lineage_from_payload(client, payload: dict, qualified_name_headers: d
         entity_type_name (str): The name of the entity type for lineage relationships.
 
     Returns:
-        list: A list of results from uploading the lineage relationships.
+        list: The edge of each lineage relationship, with the GUID of its process and whether it was uploaded.
     """
     try:
         processes = payload["process"]
         results = []
 
-        for p in processes:
-            if "sourceDataPayload" in p and "targetDataPayload" in p:
-                source_info = get_info_from_entity_dict(p["sourceDataPayload"], qualified_name_headers)
-                target_info = get_info_from_entity_dict(p["targetDataPayload"], qualified_name_headers)
-                all_info = {
-                    "source_name": source_info["name"],
-                    "target_name": target_info["name"],
-                    "source_qualified_name": source_info["qualified_name"],
-                    "target_qualified_name": target_info["qualified_name"]
-                }
-
-                result = get_and_add_lineage_from_payload_process(client, all_info, entity_type_name)
-                results.append(result)
+        # The processes are uploaded in bulk when the accumulator exits, which fills in the edges
+        with LineageAccumulator(client):
+            for p in processes:
+                if "sourceDataPayload" in p and "targetDataPayload" in p:
+                    source_info = get_info_from_entity_dict(p["sourceDataPayload"], qualified_name_headers)
+                    target_info = get_info_from_entity_dict(p["targetDataPayload"], qualified_name_headers)
+                    all_info = {
+                        "source_name": source_info["name"],
+                        "target_name": target_info["name"],
+                        "source_qualified_name": source_info["qualified_name"],
+                        "target_qualified_name": target_info["qualified_name"]
+                    }
+
+                    result = get_and_add_lineage_from_payload_process(client, all_info, entity_type_name)
+                    results.append(result)
 
         return results
 
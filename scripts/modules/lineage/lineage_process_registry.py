@@ -0,0 +1,222 @@
+##! /usr/bin/env python3
+
+
+# Function Imports
+# ---------------
+from modules.entity_snapshot import get_snapshot_directory, iterate_pulled_entity_types, SNAPSHOT_MANIFEST_FILENAME
+
+
+# Package Imports
+# ---------------
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+
+# Constants
+# ---------------
+
+# The registry of an account is kept in <account>_lineage_process_registry.json in the working directory
+LINEAGE_PROCESS_REGISTRY_SUFFIX = "_lineage_process_registry.json"
+
+
+# Global
+# ---------------
+
+# id(client) -> the LineageProcessRegistry the lineage builders check for that client
+active_lineage_process_registries = {}
+active_lineage_process_registries_lock = threading.Lock()
+
+
+# Functions
+# ---------------
+
+def get_lineage_process_registry(client):
+    """
+    Returns the LineageProcessRegistry active for a client, or None.
+    """
+    with active_lineage_process_registries_lock:
+        return active_lineage_process_registries.get(id(client))
+
+
+def get_reference_qualified_name(reference):
+    """
+    Returns the qualified name of an input or output of a process, as an AtlasEntity, an object id
+    ({"typeName", "guid", "qualifiedName"} or {"typeName", "uniqueAttributes"}) or a pulled entity.
+    """
+    if hasattr(reference, "qualifiedName"):
+        return reference.qualifiedName
+    if not isinstance(reference, dict):
+        return None
+    return reference.get("qualifiedName") or (reference.get("uniqueAttributes") or {}).get("qualifiedName") \
+        or (reference.get("attributes") or {}).get("qualifiedName")
+
+
+def get_lineage_endpoint_hash(inputs: list, outputs: list):
+    """
+    Returns a hash of the qualified names of the inputs and outputs of a process, which does not depend on their order.
+
+    Parameters:
+        inputs (list): The inputs of the process, in any of the forms get_reference_qualified_name reads.
+        outputs (list): The outputs of the process.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    endpoints = [sorted(str(get_reference_qualified_name(r)) for r in inputs or []),
+                 sorted(str(get_reference_qualified_name(r)) for r in outputs or [])]
+    return hashlib.sha256(json.dumps(endpoints).encode("utf-8")).hexdigest()
+
+
+def get_snapshot_modified_time(purview_account_short_name: str):
+    """
+    Returns when the lineage connections of an account were last pulled, or None if they never were.
+    """
+    snapshot_directory = get_snapshot_directory(purview_account_short_name, "pulled_lineage_connections")
+    filenames = [os.path.join(snapshot_directory, SNAPSHOT_MANIFEST_FILENAME), snapshot_directory + ".json"]
+    modified_times = [os.path.getmtime(f) for f in filenames if os.path.exists(f)]
+    return max(modified_times) if modified_times else None
+
+
+# Classes
+# ---------------
+
+class LineageProcessRegistry:
+    """
+    The lineage processes already in Purview for an account, keyed by process qualifiedName with a hash of the
+    qualified names of their inputs and outputs, so re-running a lineage job only uploads new or changed processes.
+
+    The registry is seeded from the pulled lineage connections ("<account>_pulled_lineage_connections", see
+    pull_lineage_connections_from_purview) and keeps the processes uploaded since in
+    "<account>_lineage_process_registry.json". A pull more recent than that file replaces it.
+
+    While the registry is entered, the lineage builders of modules.lineage.shared_lineage_functions skip a
+    process whose qualifiedName is in the registry with the same inputs and outputs:
+
+        with LineageProcessRegistry(prod_client, "prod"):
+            build_mass_lineage_for_folders(prod_client, connection_names_excel, directories)
+    """
+    def __init__(self, client, purview_account_short_name: str):
+        """
+        Args:
+            client: The Purview client the lineage is uploaded with.
+            purview_account_short_name (str): The short name of the Purview account, ie. "prod".
+        """
+        self.client = client
+        self.purview_account_short_name = purview_account_short_name
+        self.filename = purview_account_short_name + LINEAGE_PROCESS_REGISTRY_SUFFIX
+        self.lock = threading.Lock()
+        self.previous_registry = None
+
+        # qualifiedName -> {"guid", "type_name", "endpoint_hash"}
+        self.processes = {}
+        self.skipped_count = 0
+        self.recorded_count = 0
+        self.load()
+
+    def __enter__(self):
+        with active_lineage_process_registries_lock:
+            self.previous_registry = active_lineage_process_registries.get(id(self.client))
+            active_lineage_process_registries[id(self.client)] = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with active_lineage_process_registries_lock:
+            if self.previous_registry is None:
+                active_lineage_process_registries.pop(id(self.client), None)
+            else:
+                active_lineage_process_registries[id(self.client)] = self.previous_registry
+        self.save()
+        print(f"{self.skipped_count} unchanged lineage processes skipped, {self.recorded_count} new or changed processes uploaded.")
+        return False
+
+    def load(self):
+        """
+        Loads the registry file, or seeds the registry from the pulled lineage connections when they are more recent.
+        """
+        snapshot_modified_time = get_snapshot_modified_time(self.purview_account_short_name)
+        if os.path.exists(self.filename) and (snapshot_modified_time is None or os.path.getmtime(self.filename) >= snapshot_modified_time):
+            with open(self.filename, "r", encoding="utf-8") as json_file:
+                self.processes = json.load(json_file).get("processes", {})
+        elif snapshot_modified_time is not None:
+            self.seed_from_snapshot()
+
+    def seed_from_snapshot(self):
+        """
+        Adds every pulled lineage connection of the account to the registry.
+        """
+        unresolved_count = 0
+        for entity_type, all_entity_details in iterate_pulled_entity_types(self.purview_account_short_name, "pulled_lineage_connections"):
+            for entity_details in all_entity_details:
+                entity = entity_details.get("entity") or {}
+                attributes = entity.get("attributes") or {}
+                relationship_attributes = entity.get("relationshipAttributes") or {}
+                qualified_name = attributes.get("qualifiedName")
+                if qualified_name is None:
+                    continue
+
+                # The inputs and outputs in the attributes carry uniqueAttributes.qualifiedName, the ones in the
+                # relationship attributes only a guid and displayText
+                inputs = attributes.get("inputs") or relationship_attributes.get("inputs") or []
+                outputs = attributes.get("outputs") or relationship_attributes.get("outputs") or []
+                if any(get_reference_qualified_name(r) is None for r in inputs + outputs):
+                    # Left out, so the process is uploaded once rather than compared against a wrong hash
+                    unresolved_count += 1
+                    continue
+                self.processes[qualified_name] = {
+                    "guid": entity.get("guid") or entity_details.get("guid"),
+                    "type_name": entity.get("typeName") or entity_type,
+                    "endpoint_hash": get_lineage_endpoint_hash(inputs, outputs)
+                }
+        print(f"Lineage process registry seeded with {len(self.processes)} pulled processes, "
+              f"{unresolved_count} left out whose inputs or outputs have no qualified name.")
+
+    def save(self):
+        with self.lock:
+            with open(self.filename, "w", encoding="utf-8") as json_file:
+                json.dump({"purview_account": self.purview_account_short_name,
+                           "saved_on": datetime.now().strftime("%m/%d/%Y %H:%M"),
+                           "processes": self.processes}, json_file)
+
+    def get_unchanged_process(self, process):
+        """
+        Returns the entry of the process in the registry ({"guid", "type_name", "endpoint_hash"}) when it has the
+        same inputs and outputs, otherwise None.
+
+        Args:
+            process (AtlasProcess): The process about to be uploaded.
+        """
+        with self.lock:
+            registered_process = self.processes.get(process.qualifiedName)
+            if registered_process is None or registered_process["endpoint_hash"] != get_lineage_endpoint_hash(process.inputs, process.outputs):
+                return None
+            self.skipped_count += 1
+            return registered_process
+
+    def record_upload(self, processes: list, upload_result: dict):
+        """
+        Adds uploaded processes to the registry, with the GUIDs Purview assigned.
+
+        Args:
+            processes (list): The AtlasProcess objects that were uploaded.
+            upload_result (dict): The result of client.upload_entities.
+        """
+        if not isinstance(upload_result, dict):
+            return
+        guid_assignments = upload_result.get("guidAssignments") or {}
+        guids_by_qualified_name = {}
+        for headers in (upload_result.get("mutatedEntities") or {}).values():
+            for header in headers:
+                guids_by_qualified_name[get_reference_qualified_name(header)] = header.get("guid")
+
+        with self.lock:
+            for process in processes:
+                guid = guid_assignments.get(str(process.guid)) or guids_by_qualified_name.get(process.qualifiedName)
+                self.processes[process.qualifiedName] = {
+                    "guid": guid,
+                    "type_name": process.typeName,
+                    "endpoint_hash": get_lineage_endpoint_hash(process.inputs, process.outputs)
+                }
+                self.recorded_count += 1
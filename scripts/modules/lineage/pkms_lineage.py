@@ -3,7 +3,7 @@
 
 # Function Imports
 # ---------------
-from utils import get_credentials, create_purview_client
+from utils import get_credentials, create_purview_client, LazyPurviewClient
 from pyapacheatlas.core.util import GuidTracker
 from pyapacheatlas.readers import ExcelConfiguration, ExcelReader
 from pyapacheatlas.core import AtlasEntity
@@ -22,13 +22,11 @@ import pandas as pd
 # ---------------
 REFERENCE_NAME_PURVIEW = "hbi-qa01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-qa_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+qa_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 REFERENCE_NAME_PURVIEW = "hbi-pd01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-prod_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+prod_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 
 # Global
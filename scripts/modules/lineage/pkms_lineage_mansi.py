@@ -18,6 +18,7 @@ import re
 import json
 import sys
 from pathlib import Path
+import pandas as pd
 
 
 # Constants
@@ -4,14 +4,7 @@
 # Import Functions
 # ---------------
 from modules import entity
-from modules.classification.test_case_generator import *
-from modules.classification.regex_generator import *
-from modules.classification.shared_generator_functions import *
-from modules.classification.classification import *
-from modules.lineage.json_payload_lineage import *
 from modules.lineage.shared_lineage_functions import *
-from modules.collection.collection_shared_functions import *
-from modules.glossary_propagation.shared_glossary_functions import *
 from modules.entity import *
 from utils import get_credentials, create_purview_client
 from pyapacheatlas.core.util import GuidTracker
@@ -93,12 +86,14 @@ def build_powerbi_lineage_from_sql_query(client, source_entities_qualified_paths
     source_type_name = "AzureSQLDB"
     target_type_name = "PowerBI"
 
+    resolved_entities = resolve_qualified_names(client, source_entities_qualified_paths + [target_entity_qualified_path])
+
     source_entities_get = []
     for s in source_entities_qualified_paths:
-        ent = get_entity_from_qualified_name(client, s)
+        ent = resolved_entities.get(s)
         source_entities_get.append(ent)
     
-    target_entity = get_entity_from_qualified_name(client, target_entity_qualified_path)
+    target_entity = resolved_entities.get(target_entity_qualified_path)
     result = add_manual_lineage_with_specific_client(client, source_entities_get, [target_entity], process_type_name, source_type_name, target_type_name, target_name_without_special_char)
     print(result)
 
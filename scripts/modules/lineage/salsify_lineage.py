@@ -15,6 +15,7 @@ from pyapacheatlas.core import  AtlasClassification
 # ---------------
 from pathlib import Path
 from fuzzywuzzy import fuzz
+import pandas as pd
 
 
 # Constants
@@ -198,8 +199,8 @@ def create_classification(client,classification_name,classification_desc,attribu
                         ]
             }
 
-        # Upload classification definition
-        response = client.upload_typedefs(classification_def)
+        # Upload classification definition. This also adds it to the cached typedefs.
+        response = sync_typedefs(client, classification_defs=classification_def["classificationDefs"])
         return
         
 
@@ -405,7 +406,8 @@ def delete_entity_by_qualified_name(client,entity):
 def get_all_classifications_names(client):
     
         """
-        Get all classification in the given purview client
+        Get all classification in the given purview client. The typedefs are fetched once
+        and cached, rather than on every record.
 
         Args:
             client : Purview client
@@ -413,10 +415,7 @@ def get_all_classifications_names(client):
         Returns:
         classification_set : Set with all the classification names
         """
-        classification_defs = client.get_all_typedefs()
-        classification_set=set()
-        for classification_defs in classification_defs['classificationDefs']:
-                classification_set.add(classification_defs.get("name"))
+        classification_set=get_typedef_names(client, "classificationDefs")
         return classification_set       
 
 
@@ -6,6 +6,7 @@
 from utils import get_credentials, create_purview_client
 from modules import *
 from modules.lineage.shared_lineage_functions import *
+from modules.lineage.lineage_process_registry import LineageProcessRegistry
 from pyapacheatlas.core.util import GuidTracker
 
 
@@ -73,6 +74,7 @@ def parse_dsp_json_of_table(client, path_to_file, table_qualified_name_header_wi
 
     entities_to_upload = [table] + columns_to_add
     assignments = client.upload_entities(entities_to_upload)
+    update_qualified_name_index_from_upload(entities_to_upload, assignments)
     global prod_hana_table_qualified_names
     prod_hana_table_qualified_names.append(table_qualified_name)
     print("Table Created for: " + table_name + "\n")
@@ -115,6 +117,7 @@ def parse_dsp_json_and_create_table(client, json_dict, table_name, table_qualifi
     try:
         entities_to_upload = [table] + columns_to_add
         assignments = client.upload_entities(entities_to_upload)
+        update_qualified_name_index_from_upload(entities_to_upload, assignments)
         print("Table created for: " + table_name + "\n")
         global prod_hana_table_qualified_names
         prod_hana_table_qualified_names.append(table_qualified_name)
@@ -158,6 +161,7 @@ def parse_dsp_json_and_create_view(client, json_dict, view_name, view_qualified_
     try:
         entities_to_upload = [view] + columns_to_add
         assignments = client.upload_entities(entities_to_upload)
+        update_qualified_name_index_from_upload(entities_to_upload, assignments)
         print("View Created for: " + view_name + "\n")
         global prod_hana_view_qualified_names
         prod_hana_view_qualified_names.append(view_qualified_name)
@@ -178,20 +182,10 @@ def get_sap_hana_views_with_substring_of_qualified_name(client, entity_type, qua
     Returns:
     list: A list of dictionaries representing matching SAP HANA views.
     '''
-    browse_result = client.discovery.browse(entityType=entity_type)
-    total_search_count = browse_result.get("@search.count")
-    if total_search_count == 0:
-        return []
-    count = 0
     matches = []
-    while count < total_search_count:
-        browse_result = client.discovery.browse(entityType = entity_type, offset = count)
-        entities = browse_result.get("value")
-        count += len(entities)
-        
-        for value_dict in entities:
-            if qualified_name_header == value_dict.get("qualifiedName"):
-                matches.append(value_dict)
+    for value_dict in browse_entities_with_type(client, entity_type):
+        if qualified_name_header == value_dict.get("qualifiedName"):
+            matches.append(value_dict)
     
     return matches
 
@@ -398,13 +392,15 @@ def parse_all_views_for_schema(client, directory, dsp_qa_header_without_schema,
     Returns:
     None
     '''
-    for filename in os.listdir(directory):
-        if filename.endswith('.json'):
-            # Process each JSON file
-            file_path = os.path.join(directory, filename)
-            
-            # Pass the file name to your code
-            parse_json_for_sap_hana_view(client, file_path, dsp_qa_header_without_schema, schema_this_view_belongs_to)
+    # The dsp_connection processes of the views are uploaded in bulk, with each view and table sent once
+    with LineageAccumulator(client):
+        for filename in os.listdir(directory):
+            if filename.endswith('.json'):
+                # Process each JSON file
+                file_path = os.path.join(directory, filename)
+                
+                # Pass the file name to your code
+                parse_json_for_sap_hana_view(client, file_path, dsp_qa_header_without_schema, schema_this_view_belongs_to)
 
 
 def create_all_tables_for_schema(client, directory, dsp_header_with_schema):
@@ -475,9 +471,7 @@ def add_manual_dsp_lineage(client, source_entity, target_entity, process_type_na
             outputs = targets
         )
 
-        result  = client.upload_entities(
-            batch = targets + sources + [process]
-        )
+        result = upload_lineage_entities(client, sources, targets, process)
 
         prod_dsp_connection_qualified_names.append(qualified_name)
         return result
@@ -568,7 +562,8 @@ def parse_sap_hana_internal_lineage():
     directory = "dsp_sap_hana_lineage_input_files/" + schema_this_view_belongs_to + "/" + schema_this_view_belongs_to + "_Views/"
     dsp_prod_header_without_schema = "sap_hana://ff43de60-f60e-41a3-98ed-cec560c93756.hana.prod-us10.hanacloud.ondemand.com/databases/H00/schemas/" 
 
-    parse_all_views_for_schema(prod_client, directory, dsp_prod_header_without_schema, schema_this_view_belongs_to)
+    with LineageProcessRegistry(prod_client, "prod"), persistent_qualified_name_index(prod_client, "prod"):
+        parse_all_views_for_schema(prod_client, directory, dsp_prod_header_without_schema, schema_this_view_belongs_to)
 
     # RUN BELOW FOR TABLE CREATION
     # BELOW IS PROD!!!
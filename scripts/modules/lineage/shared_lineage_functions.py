@@ -9,16 +9,40 @@ from modules.entity import *
 
 # Imports
 # ---------------
+import json
+import threading
 import time
 from pyapacheatlas.core import AtlasEntity
 from pyapacheatlas.core import AtlasEntity
 from pyapacheatlas.core.entity import AtlasEntity, AtlasProcess
+from pyapacheatlas.core.util import AtlasException, GuidTracker
 from pathlib import Path
+from modules.request_governor import CircuitOpenError
+from modules.job_deadline import DeadlineExceededError
+from modules.lineage.lineage_process_registry import get_lineage_process_registry
 
 
 # Constants
 # ---------------
- 
+
+# A LineageAccumulator uploads its buffer once it holds this many processes, or this many bytes of entities
+LINEAGE_FLUSH_PROCESS_COUNT = 200
+LINEAGE_FLUSH_MAX_BYTES = 2 * 1024 * 1024
+
+# Placeholder GUIDs of buffered processes count down from here
+LINEAGE_PLACEHOLDER_GUID_START = -5000
+
+# The error Purview returns when an input or output of a process refers to an entity that does not exist
+REFERENCED_ENTITY_NOT_FOUND_ERROR = "ATLAS-404-00-00A"
+
+
+# Global
+# ---------------
+
+# id(client) -> the LineageAccumulator add_manual_lineage buffers into for that client
+active_lineage_accumulators = {}
+active_lineage_accumulators_lock = threading.Lock()
+
 
 # Functions
 # ---------------
@@ -39,6 +63,82 @@ def remove_begin_statement(sql_string: str):
         raise ValueError("Invalid input. Expected a string.")  
 
 
+def get_lineage_accumulator(client):
+    """
+    Returns the LineageAccumulator active for a client, or None.
+    """
+    with active_lineage_accumulators_lock:
+        return active_lineage_accumulators.get(id(client))
+
+
+def is_existing_lineage_endpoint(entity):
+    """
+    Checks whether a source or target entity was read from Purview, ie. has a GUID that is not a placeholder.
+    """
+    return entity.guid is not None and not str(entity.guid).startswith("-")
+
+
+def upload_lineage_processes(client, endpoints: list, processes: list):
+    """
+    Uploads lineage processes. Their inputs and outputs are sent as references, so the source and target entities
+    that already exist are left out of the upload and Purview does not update them, or add a version to them,
+    for every process that uses them. Only the endpoints that do not exist yet are uploaded in full.
+    If Purview does not find one of the referenced entities, the upload is made again with every endpoint in full.
+
+    Args:
+        endpoints (list): The AtlasEntity objects of the inputs and outputs of the processes.
+        processes (list): The AtlasProcess objects.
+
+    Returns:
+        dict: Result of the entity upload operation.
+    """
+    new_endpoints = [e for e in endpoints if not is_existing_lineage_endpoint(e)]
+    try:
+        result = client.upload_entities(
+            batch = new_endpoints + processes
+        )
+    except (Exception, AtlasException) as e:
+        if REFERENCED_ENTITY_NOT_FOUND_ERROR in str(e):
+            # The GUID came from the qualified name index, and the entity was deleted since
+            remove_missing_guids_from_qualified_name_index(e)
+        if REFERENCED_ENTITY_NOT_FOUND_ERROR not in str(e) or len(new_endpoints) == len(endpoints):
+            raise
+        print(f"An input or output of the lineage was not found, uploading the {len(endpoints)} source and target entities in full.")
+        result = client.upload_entities(
+            batch = endpoints + processes
+        )
+    update_qualified_name_index_from_upload(endpoints + processes, result)
+
+    registry = get_lineage_process_registry(client)
+    if registry is not None:
+        registry.record_upload(processes, result)
+    return result
+
+
+def upload_lineage_entities(client, sources: list, targets: list, process):
+    """
+    Uploads a lineage process with upload_lineage_processes, or adds it to the buffer of the
+    LineageAccumulator active for the client. When a LineageProcessRegistry is active for the client
+    and already holds the process with the same inputs and outputs, nothing is uploaded.
+
+    Args:
+        sources (list): The AtlasEntity objects of the inputs.
+        targets (list): The AtlasEntity objects of the outputs.
+        process (AtlasProcess): The process connecting them.
+
+    Returns:
+        dict: Result of the entity upload operation, or the pending edge of the accumulator.
+    """
+    accumulator = get_lineage_accumulator(client)
+    if accumulator is not None:
+        return accumulator.add(sources, targets, process)
+
+    registry = get_lineage_process_registry(client)
+    if registry is not None and registry.get_unchanged_process(process) is not None:
+        return {"mutatedEntities": {}, "guidAssignments": {}}
+    return upload_lineage_processes(client, targets + sources, [process])
+
+
 def add_manual_lineage(client, source_entities: list, target_entities: list, process_type_name: str):
     """
     Add manual lineage by creating AtlasEntities for source and target entities,
@@ -50,7 +150,8 @@ def add_manual_lineage(client, source_entities: list, target_entities: list, pro
         process_type_name (str): Name of the process type.
 
     Returns:
-        dict: Result of the entity upload operation.
+        dict: Result of the entity upload operation, or the pending edge when a LineageAccumulator
+        is active for the client.
     """
     try:
         sources = []
@@ -84,11 +185,7 @@ def add_manual_lineage(client, source_entities: list, target_entities: list, pro
             outputs = targets
         )
 
-        result  = client.upload_entities(
-            batch = targets + sources + [process]
-        )
-        
-        return result
+        return upload_lineage_entities(client, sources, targets, process)
 
     except (KeyError, TypeError) as e:
         raise ValueError("Invalid input. Expected a list of source_entities and target_entities, and a string process_type_name.") from e
@@ -169,7 +266,8 @@ def add_manual_lineage_with_specific_client(client, source_entities: list, targe
         target_name_without_special_char (str): The name of the target entity without special characters.
 
     Returns:
-        dict: Result of the entity upload operation.
+        dict: Result of the entity upload operation, or the pending edge when a LineageAccumulator
+        is active for the client.
     '''
     try:
         sources = []
@@ -205,11 +303,7 @@ def add_manual_lineage_with_specific_client(client, source_entities: list, targe
             outputs = targets
         )
 
-        result  = client.upload_entities(
-            batch = targets + sources + [process]
-        )
-        
-        return result
+        return upload_lineage_entities(client, sources, targets, process)
 
     except (KeyError, TypeError) as e:
         raise ValueError("Invalid input. Expected a list of source_entities and target_entities, and a string process_type_name.") from e
@@ -259,9 +353,7 @@ def build_lineage_using_guids(client, source_guid, source_type, target_guid, tar
         outputs = [t]
     )
 
-    result  = client.upload_entities(
-        batch = [t] + [s] + [process]
-    )
+    upload_lineage_entities(client, [s], [t], process)
 
     print("Lineage built between " + source_entity["name"] + " and " + target_entity["name"])
 
@@ -478,3 +570,184 @@ EXAMPLE: 'name':'ColumnMapping' needs to be used in place of 'process_type':'Cus
     #     except Exception as e:
     #         print(f"Failed to search entities for process type '{process_type}': {e}")
     #         continue
+
+
+
+# Classes
+# ---------------
+
+class LineageAccumulator:
+    """
+    Buffers the lineage that add_manual_lineage and the other lineage builders would upload one edge at a time,
+    and uploads it in bulk with upload_lineage_processes: source and target entities are deduplicated, and the
+    buffer is uploaded when it holds max_processes processes or max_bytes of entities, and on exit.
+
+    While the accumulator is entered, lineage uploaded for its client is buffered and the builders get back a
+    pending edge, a dict that is filled in with the GUID Purview assigned to the process once it is uploaded:
+
+        with LineageAccumulator(client) as accumulator:
+            for source_entity, target_entity in edges:
+                add_manual_lineage(client, [source_entity], [target_entity], "dw_routine")
+        failed_edges = [e for e in accumulator.edges if e["status"] == "failed"]
+
+    An upload that fails marks its edges as failed with the error instead of raising, except CircuitOpenError
+    and DeadlineExceededError, which are raised so jobs can write their checkpoint and stop.
+    """
+    def __init__(self, client, max_processes: int = LINEAGE_FLUSH_PROCESS_COUNT, max_bytes: int = LINEAGE_FLUSH_MAX_BYTES, callback = None):
+        """
+        Args:
+            client: The Purview client the lineage is uploaded with.
+            max_processes (int, optional): The number of processes that triggers an upload.
+            max_bytes (int, optional): The size of the buffered entities, as JSON, that triggers an upload.
+            callback (callable, optional): Called with each edge once its upload has been done or has failed.
+        """
+        self.client = client
+        self.max_processes = max_processes
+        self.max_bytes = max_bytes
+        self.callback = callback
+        self.guid_tracker = GuidTracker(starting=LINEAGE_PLACEHOLDER_GUID_START, direction='decrease')
+        self.lock = threading.RLock()
+        self.previous_accumulator = None
+
+        # The edges reported so far, and the buffer of the next upload
+        self.edges = []
+        self.endpoints = {}
+        self.processes = {}
+        self.pending_edges = []
+        self.buffered_bytes = 0
+
+        # Totals of the uploads, for progress prints and benchmarks
+        self.upload_count = 0
+        self.uploaded_process_count = 0
+
+    def __enter__(self):
+        with active_lineage_accumulators_lock:
+            self.previous_accumulator = active_lineage_accumulators.get(id(self.client))
+            active_lineage_accumulators[id(self.client)] = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with active_lineage_accumulators_lock:
+            if self.previous_accumulator is None:
+                active_lineage_accumulators.pop(id(self.client), None)
+            else:
+                active_lineage_accumulators[id(self.client)] = self.previous_accumulator
+        if exc_type is None:
+            self.flush()
+        else:
+            # Keep the error that stopped the block, the edges still buffered are reported as failed
+            try:
+                self.flush()
+            except (CircuitOpenError, DeadlineExceededError):
+                pass
+        return False
+
+    def get_entity_size(self, entity):
+        return len(json.dumps(entity.to_json(), default=str))
+
+    def add(self, sources: list, targets: list, process):
+        """
+        Adds a process and its endpoints to the buffer, uploading the buffer when it is full.
+        Endpoints are deduplicated by qualifiedName. A process with the qualifiedName of a buffered one replaces
+        it, as uploading them one after the other would, and both edges get the GUID of the one uploaded.
+
+        Args:
+            sources (list): The AtlasEntity objects of the inputs.
+            targets (list): The AtlasEntity objects of the outputs.
+            process (AtlasProcess): The process connecting them.
+
+        Returns:
+            dict: The pending edge, with the qualified name and type of the process, its "guid" and its "status",
+            "pending" until the buffer is uploaded and then "uploaded" or "failed" with the "error". A process the
+            LineageProcessRegistry of the client already holds is not buffered and its edge is "unchanged".
+        """
+        with self.lock:
+            process_key = (process.typeName, process.qualifiedName)
+            registry = get_lineage_process_registry(self.client)
+            if registry is not None and process_key not in self.processes:
+                registered_process = registry.get_unchanged_process(process)
+                if registered_process is not None:
+                    edge = {
+                        "process_qualified_name": process.qualifiedName,
+                        "process_type": process.typeName,
+                        "placeholder_guid": None,
+                        "guid": registered_process["guid"],
+                        "status": "unchanged",
+                        "error": None
+                    }
+                    self.edges.append(edge)
+                    if self.callback is not None:
+                        self.callback(edge)
+                    return edge
+
+            for entity in targets + sources:
+                if entity.qualifiedName not in self.endpoints:
+                    self.endpoints[entity.qualifiedName] = entity
+                    # Existing endpoints are only sent as references in the processes
+                    if not is_existing_lineage_endpoint(entity):
+                        self.buffered_bytes += self.get_entity_size(entity)
+
+            if process_key in self.processes:
+                process.guid = self.processes[process_key].guid
+                self.buffered_bytes -= self.get_entity_size(self.processes[process_key])
+            else:
+                process.guid = self.guid_tracker.get_guid()
+            self.processes[process_key] = process
+            self.buffered_bytes += self.get_entity_size(process)
+
+            edge = {
+                "process_qualified_name": process.qualifiedName,
+                "process_type": process.typeName,
+                "placeholder_guid": process.guid,
+                "guid": None,
+                "status": "pending",
+                "error": None
+            }
+            self.edges.append(edge)
+            self.pending_edges.append(edge)
+
+            if len(self.processes) >= self.max_processes or self.buffered_bytes >= self.max_bytes:
+                self.flush()
+            return edge
+
+    def flush(self):
+        """
+        Uploads the buffer in one call and fills in its pending edges from the guidAssignments of the result.
+
+        Returns:
+            list: The edges of the upload.
+        """
+        with self.lock:
+            if not self.processes:
+                return []
+            endpoints = list(self.endpoints.values())
+            processes = list(self.processes.values())
+            edges = self.pending_edges
+            self.endpoints = {}
+            self.processes = {}
+            self.pending_edges = []
+            self.buffered_bytes = 0
+
+            error = None
+            try:
+                result = upload_lineage_processes(self.client, endpoints, processes)
+                guid_assignments = result.get("guidAssignments") or {} if isinstance(result, dict) else {}
+                for edge in edges:
+                    edge["guid"] = guid_assignments.get(str(edge["placeholder_guid"]))
+                    edge["status"] = "uploaded"
+                self.upload_count += 1
+                self.uploaded_process_count += len(processes)
+                print(f"Uploaded {len(processes)} lineage processes between {len(endpoints)} source and target entities.")
+            except (Exception, AtlasException) as e:
+                error = e
+                for edge in edges:
+                    edge["status"] = "failed"
+                    edge["error"] = str(e)
+                print(f"Failed to upload {len(processes)} lineage processes: {e}")
+
+            if self.callback is not None:
+                for edge in edges:
+                    self.callback(edge)
+            if isinstance(error, (CircuitOpenError, DeadlineExceededError)):
+                raise error
+            return edges
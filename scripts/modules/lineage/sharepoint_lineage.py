@@ -73,9 +73,7 @@ def build_sharepoint_to_pbi_lineage(client, sharepoint_source, sharepoint_short_
         outputs = targets
     )
 
-    result  = client.upload_entities(
-        batch = targets + sources + [process]
-    )
+    result = upload_lineage_entities(client, sources, targets, process)
 
     return result
 
@@ -3,7 +3,10 @@
 # Function Imports
 # ---------------
 
-from utils import get_credentials, create_purview_client
+from utils import get_credentials, create_purview_client, LazyPurviewClient
+from modules.entity import browse_entities_with_type
+from modules.lineage.shared_lineage_functions import upload_lineage_entities
+from modules.sql_parse_cache import parse_sql_with_cache
 from pyapacheatlas.core import AtlasEntity
 from pyapacheatlas.core.entity import AtlasEntity, AtlasProcess
 from pyapacheatlas.core.typedef import EntityTypeDef, AtlasAttributeDef
@@ -23,13 +26,15 @@ import re
 
 REFERENCE_NAME_PURVIEW = "hbi-qa01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-qa_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+qa_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
 
 REFERENCE_NAME_PURVIEW = "hbi-pd01-datamgmt-pview"
 PROJ_PATH = Path(__file__).resolve().parent
-CREDS = get_credentials(cred_type= 'default')
-prod_client = create_purview_client(credentials=CREDS, mod_type='pyapacheatlas', purview_account= REFERENCE_NAME_PURVIEW)
+prod_client = LazyPurviewClient(REFERENCE_NAME_PURVIEW)
+
+# Regular expression to find the path after LOCATION in the stage SQL files
+LOCATION_PATTERN = re.compile(r"LOCATION\s+'([^']+)'", re.IGNORECASE)
+LOCATION_PARSER_VERSION = "1"
 
 def build_lineage_using_guids(client, source_guid, source_type, target_guid, target_type, process_type):
     '''
@@ -75,9 +80,7 @@ def build_lineage_using_guids(client, source_guid, source_type, target_guid, tar
         outputs = [t]
     )
 
-    result  = client.upload_entities(
-        batch = [t] + [s] + [process]
-    )
+    upload_lineage_entities(client, [s], [t], process)
 
     print("Lineage built between " + source_entity["name"] + " and " + target_entity["name"])
 
@@ -114,20 +117,7 @@ def get_guid_from_qualified_name(client,qualified_names):
     return guids
 
 def fetch_all_curated_guids(client,client_type,entityType):
-    limit = 10000  # Maximum allowed limit per request
-    all_results = []
-    offset = 0
-    data=client.discovery.browse(entityType=entityType)
-    total_results = data.get('@search.count')
-    while offset < total_results:
-        response = client.discovery.browse(entityType=entityType, limit=limit, offset=offset)
-        entities = response["value"]  # Adjust according to the structure of your response
-        
-        if not entities:
-            break  # Exit loop if no more data is returned
-        
-        all_results.extend(entities)
-        offset += limit
+    all_results = list(browse_entities_with_type(client, entityType))
     if client_type.lower()=='prod':
         filtered_data = [
         item for item in all_results
@@ -162,40 +152,39 @@ def clean_table_name(table_name):
     # Remove any prefix and return the core table name
     return table_name.split('.')[-1]
 
+def get_location_path(sql_content):
+    location_match = LOCATION_PATTERN.search(sql_content)
+    return location_match.group(1) if location_match else None
+
 def search_stage_sql_files(cleaned_table_names):
     stage_dir = r"C:\Users\Sravanthi.Dasam\Desktop\github\Purview\scripts\inputs\BIDW\Databricks\01\Workflows\Schema\Staging"
 
-    # List all files in the specified directory
-    files = os.listdir(stage_dir)
+    # Read every SQL file in the specified directory once, not once per table
+    sql_files = []
+    for sql_file in os.listdir(stage_dir):
+        if sql_file.lower().endswith('.sql'):
+            with open(os.path.join(stage_dir, sql_file), 'r') as file:
+                file_content = file.read()
+            sql_files.append((sql_file, file_content, file_content.lower()))
 
     Stage_Extracted_path = []
 
     for table_name in cleaned_table_names:
         found = False
         
-        for sql_file in files:
-            if sql_file.lower().endswith('.sql'):
-                file_path = os.path.join(stage_dir, sql_file)
-
-                # Read the file content
-                with open(file_path, 'r') as file:
-                    file_content = file.read()
-
-                # Check if the table name is mentioned in the file content
-                if table_name.lower() in file_content.lower():
-                    found = True
-                    # Regular expression to find the path after LOCATION
-                    location_pattern = re.compile(r"LOCATION\s+'([^']+)'", re.IGNORECASE)
-
-                    # Search for the pattern in the SQL content
-                    location_match = location_pattern.search(file_content)
-
-                    if location_match:
-                        location_path = location_match.group(1)
-                        Stage_Extracted_path.append(location_path)
-                        break  # Stop checking once a match is found
-                    else:
-                        print(f"No LOCATION path found in file '{sql_file}'.")
+        for sql_file, file_content, lowercase_file_content in sql_files:
+            # Check if the table name is mentioned in the file content
+            if table_name.lower() in lowercase_file_content:
+                found = True
+                # Search for the path after LOCATION, parsed once per file content
+                location_path = parse_sql_with_cache("stage_location", LOCATION_PARSER_VERSION, file_content,
+                                                     lambda: get_location_path(file_content))
+
+                if location_path:
+                    Stage_Extracted_path.append(location_path)
+                    break  # Stop checking once a match is found
+                else:
+                    print(f"No LOCATION path found in file '{sql_file}'.")
 
         if not found:
             print(f"No match found for table '{table_name}' in any file.")
@@ -6,6 +6,7 @@
 from utils import get_credentials, create_purview_client
 from modules import *
 from modules.lineage.shared_lineage_functions import *
+from modules.sql_parse_cache import parse_sql_with_cache
 
 
 # Imports
@@ -19,11 +20,15 @@ from pyapacheatlas.core.entity import AtlasEntity, AtlasProcess
 from getpass import getpass
 from pathlib import Path
 from sqllineage.runner import LineageRunner
+import sqllineage
 
 
 # Constants
 # ---------------
 
+# Parses are cached per sqllineage version, bump the prefix when what is extracted from them changes
+SQLLINEAGE_PARSER_VERSION = "1-" + sqllineage.VERSION
+
 
 # Functions
 # ---------------
@@ -50,31 +55,84 @@ def confirm_source_not_target(source_tables: list, target_tables: list):
         return None
 
 
+def parse_source_and_target_tables(sql_string: str):
+    """
+    Parse the source and target tables of a stored procedure with sqllineage.
+
+    Args:
+        sql_string (str): The SQL of the stored procedure.
+
+    Returns:
+        dict: The "sources" and "targets", as lists of "<schema>.<table>" names.
+    """
+    sql_string = remove_begin_statement(sql_string)
+    lineage = LineageRunner(sql_string)
+    source_tables = lineage.source_tables
+    target_tables = lineage.target_tables
+
+    # Confirm that no source tables are the same entity as the target table
+    source_tables = confirm_source_not_target(source_tables, target_tables)
+    return {"sources": [str(t) for t in source_tables], "targets": [str(t) for t in target_tables]}
+
+
 def extract_source_and_target_from_stored_procedure(sql_file_path: str):
     """
-    Extract the source and target tables from a stored procedure SQL file.
+    Extract the source and target tables from a stored procedure SQL file. The file is parsed
+    once per content and then read from the SQL parse cache.
 
     Args:
         sql_file_path (str): The file path to the SQL file.
 
     Returns:
-        tuple: A tuple containing the source tables and target tables.
+        tuple: A tuple containing the source tables and target tables, as "<schema>.<table>" names.
     """
     try:
         with open(sql_file_path, 'r') as file:
             sql_string = file.read()
-        
-        sql_string = remove_begin_statement(sql_string)
-        lineage = LineageRunner(sql_string)
-        source_tables = lineage.source_tables
-        target_tables = lineage.target_tables
-
-        # Confirm that no source tables are the same entity as the target table
-        source_tables = confirm_source_not_target(source_tables, target_tables)
-        return source_tables, target_tables
+
+        tables = parse_sql_with_cache("sqllineage_tables", SQLLINEAGE_PARSER_VERSION, sql_string,
+                                      lambda: parse_source_and_target_tables(sql_string))
+        return tables["sources"], tables["targets"]
     
     except Exception as e:
         print(f"Error occurred: {str(e)}")
         return None, None
 
 
+def parse_column_lineage(sql_string: str):
+    """
+    Parse the column lineage of a stored procedure with sqllineage.
+
+    Args:
+        sql_string (str): The SQL of the stored procedure.
+
+    Returns:
+        list: Each column path, from the source column to the target column, as "<schema>.<table>.<column>" names.
+    """
+    lineage = LineageRunner(remove_begin_statement(sql_string))
+    return [[str(column) for column in path] for path in lineage.get_column_lineage()]
+
+
+def extract_column_lineage_from_stored_procedure(sql_file_path: str):
+    """
+    Extract the column mappings from a stored procedure SQL file. The file is parsed
+    once per content and then read from the SQL parse cache.
+
+    Args:
+        sql_file_path (str): The file path to the SQL file.
+
+    Returns:
+        list: Each column path, from the source column to the target column, or None if the file could not be parsed.
+    """
+    try:
+        with open(sql_file_path, 'r') as file:
+            sql_string = file.read()
+
+        return parse_sql_with_cache("sqllineage_columns", SQLLINEAGE_PARSER_VERSION, sql_string,
+                                    lambda: parse_column_lineage(sql_string))
+
+    except Exception as e:
+        print(f"Error occurred: {str(e)}")
+        return None
+
+
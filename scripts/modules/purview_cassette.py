@@ -0,0 +1,311 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import atexit
+import gzip
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlparse
+from pyapacheatlas.core import PurviewClient
+from modules.purview_emulator import PurviewEmulator
+
+
+# Constants
+# ---------------
+
+CASSETTE_VERSION = 1
+
+REDACTED = "<redacted>"
+
+# Body fields and query parameters whose values are replaced with REDACTED before anything is written
+SECRET_NAME_PATTERN = re.compile(r"password|secret|token|credential|authorization|apikey|api_key|accountkey|connectionstring|^sig$|^code$", re.IGNORECASE)
+
+# Bearer tokens and SAS signatures found inside any other string value
+SECRET_VALUE_PATTERN = re.compile(r"(Bearer\s+)[A-Za-z0-9\-_.~+/]+=*|((?:sig|AccountKey|SharedAccessKey)=)[^&;\s\"]+")
+
+# Response headers kept in the cassette, the rest are dropped
+RECORDED_RESPONSE_HEADERS = ["Retry-After", "Content-Type"]
+
+# Status and error code answered when replay gets a request the cassette holds no response for
+CASSETTE_MISS_STATUS = 404
+CASSETTE_MISS_ERROR_CODE = "CASSETTE-404-00-000"
+
+
+# Global
+# ---------------
+
+# cassette filename -> CassetteRecorder, and (cassette filename, account name) -> CassettePlayer
+cassette_recorders = {}
+cassette_players = {}
+cassette_registry_lock = threading.Lock()
+
+
+# Functions
+# ---------------
+
+def redact_secrets(value, name: str = None):
+    """
+    Returns a copy of a JSON value with the values of secret looking fields, bearer tokens and SAS signatures replaced.
+
+    Parameters:
+        value: The decoded JSON value.
+        name (str, optional): The name of the field holding the value.
+    """
+    if name is not None and SECRET_NAME_PATTERN.search(name) and value not in (None, ""):
+        return REDACTED
+    if isinstance(value, dict):
+        return {k: redact_secrets(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact_secrets(v) for v in value]
+    if isinstance(value, str):
+        return SECRET_VALUE_PATTERN.sub(lambda m: (m.group(1) or m.group(2)) + REDACTED, value)
+    return value
+
+
+def get_request_path(url: str):
+    """
+    Returns the path and query of a request URL without the host, with secret query parameters redacted.
+    The host is dropped so a cassette recorded against Azure replays against localhost.
+    """
+    parsed = urlparse(url)
+    if not parsed.query:
+        return parsed.path
+    query = [(k, REDACTED if SECRET_NAME_PATTERN.search(k) else v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)]
+    return parsed.path + "?" + urlencode(query)
+
+
+def decode_body(body):
+    """
+    Returns a request or response body as redacted JSON, as redacted text when it is not JSON, or None when it is empty.
+    """
+    if not body:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return redact_secrets(json.loads(body))
+    except ValueError:
+        return redact_secrets(body)
+
+
+def get_interaction_key(method: str, path: str, body):
+    """
+    Returns the key replay matches requests on: the method, the path with its query and the redacted body.
+    """
+    return method.upper(), path, json.dumps(body, sort_keys=True, separators=(",", ":"))
+
+
+def open_cassette(filename: str, mode: str):
+    """
+    Opens a cassette as text, gzip compressed when its name ends in ".gz".
+    """
+    if filename.endswith(".gz"):
+        return gzip.open(filename, mode + "t", encoding="utf-8")
+    return open(filename, mode, encoding="utf-8")
+
+
+def load_cassette(filename: str):
+    """
+    Reads a cassette.
+
+    Parameters:
+        filename (str): The cassette, newline delimited JSON with a header line then one line per HTTP exchange.
+
+    Returns:
+        tuple: The header and the list of interactions, in the order they were recorded.
+    """
+    with open_cassette(filename, "r") as cassette:
+        lines = [json.loads(line) for line in cassette if line.strip()]
+    if not lines or lines[0].get("cassette_version") != CASSETTE_VERSION:
+        raise ValueError(f"{filename} is not a version {CASSETTE_VERSION} Purview cassette.")
+    return lines[0], lines[1:]
+
+
+def get_cassette_recorder(filename: str):
+    """
+    Returns the recorder writing a cassette, creating it on first use. Every client recorded to the same file shares it.
+    """
+    with cassette_registry_lock:
+        if filename not in cassette_recorders:
+            cassette_recorders[filename] = CassetteRecorder(filename)
+        return cassette_recorders[filename]
+
+
+def record_purview_client(client: PurviewClient, purview_account: str, filename: str):
+    """
+    Records every HTTP exchange of a client, and of its glossary, discovery and collections clients, to a cassette.
+
+    The hook is added to the requests arguments the sub-clients share, ahead of the request governor's hook,
+    so throttled responses and their retries are recorded too.
+
+    Parameters:
+        client (PurviewClient): The client to record.
+        purview_account (str): The name of the Purview account, kept with every interaction.
+        filename (str): The cassette to write.
+
+    Returns:
+        PurviewClient: The same client.
+    """
+    requests_args = client._requests_args
+    if requests_args is None:
+        requests_args = client._requests_args = {}
+    response_hooks = requests_args.setdefault("hooks", {}).setdefault("response", [])
+    if not isinstance(response_hooks, list):
+        response_hooks = requests_args["hooks"]["response"] = [response_hooks]
+    response_hooks.append(get_cassette_recorder(filename).get_response_hook(purview_account))
+    return client
+
+
+def get_cassette_player(filename: str, purview_account: str, replay_latency: bool = False):
+    """
+    Returns the running player of an account's share of a cassette, starting it on first use.
+
+    Parameters:
+        filename (str): The cassette to replay.
+        purview_account (str): The name of the Purview account whose interactions are served.
+        replay_latency (bool, optional): Wait as long as every recorded response took.
+
+    Returns:
+        CassettePlayer: The player.
+    """
+    key = (filename, purview_account)
+    with cassette_registry_lock:
+        if key not in cassette_players:
+            header, interactions = load_cassette(filename)
+            interactions = [i for i in interactions if i.get("account") == purview_account]
+            cassette_players[key] = CassettePlayer(interactions, replay_latency=replay_latency).start()
+        return cassette_players[key]
+
+
+def create_replaying_purview_client(purview_account: str, filename: str, replay_latency: bool = False) -> PurviewClient:
+    """
+    Creates a PurviewClient that is answered from a cassette instead of Azure.
+
+    Parameters:
+        purview_account (str): The name of the Purview account.
+        filename (str): The cassette to replay.
+        replay_latency (bool, optional): Wait as long as every recorded response took.
+
+    Returns:
+        PurviewClient: The client, without authentication.
+    """
+    player = get_cassette_player(filename, purview_account, replay_latency)
+    return player.point_client(PurviewClient(account_name=purview_account))
+
+
+# Classes
+# ---------------
+
+class CassetteRecorder:
+    """
+    Writes the HTTP exchanges of Purview clients to a cassette, one compact JSON line per exchange.
+
+    Only the method, path, query and body of requests are kept, never their headers, so the bearer token is
+    not written. Secret looking fields are redacted from the bodies of both requests and responses.
+    """
+    def __init__(self, filename: str):
+        """
+        Args:
+            filename (str): The cassette to write, gzip compressed when it ends in ".gz".
+        """
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.interaction_count = 0
+        self.cassette = open_cassette(filename, "w")
+        self.write_line({"cassette_version": CASSETTE_VERSION, "recorded_on": datetime.now(timezone.utc).isoformat()})
+        atexit.register(self.close)
+
+    def write_line(self, line: dict):
+        self.cassette.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    def get_response_hook(self, purview_account: str):
+        """
+        Returns the requests response hook that records the exchanges of one account.
+        """
+        def cassette_response_hook(response, *args, **kwargs):
+            self.record(purview_account, response)
+            return response
+        return cassette_response_hook
+
+    def record(self, purview_account: str, response):
+        """
+        Adds one HTTP exchange to the cassette.
+        """
+        request = response.request
+        elapsed = response.elapsed.total_seconds()
+        interaction = {
+            "account": purview_account,
+            "method": request.method,
+            "path": get_request_path(request.url),
+            "body": decode_body(request.body),
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_RESPONSE_HEADERS if name in response.headers},
+            "response": decode_body(response.content),
+            "elapsed": round(elapsed, 6),
+            "offset": round(time.perf_counter() - self.started - elapsed, 6)
+        }
+        with self.lock:
+            if self.cassette is None:
+                return
+            self.write_line(interaction)
+            self.interaction_count += 1
+
+    def close(self):
+        with self.lock:
+            if self.cassette is not None:
+                self.cassette.close()
+                self.cassette = None
+                print(f"Recorded {self.interaction_count} Purview requests to {self.filename}")
+
+
+class CassettePlayer(PurviewEmulator):
+    """
+    Serves the recorded responses of a cassette over HTTP on localhost, in place of Purview.
+
+    Requests are matched on their method, path, query and redacted body. Identical requests get their
+    recorded responses in the order they were recorded, so retries after a 429 replay the same way, and
+    the last one is served again once they run out. A request that was never recorded is answered with
+    a 404 and kept in misses, which shows where a changed code path asks Purview for something new.
+    """
+    def __init__(self, interactions: list, replay_latency: bool = False):
+        """
+        Args:
+            interactions (list): The recorded interactions, see load_cassette.
+            replay_latency (bool, optional): Wait as long as every recorded response took.
+        """
+        super().__init__()
+        self.replay_latency = replay_latency
+        self.responses = {}
+        for interaction in interactions:
+            key = get_interaction_key(interaction["method"], interaction["path"], interaction["body"])
+            self.responses.setdefault(key, []).append(interaction)
+        self.served = {}
+        self.misses = []
+
+    def handle(self, method: str, raw_path: str, body: bytes):
+        """
+        Answers one request with its next recorded response.
+
+        Returns:
+            tuple: The status code, the JSON payload (or None) and extra headers.
+        """
+        key = get_interaction_key(method, get_request_path(raw_path), decode_body(body))
+        with self.counter_lock:
+            self.request_count += 1
+            recorded = self.responses.get(key)
+            if not recorded:
+                self.misses.append(key[:2])
+                return CASSETTE_MISS_STATUS, {"errorCode": CASSETTE_MISS_ERROR_CODE, "errorMessage": f"The cassette holds no response for {method} {raw_path}"}, {}
+            position = self.served.get(key, 0)
+            self.served[key] = position + 1
+            interaction = recorded[min(position, len(recorded) - 1)]
+        if self.replay_latency and interaction["elapsed"] > 0:
+            time.sleep(interaction["elapsed"])
+        headers = {name: value for name, value in interaction["headers"].items() if name != "Content-Type"}
+        return interaction["status"], interaction["response"], headers
@@ -0,0 +1,811 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import bisect
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from pyapacheatlas.core import PurviewClient
+
+
+# Constants
+# ---------------
+
+ATLAS_PREFIX = "/catalog/api/atlas/v2"
+DISCOVERY_PREFIX = "/catalog/api"
+
+# Purview caps search and browse pages at 1000 values and refuses offsets past 100000
+EMULATOR_MAX_PAGE_SIZE = 1000
+EMULATOR_OFFSET_CEILING = 100000
+
+# New qualified names are kept unsorted until there are this many, then merged into the sorted prefix index
+QUALIFIED_NAME_INDEX_MERGE_SIZE = 1000
+
+TYPEDEF_CATEGORY_NAMES = {
+    "enumDefs": "ENUM",
+    "structDefs": "STRUCT",
+    "classificationDefs": "CLASSIFICATION",
+    "entityDefs": "ENTITY",
+    "relationshipDefs": "RELATIONSHIP",
+    "businessMetadataDefs": "BUSINESS_METADATA"
+}
+
+# Relationships every emulator knows, so uploaded columns show up under their table and the other way round.
+# The end types are not checked: any entity with the attribute on one end gets the attribute on the other end.
+DEFAULT_RELATIONSHIP_DEFS = [
+    {"name": "emulator_table_columns", "endDef1": {"name": "columns", "cardinality": "SET"}, "endDef2": {"name": "table", "cardinality": "SINGLE"}},
+    {"name": "emulator_view_columns", "endDef1": {"name": "view_columns", "cardinality": "SET"}, "endDef2": {"name": "view", "cardinality": "SINGLE"}},
+    {"name": "emulator_primary_key_fields", "endDef1": {"name": "primary_key_fields", "cardinality": "SET"}, "endDef2": {"name": "primary_key_table", "cardinality": "SINGLE"}},
+    {"name": "emulator_schema_fields", "endDef1": {"name": "fields", "cardinality": "SET"}, "endDef2": {"name": "schema", "cardinality": "SINGLE"}},
+    {"name": "emulator_tabular_schema", "endDef1": {"name": "tabular_schema", "cardinality": "SINGLE"}, "endDef2": {"name": "associatedDataSets", "cardinality": "SET"}}
+]
+
+
+# Global
+# ---------------
+
+# account name -> PurviewEmulator, for create_purview_client
+purview_emulators = {}
+purview_emulators_lock = threading.Lock()
+
+
+# Classes
+# ---------------
+
+class EmulatorError(Exception):
+    """
+    An error answered with an Atlas style body ({"errorCode", "errorMessage"}).
+    """
+    def __init__(self, status: int, error_code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.error_code = error_code
+
+
+class PurviewEmulatorStore:
+    """
+    The in-memory catalog behind an emulator: entities, relationships, typedefs, glossaries and collections.
+
+    Every method takes the store lock, so the emulator threads can call it at the same time. Search
+    results are cached until the next change, so paging through a large type does not scan it again,
+    and searching for a qualified name uses a sorted prefix index instead of scanning every entity.
+    """
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.entities = {}
+        self.guids_by_qualified_name = {}
+        self.guids_by_type = {}
+        self.search_cache = {}
+        self.sorted_qualified_names = []
+        self.unsorted_qualified_names = []
+        self.relationships = {}
+        self.typedefs = {category: {} for category in TYPEDEF_CATEGORY_NAMES}
+        for relationship_def in DEFAULT_RELATIONSHIP_DEFS:
+            self.typedefs["relationshipDefs"][relationship_def["name"]] = dict(relationship_def, category="RELATIONSHIP")
+        self.glossaries = {}
+        self.terms = {}
+        self.collections = {}
+
+    # Entities
+    # ---------------
+
+    def get_header(self, entity: dict):
+        """
+        Returns the header other entities and search results refer to an entity with.
+        """
+        return {
+            "guid": entity["guid"],
+            "typeName": entity["typeName"],
+            "displayText": entity["attributes"].get("name") or entity["attributes"].get("qualifiedName"),
+            "uniqueAttributes": {"qualifiedName": entity["attributes"].get("qualifiedName")}
+        }
+
+    def find_entity(self, reference: dict, guid_assignments: dict = None):
+        """
+        Finds the entity an object id refers to, by GUID (including the negative placeholders of the
+        same upload) or by typeName and uniqueAttributes.qualifiedName.
+        """
+        guid = reference.get("guid")
+        if guid is not None:
+            guid = (guid_assignments or {}).get(str(guid), guid)
+            if guid in self.entities:
+                return self.entities[guid]
+        qualified_name = (reference.get("uniqueAttributes") or {}).get("qualifiedName")
+        if qualified_name is not None:
+            guid = self.guids_by_qualified_name.get((reference.get("typeName"), qualified_name))
+            return self.entities.get(guid)
+        return None
+
+    def find_relationship_end(self, attribute_name: str, type_name: str = None):
+        """
+        Returns the relationship typedef with an end named attribute_name. An end declared on type_name
+        is preferred over an end without a type, such as those of DEFAULT_RELATIONSHIP_DEFS.
+
+        Returns:
+            tuple: The typedef (or None), the end definition named attribute_name and the end definition on the other side.
+        """
+        untyped_match = (None, {}, {})
+        for relationship_def in self.typedefs["relationshipDefs"].values():
+            end_def_1 = relationship_def.get("endDef1") or {}
+            end_def_2 = relationship_def.get("endDef2") or {}
+            for end_def, other_end_def in ((end_def_1, end_def_2), (end_def_2, end_def_1)):
+                if end_def.get("name") != attribute_name:
+                    continue
+                if end_def.get("type") is not None and end_def.get("type") == type_name:
+                    return relationship_def, end_def, other_end_def
+                if end_def.get("type") is None and untyped_match[0] is None:
+                    untyped_match = (relationship_def, end_def, other_end_def)
+        return untyped_match
+
+    def link(self, entity: dict, attribute_name: str, other: dict):
+        """
+        Records that entity refers to other through attribute_name, and adds the inverse reference when
+        a relationship typedef names it.
+        """
+        relationship_def, end_def, inverse_end_def = self.find_relationship_end(attribute_name, entity["typeName"])
+        relationship_guid = str(uuid.uuid4())
+        relationship_type = (relationship_def or {}).get("name")
+        header = dict(self.get_header(other), relationshipGuid=relationship_guid, relationshipType=relationship_type, entityStatus="ACTIVE")
+        self.add_relationship_attribute(entity, attribute_name, header, end_def.get("cardinality") == "SINGLE")
+        if inverse_end_def.get("name"):
+            inverse_header = dict(self.get_header(entity), relationshipGuid=relationship_guid, relationshipType=relationship_type, entityStatus="ACTIVE")
+            self.add_relationship_attribute(other, inverse_end_def["name"], inverse_header, inverse_end_def.get("cardinality") == "SINGLE")
+
+    def add_relationship_attribute(self, entity: dict, attribute_name: str, header: dict, single: bool):
+        """
+        Sets a single reference, or adds one to a list of references, replacing any earlier reference to the same entity.
+        """
+        relationship_attributes = entity.setdefault("relationshipAttributes", {})
+        if single:
+            relationship_attributes[attribute_name] = header
+            return
+        existing = relationship_attributes.get(attribute_name)
+        if not isinstance(existing, list):
+            existing = [] if existing is None else [existing]
+        existing = [h for h in existing if h.get("guid") != header["guid"]]
+        existing.append(header)
+        relationship_attributes[attribute_name] = existing
+
+    def upsert_entities(self, entities: list):
+        """
+        Creates or updates entities by typeName and qualifiedName, like POST /entity/bulk.
+
+        Returns:
+            dict: {"mutatedEntities": {"CREATE": [...], "UPDATE": [...]}, "guidAssignments": {...}}
+        """
+        with self.lock:
+            self.check_references(entities)
+            self.search_cache.clear()
+            result = {"mutatedEntities": {}, "guidAssignments": {}}
+            pending_references = []
+            now = int(time.time() * 1000)
+            for entity in entities:
+                attributes = dict(entity.get("attributes") or {})
+                key = (entity.get("typeName"), attributes.get("qualifiedName"))
+                guid = self.guids_by_qualified_name.get(key)
+                if guid is None:
+                    guid = str(uuid.uuid4())
+                    stored = {"guid": guid, "typeName": entity.get("typeName"), "attributes": {}, "relationshipAttributes": {},
+                              "status": "ACTIVE", "createTime": now, "version": 0, "classifications": [], "collectionId": None}
+                    self.entities[guid] = stored
+                    self.guids_by_qualified_name[key] = guid
+                    self.guids_by_type.setdefault(stored["typeName"], {})[guid] = None
+                    self.unsorted_qualified_names.append((str(key[1]).lower(), guid))
+                    operation = "CREATE"
+                else:
+                    stored = self.entities[guid]
+                    operation = "UPDATE"
+                if entity.get("guid") is not None and str(entity.get("guid")) != guid:
+                    result["guidAssignments"][str(entity.get("guid"))] = guid
+
+                references = {}
+                for name, value in list(attributes.items()) + list((entity.get("relationshipAttributes") or {}).items()):
+                    if self.is_reference(value):
+                        references[name] = value
+                        attributes.pop(name, None)
+                stored["attributes"].update(attributes)
+                stored["updateTime"] = now
+                stored["version"] += 1
+                if entity.get("classifications"):
+                    stored["classifications"] = entity["classifications"]
+                if entity.get("collectionId"):
+                    stored["collectionId"] = entity["collectionId"]
+                pending_references.append((stored, references))
+                result["mutatedEntities"].setdefault(operation, []).append(self.get_header(stored))
+
+            # References are resolved once the whole batch exists, since they can point at later entities
+            for stored, references in pending_references:
+                for name, value in references.items():
+                    for reference in (value if isinstance(value, list) else [value]):
+                        other = self.find_entity(reference, result["guidAssignments"])
+                        if other is not None:
+                            self.link(stored, name, other)
+            return result
+
+    def check_references(self, entities: list):
+        """
+        Refuses an upload, before anything is stored, when one of its entities refers to an entity that is neither
+        in the catalog nor in the upload, as Purview does.
+
+        Raises:
+            EmulatorError: 404 ATLAS-404-00-00A, with the first reference that was not found.
+        """
+        uploaded_guids = {str(e.get("guid")) for e in entities if e.get("guid") is not None}
+        uploaded_keys = {(e.get("typeName"), (e.get("attributes") or {}).get("qualifiedName")) for e in entities}
+        for entity in entities:
+            for value in list((entity.get("attributes") or {}).values()) + list((entity.get("relationshipAttributes") or {}).values()):
+                if not self.is_reference(value):
+                    continue
+                for reference in (value if isinstance(value, list) else [value]):
+                    if reference.get("guid") is not None and str(reference["guid"]) in uploaded_guids:
+                        continue
+                    if (reference.get("typeName"), (reference.get("uniqueAttributes") or {}).get("qualifiedName")) in uploaded_keys:
+                        continue
+                    if self.find_entity(reference) is None:
+                        raise EmulatorError(404, "ATLAS-404-00-00A", f"Referenced entity {json.dumps(reference)} is not found")
+
+    @staticmethod
+    def is_reference(value):
+        """
+        Checks whether an attribute value refers to other entities ({"guid"} or {"typeName", "uniqueAttributes"}, or a list of them).
+        """
+        values = value if isinstance(value, list) else [value]
+        return len(values) > 0 and all(isinstance(v, dict) and ("guid" in v or "uniqueAttributes" in v) for v in values)
+
+    def get_entities(self, guids: list):
+        with self.lock:
+            return [json.loads(json.dumps(self.entities[g])) for g in guids if g in self.entities]
+
+    def get_entities_by_qualified_names(self, type_name: str, qualified_names: list):
+        with self.lock:
+            guids = [self.guids_by_qualified_name.get((type_name, q)) for q in qualified_names]
+            return self.get_entities([g for g in guids if g is not None])
+
+    def delete_entities(self, guids: list):
+        """
+        Removes entities and every reference to them.
+
+        Returns:
+            dict: {"mutatedEntities": {"DELETE": [...]}}
+        """
+        with self.lock:
+            self.search_cache.clear()
+            deleted = []
+            for guid in guids:
+                entity = self.entities.pop(guid, None)
+                if entity is None:
+                    continue
+                self.guids_by_qualified_name.pop((entity["typeName"], entity["attributes"].get("qualifiedName")), None)
+                self.guids_by_type.get(entity["typeName"], {}).pop(guid, None)
+                deleted.append(self.get_header(entity))
+            deleted_guids = {h["guid"] for h in deleted}
+            for entity in self.entities.values():
+                for name, value in list(entity["relationshipAttributes"].items()):
+                    if isinstance(value, list):
+                        entity["relationshipAttributes"][name] = [h for h in value if h.get("guid") not in deleted_guids]
+                    elif isinstance(value, dict) and value.get("guid") in deleted_guids:
+                        entity["relationshipAttributes"][name] = None
+            return {"mutatedEntities": {"DELETE": deleted}} if deleted else {}
+
+    def add_relationship(self, relationship: dict):
+        """
+        Stores a relationship and links its two ends, like POST /relationship.
+        """
+        with self.lock:
+            end_1 = self.find_entity(relationship.get("end1") or {})
+            end_2 = self.find_entity(relationship.get("end2") or {})
+            if end_1 is None or end_2 is None:
+                raise EmulatorError(404, "ATLAS-404-00-00A", "Referenced entity of the relationship was not found")
+            relationship_guid = str(uuid.uuid4())
+            stored = dict(relationship, guid=relationship_guid, status="ACTIVE",
+                          end1=self.get_header(end_1), end2=self.get_header(end_2))
+            self.relationships[relationship_guid] = stored
+            relationship_def = self.typedefs["relationshipDefs"].get(relationship.get("typeName"))
+            if relationship_def is not None:
+                end_1_name = (relationship_def.get("endDef1") or {}).get("name")
+                end_2_name = (relationship_def.get("endDef2") or {}).get("name")
+                if end_1_name:
+                    self.add_relationship_attribute(end_1, end_1_name, dict(self.get_header(end_2), relationshipGuid=relationship_guid, relationshipType=relationship.get("typeName")),
+                                                    (relationship_def.get("endDef1") or {}).get("cardinality") == "SINGLE")
+                if end_2_name:
+                    self.add_relationship_attribute(end_2, end_2_name, dict(self.get_header(end_1), relationshipGuid=relationship_guid, relationshipType=relationship.get("typeName")),
+                                                    (relationship_def.get("endDef2") or {}).get("cardinality") == "SINGLE")
+            return stored
+
+    # Search
+    # ---------------
+
+    def matches_filter(self, entity: dict, search_filter: dict):
+        """
+        Evaluates the search filters this project sends: and/or/not, entityType, collectionId,
+        term/glossary, classification and attributeName/operator/attributeValue.
+        """
+        if not search_filter:
+            return True
+        if "and" in search_filter:
+            return all(self.matches_filter(entity, f) for f in search_filter["and"])
+        if "or" in search_filter:
+            return any(self.matches_filter(entity, f) for f in search_filter["or"])
+        if "not" in search_filter:
+            return not self.matches_filter(entity, search_filter["not"])
+        if "entityType" in search_filter:
+            return entity["typeName"] == search_filter["entityType"]
+        if "collectionId" in search_filter:
+            return entity.get("collectionId") == search_filter["collectionId"]
+        if "term" in search_filter:
+            return any(m.get("displayText") == search_filter["term"] for m in entity["relationshipAttributes"].get("meanings") or [])
+        if "classification" in search_filter:
+            return any(c.get("typeName") == search_filter["classification"] for c in entity.get("classifications") or [])
+        if "attributeName" in search_filter:
+            value = str(entity["attributes"].get(search_filter["attributeName"]) or "").lower()
+            expected = str(search_filter.get("attributeValue") or "").lower()
+            operator = search_filter.get("operator", "eq")
+            if operator == "eq":
+                return value == expected
+            if operator == "ne":
+                return value != expected
+            if operator == "startswith":
+                return value.startswith(expected)
+            if operator == "endswith":
+                return value.endswith(expected)
+            if operator == "contains":
+                return expected in value
+        return True
+
+    @staticmethod
+    def get_filtered_type(search_filter: dict):
+        """
+        Returns the entity type a filter is limited to, on its own or inside a top level "and", or None.
+        """
+        if not search_filter:
+            return None
+        if "entityType" in search_filter:
+            return search_filter["entityType"]
+        for part in search_filter.get("and") or []:
+            if "entityType" in part:
+                return part["entityType"]
+        return None
+
+    def get_guids_with_qualified_name_prefix(self, prefix: str):
+        """
+        Returns the GUIDs of the entities whose lowercase qualified name starts with prefix. Deleted entities
+        are left in the index and skipped by the caller.
+        """
+        if len(self.unsorted_qualified_names) > QUALIFIED_NAME_INDEX_MERGE_SIZE:
+            self.sorted_qualified_names = sorted(self.sorted_qualified_names + self.unsorted_qualified_names)
+            self.unsorted_qualified_names = []
+        start = bisect.bisect_left(self.sorted_qualified_names, (prefix, ""))
+        end = bisect.bisect_left(self.sorted_qualified_names, (prefix + "\uffff", ""))
+        guids = [guid for _, guid in self.sorted_qualified_names[start:end]]
+        guids.extend(guid for qualified_name, guid in self.unsorted_qualified_names if qualified_name.startswith(prefix))
+        return list(dict.fromkeys(guids))
+
+    def search(self, keywords, search_filter: dict):
+        """
+        Returns the search values of every matching entity, ordered by qualifiedName.
+        """
+        keywords = (keywords or "").strip().lower()
+        cache_key = (keywords, json.dumps(search_filter, sort_keys=True))
+        with self.lock:
+            if cache_key in self.search_cache:
+                return self.search_cache[cache_key]
+            filtered_type = self.get_filtered_type(search_filter)
+            if "://" in keywords:
+                # A qualified name: its own entity and those nested under it are found through the prefix index
+                candidates = [self.entities[guid] for guid in self.get_guids_with_qualified_name_prefix(keywords) if guid in self.entities]
+            elif filtered_type is None:
+                candidates = self.entities.values()
+            else:
+                candidates = [self.entities[guid] for guid in self.guids_by_type.get(filtered_type, {})]
+            values = []
+            for entity in candidates:
+                attributes = entity["attributes"]
+                if keywords and keywords != "*" and keywords not in str(attributes.get("name") or "").lower() \
+                        and keywords not in str(attributes.get("qualifiedName") or "").lower():
+                    continue
+                if not self.matches_filter(entity, search_filter):
+                    continue
+                values.append({
+                    "id": entity["guid"],
+                    "name": attributes.get("name"),
+                    "qualifiedName": attributes.get("qualifiedName"),
+                    "entityType": entity["typeName"],
+                    "collectionId": entity.get("collectionId"),
+                    "updateTime": entity.get("updateTime"),
+                    "term": [{"name": m.get("displayText")} for m in entity["relationshipAttributes"].get("meanings") or []],
+                    "classification": [c.get("typeName") for c in entity.get("classifications") or []],
+                    "@search.score": 1.0
+                })
+            values.sort(key=lambda v: str(v["qualifiedName"]))
+            self.search_cache[cache_key] = values
+            return values
+
+    # Typedefs
+    # ---------------
+
+    def upload_typedefs(self, payload: dict, update: bool):
+        with self.lock:
+            result = {}
+            for category, type_defs in payload.items():
+                if category not in self.typedefs:
+                    continue
+                for type_def in type_defs or []:
+                    exists = type_def.get("name") in self.typedefs[category]
+                    if exists and not update:
+                        raise EmulatorError(409, "ATLAS-409-00-001", f"Given type {type_def.get('name')} already exists")
+                    stored = dict(type_def, category=TYPEDEF_CATEGORY_NAMES[category])
+                    stored.setdefault("guid", str(uuid.uuid4()))
+                    self.typedefs[category][type_def.get("name")] = stored
+                    result.setdefault(category, []).append(stored)
+            return result
+
+    def get_typedefs(self):
+        with self.lock:
+            return {category: list(type_defs.values()) for category, type_defs in self.typedefs.items()}
+
+    def get_typedef_headers(self):
+        with self.lock:
+            return [{"guid": t.get("guid"), "name": name, "category": TYPEDEF_CATEGORY_NAMES[category]}
+                    for category, type_defs in self.typedefs.items() for name, t in type_defs.items()]
+
+    # Glossary
+    # ---------------
+
+    def add_glossary_term(self, term_name: str, glossary_name: str = "Glossary"):
+        """
+        Adds a term to a glossary, creating the glossary if needed.
+
+        Returns:
+            str: The GUID of the term.
+        """
+        with self.lock:
+            glossary = next((g for g in self.glossaries.values() if g["name"] == glossary_name), None)
+            if glossary is None:
+                glossary_guid = str(uuid.uuid4())
+                glossary = self.glossaries[glossary_guid] = {"guid": glossary_guid, "name": glossary_name, "qualifiedName": glossary_name, "terms": []}
+            for term in glossary["terms"]:
+                if term["displayText"] == term_name:
+                    return term["termGuid"]
+            term_guid = str(uuid.uuid4())
+            glossary["terms"].append({"termGuid": term_guid, "displayText": term_name})
+            self.terms[term_guid] = {"guid": term_guid, "name": term_name, "qualifiedName": f"{term_name}@{glossary_name}",
+                                     "anchor": {"glossaryGuid": glossary["guid"], "displayText": glossary_name}, "assignedEntities": []}
+            return term_guid
+
+    def assign_term(self, term_guid: str, entity_references: list):
+        with self.lock:
+            self.search_cache.clear()
+            term = self.terms.get(term_guid)
+            if term is None:
+                raise EmulatorError(404, "ATLAS-404-00-009", f"Given term guid {term_guid} is invalid/not found")
+            for reference in entity_references:
+                entity = self.entities.get(reference.get("guid"))
+                if entity is None:
+                    raise EmulatorError(404, "ATLAS-404-00-005", f"Given instance guid {reference.get('guid')} is invalid/not found")
+                if any(m.get("guid") == term_guid for m in entity["relationshipAttributes"].get("meanings") or []):
+                    raise EmulatorError(400, "ATLAS-400-00-064", f"Term {term['name']} is already assigned to {entity['guid']}")
+                relationship_guid = str(uuid.uuid4())
+                entity["relationshipAttributes"].setdefault("meanings", []).append(
+                    {"guid": term_guid, "typeName": "AtlasGlossaryTerm", "displayText": term["name"], "relationshipGuid": relationship_guid})
+                term["assignedEntities"].append(dict(self.get_header(entity), relationshipGuid=relationship_guid))
+
+    def delete_assigned_term(self, term_guid: str, entity_references: list):
+        with self.lock:
+            self.search_cache.clear()
+            term = self.terms.get(term_guid)
+            if term is None:
+                raise EmulatorError(404, "ATLAS-404-00-009", f"Given term guid {term_guid} is invalid/not found")
+            relationship_guids = {r.get("relationshipGuid") for r in entity_references}
+            for reference in entity_references:
+                entity = self.entities.get(reference.get("guid"))
+                if entity is not None:
+                    entity["relationshipAttributes"]["meanings"] = [m for m in entity["relationshipAttributes"].get("meanings") or []
+                                                                    if m.get("relationshipGuid") not in relationship_guids]
+            term["assignedEntities"] = [a for a in term["assignedEntities"] if a.get("relationshipGuid") not in relationship_guids]
+
+    def delete_term(self, term_guid: str):
+        with self.lock:
+            term = self.terms.pop(term_guid, None)
+            if term is None:
+                raise EmulatorError(404, "ATLAS-404-00-009", f"Given term guid {term_guid} is invalid/not found")
+            self.delete_assigned_term(term_guid, term["assignedEntities"])
+            for glossary in self.glossaries.values():
+                glossary["terms"] = [t for t in glossary["terms"] if t["termGuid"] != term_guid]
+
+    # Collections
+    # ---------------
+
+    def move_entities(self, guids: list, collection: str):
+        with self.lock:
+            self.search_cache.clear()
+            moved = []
+            for guid in guids:
+                entity = self.entities.get(guid)
+                if entity is not None:
+                    entity["collectionId"] = collection
+                    moved.append(self.get_header(entity))
+            return {"mutatedEntities": {"UPDATE": moved}}
+
+
+class PurviewEmulatorRequestHandler(BaseHTTPRequestHandler):
+    """
+    Hands every request to the PurviewEmulator of the server.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, payload, headers = self.server.emulator.handle(self.command, self.path, body)
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_request
+
+
+class PurviewEmulator:
+    """
+    An in-process emulator of the Atlas and Purview endpoints this project calls, served over HTTP on
+    localhost so the real pyapacheatlas client, request governor and API metrics all run unchanged.
+
+    Latency, throttling (429 with Retry-After) and page caps can be set to mimic a busy account.
+    """
+    def __init__(self, latency_seconds: float = 0.0, latency_jitter_seconds: float = 0.0, throttle_probability: float = 0.0,
+                 throttle_above_concurrency: int = None, retry_after_seconds: float = 1.0,
+                 max_page_size: int = EMULATOR_MAX_PAGE_SIZE, offset_ceiling: int = EMULATOR_OFFSET_CEILING):
+        """
+        Args:
+            latency_seconds (float, optional): Added to every response.
+            latency_jitter_seconds (float, optional): Up to this much more is added at random.
+            throttle_probability (float, optional): The share of requests answered with 429.
+            throttle_above_concurrency (int, optional): Answers 429 while more requests than this are being handled.
+            retry_after_seconds (float, optional): The Retry-After sent with every 429.
+            max_page_size (int, optional): Search and browse pages never hold more values than this.
+            offset_ceiling (int, optional): Search and browse offsets at or past this are refused.
+        """
+        self.store = PurviewEmulatorStore()
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.throttle_probability = throttle_probability
+        self.throttle_above_concurrency = throttle_above_concurrency
+        self.retry_after_seconds = retry_after_seconds
+        self.max_page_size = max_page_size
+        self.offset_ceiling = offset_ceiling
+        self.request_count = 0
+        self.throttled_count = 0
+        self.in_flight = 0
+        self.counter_lock = threading.Lock()
+        self.server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        """
+        Starts serving on a free localhost port, on a daemon thread.
+        """
+        if self.server is None:
+            self.server = ThreadingHTTPServer(("127.0.0.1", 0), PurviewEmulatorRequestHandler)
+            self.server.daemon_threads = True
+            self.server.emulator = self
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def point_client(self, client):
+        """
+        Points a PurviewClient, or an AsyncPurviewClient, at the emulator.
+        """
+        client.endpoint_url = self.base_url + ATLAS_PREFIX
+        if hasattr(client, "catalog_url"):
+            client.catalog_url = self.base_url + DISCOVERY_PREFIX
+            return client
+        client.glossary.endpoint_url = self.base_url + ATLAS_PREFIX
+        client.discovery.endpoint_url = self.base_url + DISCOVERY_PREFIX
+        client.collections.endpoint_url = self.base_url + "/"
+        return client
+
+    def handle(self, method: str, raw_path: str, body: bytes):
+        """
+        Answers one request.
+
+        Returns:
+            tuple: The status code, the JSON payload (or None) and extra headers.
+        """
+        with self.counter_lock:
+            self.request_count += 1
+            self.in_flight += 1
+            over_concurrency = self.throttle_above_concurrency is not None and self.in_flight > self.throttle_above_concurrency
+        try:
+            delay = self.latency_seconds + random.uniform(0, self.latency_jitter_seconds)
+            if delay > 0:
+                time.sleep(delay)
+            if over_concurrency or (self.throttle_probability and random.random() < self.throttle_probability):
+                with self.counter_lock:
+                    self.throttled_count += 1
+                return 429, {"error": {"code": "TooManyRequests", "message": "Rate limit is exceeded."}}, {"Retry-After": str(self.retry_after_seconds)}
+
+            parsed = urlparse(raw_path)
+            query = parse_qs(parsed.query, keep_blank_values=True)
+            payload = json.loads(body) if body else None
+            try:
+                status, result = self.route(method, unquote(parsed.path), query, payload)
+            except EmulatorError as e:
+                status, result = e.status, {"errorCode": e.error_code, "errorMessage": str(e)}
+            return status, result, {}
+        finally:
+            with self.counter_lock:
+                self.in_flight -= 1
+
+    def get_page(self, values: list, body: dict):
+        offset = int(body.get("offset") or 0)
+        limit = min(int(body.get("limit") or 50), self.max_page_size)
+        if offset + 1 > self.offset_ceiling:
+            raise EmulatorError(400, "Search.BadRequest", f"offset must be less than {self.offset_ceiling}")
+        return {"@search.count": len(values), "value": values[offset : offset + limit]}
+
+    def route(self, method: str, path: str, query: dict, payload):
+        store = self.store
+        if path.startswith(ATLAS_PREFIX):
+            path = path[len(ATLAS_PREFIX):]
+            parts = [p for p in path.split("/") if p]
+
+            if parts[:2] == ["entity", "bulk"] and len(parts) == 2:
+                if method == "GET":
+                    return 200, {"entities": store.get_entities(query.get("guid", [])), "referredEntities": {}}
+                if method == "POST":
+                    return 200, store.upsert_entities((payload or {}).get("entities", []))
+                if method == "DELETE":
+                    return 200, store.delete_entities(query.get("guid", []))
+            if parts[:4] == ["entity", "bulk", "uniqueAttribute", "type"] and method == "GET":
+                qualified_names = [v[0] for k, v in sorted(query.items()) if k.startswith("attr_") and k.endswith(":qualifiedName")]
+                return 200, {"entities": store.get_entities_by_qualified_names(parts[4], qualified_names), "referredEntities": {}}
+            if parts == ["entity"] and method == "POST":
+                return 200, store.upsert_entities([(payload or {}).get("entity", {})])
+            if parts[:2] == ["entity", "guid"] and len(parts) == 3:
+                if method == "GET":
+                    entities = store.get_entities([parts[2]])
+                    if not entities:
+                        raise EmulatorError(404, "ATLAS-404-00-005", f"Given instance guid {parts[2]} is invalid/not found")
+                    return 200, {"entity": entities[0], "referredEntities": {}}
+                if method == "DELETE":
+                    return 200, store.delete_entities([parts[2]])
+            if parts[:3] == ["entity", "uniqueAttribute", "type"] and len(parts) == 4:
+                entities = store.get_entities_by_qualified_names(parts[3], query.get("attr:qualifiedName", []))
+                if not entities:
+                    raise EmulatorError(404, "ATLAS-404-00-009", "Instance with the unique attribute was not found")
+                if method == "GET":
+                    return 200, {"entity": entities[0], "referredEntities": {}}
+                if method == "DELETE":
+                    return 200, store.delete_entities([entities[0]["guid"]])
+            if parts == ["relationship"] and method in ("POST", "PUT"):
+                return 200, store.add_relationship(payload or {})
+
+            if parts == ["types", "typedefs"]:
+                if method == "GET":
+                    return 200, store.get_typedefs()
+                if method in ("POST", "PUT"):
+                    return 200, store.upload_typedefs(payload or {}, update=method == "PUT")
+            if parts == ["types", "typedefs", "headers"] and method == "GET":
+                return 200, store.get_typedef_headers()
+
+            if parts == ["glossary"] and method == "GET":
+                with store.lock:
+                    return 200, json.loads(json.dumps(list(store.glossaries.values())))
+            if parts[:1] == ["glossary"] and len(parts) in (2, 3) and parts[1] not in ("term", "terms") and method == "GET":
+                glossary = store.glossaries.get(parts[1])
+                if glossary is None:
+                    raise EmulatorError(404, "ATLAS-404-00-009", f"Given glossary guid {parts[1]} is invalid/not found")
+                result = json.loads(json.dumps(glossary))
+                if len(parts) == 3 and parts[2] == "detailed":
+                    result["termInfo"] = {t["termGuid"]: store.terms[t["termGuid"]] for t in glossary["terms"]}
+                return 200, result
+            if parts[:2] == ["glossary", "term"] and len(parts) == 3:
+                if method == "GET":
+                    term = store.terms.get(parts[2])
+                    if term is None:
+                        raise EmulatorError(404, "ATLAS-404-00-009", f"Given term guid {parts[2]} is invalid/not found")
+                    return 200, json.loads(json.dumps(term))
+                if method == "DELETE":
+                    store.delete_term(parts[2])
+                    return 204, None
+            if parts == ["glossary", "term"] and method == "POST":
+                glossary = store.glossaries.get(((payload or {}).get("anchor") or {}).get("glossaryGuid"))
+                term_guid = store.add_glossary_term(payload.get("name"), glossary["name"] if glossary else "Glossary")
+                return 200, store.terms[term_guid]
+            if parts[:2] == ["glossary", "terms"] and len(parts) == 4 and parts[3] == "assignedEntities":
+                if method == "GET":
+                    term = store.terms.get(parts[2])
+                    if term is None:
+                        raise EmulatorError(404, "ATLAS-404-00-009", f"Given term guid {parts[2]} is invalid/not found")
+                    return 200, list(term["assignedEntities"])
+                if method == "POST":
+                    store.assign_term(parts[2], payload or [])
+                    return 204, None
+                if method in ("DELETE", "PUT"):
+                    store.delete_assigned_term(parts[2], payload or [])
+                    return 204, None
+
+        elif path.startswith(DISCOVERY_PREFIX):
+            parts = [p for p in path[len(DISCOVERY_PREFIX):].split("/") if p]
+            if parts == ["search", "query"] and method == "POST":
+                body = payload or {}
+                return 200, self.get_page(store.search(body.get("keywords"), body.get("filter")), body)
+            if parts == ["browse"] and method == "POST":
+                body = payload or {}
+                return 200, self.get_page(store.search(None, {"entityType": body.get("entityType")} if body.get("entityType") else None), body)
+            if parts[:1] == ["collections"] and parts[2:] == ["entity", "moveHere"] and method == "POST":
+                return 200, store.move_entities((payload or {}).get("entityGuids", []), parts[1])
+
+        else:
+            parts = [p for p in path.split("/") if p]
+            if parts == ["collections"] and method == "GET":
+                with store.lock:
+                    return 200, {"value": list(store.collections.values()), "count": len(store.collections)}
+            if parts[:1] == ["collections"] and len(parts) == 2:
+                with store.lock:
+                    if method == "PUT":
+                        store.collections[parts[1]] = dict(payload or {}, name=parts[1])
+                        return 200, store.collections[parts[1]]
+                    if method == "GET" and parts[1] in store.collections:
+                        return 200, store.collections[parts[1]]
+                    if method == "DELETE":
+                        store.collections.pop(parts[1], None)
+                        return 204, None
+
+        raise EmulatorError(404, "ATLAS-404-00-000", f"The emulator does not implement {method} {path}")
+
+
+# Functions
+# ---------------
+
+def get_purview_emulator(purview_account: str):
+    """
+    Returns the running emulator of an account, starting it on first use. Each account has its own catalog.
+
+    Parameters:
+        purview_account (str): The name of the Purview account.
+
+    Returns:
+        PurviewEmulator: The emulator.
+    """
+    with purview_emulators_lock:
+        if purview_account not in purview_emulators:
+            purview_emulators[purview_account] = PurviewEmulator().start()
+        return purview_emulators[purview_account]
+
+
+def create_emulated_purview_client(purview_account: str, emulator: PurviewEmulator = None) -> PurviewClient:
+    """
+    Creates a PurviewClient that talks to an emulator instead of Azure.
+
+    Parameters:
+        purview_account (str): The name of the Purview account.
+        emulator (PurviewEmulator, optional): The emulator. The account's shared emulator when not given.
+
+    Returns:
+        PurviewClient: The client, without authentication.
+    """
+    emulator = emulator or get_purview_emulator(purview_account)
+    return emulator.start().point_client(PurviewClient(account_name=purview_account))
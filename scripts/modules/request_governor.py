@@ -0,0 +1,577 @@
+##! /usr/bin/env python3
+
+
+# Function Imports
+# ---------------
+from modules.job_deadline import DeadlineExceededError, check_job_deadline, get_remaining_seconds
+
+
+# Package Imports
+# ---------------
+import inspect
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+
+
+# Constants
+# ---------------
+
+# Token bucket per account: the steady request rate and how many requests can go out at once after a quiet spell
+GOVERNOR_REQUESTS_PER_SECOND = 20
+GOVERNOR_BURST_SIZE = 40
+
+# AIMD concurrency: calls in flight start at the initial limit, grow by one per limit's worth of successes,
+# and are halved on throttling (at most once per cooldown, so one burst of 429s only counts once)
+GOVERNOR_INITIAL_CONCURRENCY = 8
+GOVERNOR_MIN_CONCURRENCY = 1
+GOVERNOR_MAX_CONCURRENCY = 32
+GOVERNOR_DECREASE_FACTOR = 0.5
+GOVERNOR_DECREASE_COOLDOWN_SECONDS = 2
+
+# Retries of idempotent requests, with full jitter backoff when Purview does not send Retry-After
+GOVERNOR_MAX_RETRIES = 5
+GOVERNOR_BACKOFF_BASE_SECONDS = 1
+GOVERNOR_BACKOFF_MAX_SECONDS = 60
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+THROTTLED_STATUS_CODES = {429, 503}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# POSTs that only read, or upsert entities by qualified name, and so can be sent again safely
+IDEMPOTENT_POST_PATHS = ("/search/query", "/search/suggest", "/search/autocomplete", "/browse", "/entity", "/entity/bulk")
+
+# (connect, read) timeout of every request, so a hung connection fails instead of waiting forever
+GOVERNOR_REQUEST_TIMEOUT_SECONDS = (10, 300)
+
+# Circuit breaker per endpoint class: it opens after this many calls in a row fail with a 5xx, a throttle that
+# outlasted the retries or a connection error, refuses calls while open, then lets one probe call through.
+# Every failed probe doubles the time it stays open, up to the max.
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_OPEN_SECONDS = 30
+CIRCUIT_BREAKER_MAX_OPEN_SECONDS = 600
+
+# Client operations, ie. "glossary.assignTerm", are put in the first endpoint class whose keyword they contain
+ENDPOINT_CLASS_KEYWORDS = [
+    ("discovery.", "search"), ("search", "search"), ("browse", "search"), ("query", "search"),
+    ("glossary", "glossary"), ("term", "glossary"),
+    ("collection", "collections"), ("move_entities", "collections"),
+    ("typedef", "typedefs"),
+    ("lineage", "lineage"),
+    ("relationship", "relationships")
+]
+DEFAULT_ENDPOINT_CLASS = "entity"
+
+
+# Global
+# ---------------
+
+# account name -> RequestGovernor
+request_governors = {}
+request_governors_lock = threading.Lock()
+
+# Whether the governed call running on each thread got a server failure or any response, set by the response hook,
+# and the governor whose concurrency slot it holds, which the hook frees while it backs off
+current_call = threading.local()
+
+
+# Functions
+# ---------------
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header, given either in seconds or as an HTTP date.
+
+    Parameters:
+        value (str): The header value, or None.
+
+    Returns:
+        float or None: The seconds to wait, or None if there is no usable header.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_idempotent_request(method: str, url: str):
+    """
+    Checks whether a request can be sent again without changing the outcome.
+
+    Parameters:
+        method (str): The HTTP method.
+        url (str): The request URL.
+
+    Returns:
+        bool: True for GET, PUT, DELETE and the POSTs in IDEMPOTENT_POST_PATHS.
+    """
+    method = (method or "").upper()
+    if method in IDEMPOTENT_METHODS:
+        return True
+    return method == "POST" and urlparse(url).path.rstrip("/").endswith(IDEMPOTENT_POST_PATHS)
+
+
+def get_endpoint_class(operation: str):
+    """
+    Returns the endpoint class of a client operation, which has its own circuit breaker.
+
+    Parameters:
+        operation (str): The client method, ie. "glossary.assignTerm" or "get_entity".
+
+    Returns:
+        str: "search", "glossary", "collections", "typedefs", "lineage", "relationships" or "entity".
+    """
+    operation = operation.lower()
+    for keyword, endpoint_class in ENDPOINT_CLASS_KEYWORDS:
+        if keyword.lower() in operation:
+            return endpoint_class
+    return DEFAULT_ENDPOINT_CLASS
+
+
+def is_server_failure(status_code: int):
+    """
+    Checks whether a final response, after any retries, counts against the circuit breaker. Client errors do not.
+    """
+    return status_code >= 500 or status_code in THROTTLED_STATUS_CODES
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of making a Purview call while the circuit breaker of its endpoint class is open.
+    """
+    def __init__(self, account_name: str, endpoint_class: str, retry_in_seconds: float):
+        super().__init__(f"Purview {endpoint_class} calls to {account_name} are failing, the next attempt is allowed in {retry_in_seconds:.0f}s.")
+        self.account_name = account_name
+        self.endpoint_class = endpoint_class
+        self.retry_in_seconds = retry_in_seconds
+
+
+class CircuitBreaker:
+    """
+    Fails calls to one endpoint class of an account fast while it keeps failing.
+
+    Closed, calls go through and failures in a row are counted. After CIRCUIT_BREAKER_FAILURE_THRESHOLD
+    of them it opens and refuses calls with CircuitOpenError. Once the open time is over a single probe
+    call is let through: if it succeeds the breaker closes, otherwise it opens again for twice as long.
+    """
+    def __init__(self, account_name: str, endpoint_class: str, failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                 open_seconds: float = CIRCUIT_BREAKER_OPEN_SECONDS, max_open_seconds: float = CIRCUIT_BREAKER_MAX_OPEN_SECONDS):
+        """
+        Args:
+            account_name (str): The name of the Purview account.
+            endpoint_class (str): The endpoint class, see get_endpoint_class.
+            failure_threshold (int, optional): The failures in a row that open the breaker.
+            open_seconds (float, optional): How long the breaker first stays open.
+            max_open_seconds (float, optional): The longest the breaker stays open.
+        """
+        self.account_name = account_name
+        self.endpoint_class = endpoint_class
+        self.failure_threshold = failure_threshold
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.open_seconds = open_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self.opened_count = 0
+        self.refused_count = 0
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Raises CircuitOpenError while the breaker is open or its probe is in flight; turns it half open when a probe is due.
+        """
+        with self.lock:
+            if self.state == "closed":
+                return
+            now = time.monotonic()
+            if self.state == "open" and now >= self.opened_until:
+                self.state = "half_open"
+                print(f"Probing Purview {self.endpoint_class} calls to {self.account_name}")
+                return
+            self.refused_count += 1
+            raise CircuitOpenError(self.account_name, self.endpoint_class, max(0.0, self.opened_until - now))
+
+    def on_success(self):
+        with self.lock:
+            if self.state != "closed":
+                print(f"Purview {self.endpoint_class} calls to {self.account_name} recovered")
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.open_seconds = self.base_open_seconds
+
+    def on_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open":
+                self.open_seconds = min(self.max_open_seconds, self.open_seconds * 2)
+            elif self.state == "open" or self.consecutive_failures < self.failure_threshold:
+                return
+            self.state = "open"
+            self.opened_until = time.monotonic() + self.open_seconds
+            self.opened_count += 1
+            print(f"Purview {self.endpoint_class} calls to {self.account_name} failed {self.consecutive_failures} times in a row, "
+                  f"refusing them for {self.open_seconds:.0f}s")
+
+
+class RequestGovernor:
+    """
+    Paces the requests made to one Purview account.
+
+    A token bucket caps the request rate and is paused for as long as Purview's Retry-After asks.
+    The number of calls in flight follows AIMD: it grows slowly while requests succeed and is halved
+    when Purview throttles. Throttled or failed idempotent requests are sent again after a jittered
+    backoff; anything else is handed back to pyapacheatlas, which raises as before.
+    """
+    def __init__(self, account_name: str, requests_per_second: float = GOVERNOR_REQUESTS_PER_SECOND, burst_size: int = GOVERNOR_BURST_SIZE,
+                 initial_concurrency: int = GOVERNOR_INITIAL_CONCURRENCY, max_concurrency: int = GOVERNOR_MAX_CONCURRENCY):
+        """
+        Args:
+            account_name (str): The name of the Purview account.
+            requests_per_second (float, optional): The steady request rate.
+            burst_size (int, optional): The most requests sent at once after a quiet spell.
+            initial_concurrency (int, optional): The calls in flight allowed at first.
+            max_concurrency (int, optional): The most calls in flight ever allowed.
+        """
+        self.account_name = account_name
+        self.requests_per_second = requests_per_second
+        self.burst_size = burst_size
+        self.max_concurrency = max_concurrency
+        self.concurrency_limit = float(initial_concurrency)
+        self.in_flight = 0
+        self.tokens = float(burst_size)
+        self.tokens_updated_on = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease_on = 0.0
+        self.throttled_count = 0
+        self.retried_count = 0
+        self.condition = threading.Condition()
+        self.bucket_lock = threading.Lock()
+        self.circuit_breakers = {}
+        self.circuit_breakers_lock = threading.Lock()
+
+    def get_circuit_breaker(self, endpoint_class: str):
+        """
+        Returns the circuit breaker of an endpoint class of the account, creating it on first use.
+        """
+        with self.circuit_breakers_lock:
+            if endpoint_class not in self.circuit_breakers:
+                self.circuit_breakers[endpoint_class] = CircuitBreaker(self.account_name, endpoint_class)
+            return self.circuit_breakers[endpoint_class]
+
+    def try_take_token(self):
+        """
+        Takes a token from the bucket if one is free and no Retry-After pause is running.
+
+        Returns:
+            float: 0 when a token was taken, otherwise the seconds to wait before trying again.
+        """
+        with self.bucket_lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst_size, self.tokens + (now - self.tokens_updated_on) * self.requests_per_second)
+            self.tokens_updated_on = now
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.requests_per_second
+
+    def take_token(self):
+        """
+        Waits for a token from the bucket, and for any Retry-After pause to end.
+        """
+        while True:
+            wait = self.try_take_token()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def get_concurrency_limit(self):
+        """
+        Returns the number of calls in flight the AIMD limit currently allows.
+        """
+        return max(GOVERNOR_MIN_CONCURRENCY, int(self.concurrency_limit))
+
+    def acquire(self, take_token: bool = True):
+        """
+        Waits for a concurrency slot and a token before a call is made.
+
+        Parameters:
+            take_token (bool, optional): False when the token of the request was already taken.
+        """
+        with self.condition:
+            while self.in_flight >= self.get_concurrency_limit():
+                self.condition.wait()
+            self.in_flight += 1
+        if take_token:
+            self.take_token()
+
+    def release(self):
+        """
+        Frees the concurrency slot of a finished call.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def on_success(self):
+        """
+        Additive increase: one more call in flight for every concurrency_limit successful requests.
+        """
+        with self.condition:
+            self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+            self.condition.notify_all()
+
+    def on_throttled(self, retry_after: float = None):
+        """
+        Multiplicative decrease, and a pause of the token bucket for as long as Retry-After asks.
+
+        Parameters:
+            retry_after (float, optional): The seconds Purview asked to wait.
+        """
+        now = time.monotonic()
+        with self.condition:
+            self.throttled_count += 1
+            if now - self.last_decrease_on >= GOVERNOR_DECREASE_COOLDOWN_SECONDS:
+                self.concurrency_limit = max(GOVERNOR_MIN_CONCURRENCY, self.concurrency_limit * GOVERNOR_DECREASE_FACTOR)
+                self.last_decrease_on = now
+        if retry_after:
+            with self.bucket_lock:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+    def get_backoff_seconds(self, attempt: int, retry_after: float = None):
+        """
+        Returns how long to wait before a retry: Retry-After plus a little jitter when given, otherwise full jitter exponential backoff.
+
+        Parameters:
+            attempt (int): The retry number, starting at 1.
+            retry_after (float, optional): The seconds Purview asked to wait.
+
+        Returns:
+            float: The seconds to wait.
+        """
+        if retry_after is not None:
+            return retry_after + random.uniform(0, GOVERNOR_BACKOFF_BASE_SECONDS)
+        return random.uniform(0, min(GOVERNOR_BACKOFF_MAX_SECONDS, GOVERNOR_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def response_hook(self, response, *args, **kwargs):
+        """
+        A requests response hook that records throttling and sends idempotent requests again.
+    The concurrency slot of the governed call is freed while it backs off.
+
+        The response that is finally returned replaces the original one, so pyapacheatlas only sees
+        the outcome of the last attempt.
+        """
+        current_call.got_response = True
+        attempt = 0
+        while response.status_code in RETRYABLE_STATUS_CODES:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code in THROTTLED_STATUS_CODES:
+                self.on_throttled(retry_after)
+            request = response.request
+            if attempt >= GOVERNOR_MAX_RETRIES or not is_idempotent_request(request.method, request.url):
+                break
+
+            delay = self.get_backoff_seconds(attempt + 1, retry_after)
+            remaining_seconds = get_remaining_seconds()
+            if remaining_seconds is not None and delay >= remaining_seconds:
+                # Waiting would outlast the job's deadline, so the failure is handed back now
+                break
+
+            attempt += 1
+            self.retried_count += 1
+            print(f"Purview returned {response.status_code} for {request.method} {urlparse(request.url).path}, retrying in {delay:.1f}s ({attempt}/{GOVERNOR_MAX_RETRIES})")
+            if getattr(current_call, "slot_governor", None) is self:
+                # The call's slot is not held while backing off, and is taken back before the retry is sent
+                self.release()
+                try:
+                    time.sleep(delay)
+                finally:
+                    self.acquire()
+            else:
+                time.sleep(delay)
+                self.take_token()
+
+            # The copy keeps the other hooks but not this one, so the retry does not come back into it
+            retry_request = request.copy()
+            retry_request.hooks = {"response": [hook for hook in request.hooks.get("response", []) if hook != self.response_hook]}
+            retry_request.retry_attempt = attempt
+            remaining_seconds = get_remaining_seconds()
+            if remaining_seconds is not None:
+                kwargs["timeout"] = max(1.0, remaining_seconds)
+            with requests.Session() as session:
+                response = session.send(retry_request, **kwargs)
+
+        if response.status_code < 400:
+            self.on_success()
+        elif is_server_failure(response.status_code):
+            current_call.server_failure = True
+        return response
+
+
+def report_call_outcome(circuit_breaker: CircuitBreaker, server_failure: bool, error: BaseException = None):
+    """
+    Tells a circuit breaker how a governed call ended. Client errors, ie. a 404 for a missing entity,
+    show that Purview is answering and count as a success.
+    """
+    if server_failure or isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        circuit_breaker.on_failure()
+    else:
+        circuit_breaker.on_success()
+
+
+def govern_generator(generator, governor: RequestGovernor, circuit_breaker: CircuitBreaker):
+    """
+    Yields from a generator returned by a governed call, so the pages it requests while it is iterated
+    are paced like calls.
+
+    Every step is checked against the job deadline and holds a concurrency slot. The generator does not say
+    which step sends the next page, so the circuit breaker check and the token of a page are taken at the
+    step after the previous page came back, and kept until a step gets a response. Each page is then
+    reported to the circuit breaker.
+
+    Parameters:
+        generator (generator): The generator returned by the client.
+        governor (RequestGovernor): The governor of the account.
+        circuit_breaker (CircuitBreaker): The circuit breaker of the call's endpoint class.
+    """
+    # The governed call already took the token of the first page
+    page_paid = True
+    while True:
+        check_job_deadline()
+        if not page_paid:
+            circuit_breaker.before_call()
+        governor.acquire(take_token=not page_paid)
+        page_paid = True
+        previous_server_failure = getattr(current_call, "server_failure", False)
+        previous_got_response = getattr(current_call, "got_response", False)
+        previous_slot_governor = getattr(current_call, "slot_governor", None)
+        current_call.server_failure = False
+        current_call.got_response = False
+        current_call.slot_governor = governor
+        error = None
+        finished = False
+        try:
+            value = next(generator)
+        except StopIteration:
+            finished = True
+        except BaseException as e:
+            error = e
+        finally:
+            server_failure = current_call.server_failure
+            got_response = current_call.got_response
+            current_call.server_failure = previous_server_failure
+            current_call.got_response = previous_got_response
+            current_call.slot_governor = previous_slot_governor
+            governor.release()
+
+        if got_response or error is not None:
+            report_call_outcome(circuit_breaker, server_failure, error)
+            page_paid = False
+        if finished:
+            return
+        if error is not None:
+            check_job_deadline()
+            raise error
+        yield value
+
+
+class GovernedPurviewClient:
+    """
+    Wraps a PurviewClient so that every call made through it, including through client.discovery,
+    waits for a slot and a token from the governor of its account.
+
+    Calls are refused with CircuitOpenError while the circuit breaker of their endpoint class is open,
+    and with DeadlineExceededError once the deadline of the running job (modules.job_deadline) has passed.
+    """
+    def __init__(self, client, governor: RequestGovernor, prefix: str = ""):
+        """
+        Args:
+            client (PurviewClient): The Purview client, or one of its sub-clients.
+            governor (RequestGovernor): The governor of the account.
+            prefix (str, optional): The name of the sub-client, ie. "glossary.".
+        """
+        self._client = client
+        self._governor = governor
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if callable(attribute):
+            circuit_breaker = self._governor.get_circuit_breaker(get_endpoint_class(self._prefix + name))
+            def governed_call(*args, **kwargs):
+                check_job_deadline()
+                circuit_breaker.before_call()
+                self._governor.acquire()
+                previous_server_failure = getattr(current_call, "server_failure", False)
+                previous_slot_governor = getattr(current_call, "slot_governor", None)
+                current_call.server_failure = False
+                current_call.slot_governor = self._governor
+                try:
+                    result = attribute(*args, **kwargs)
+                except BaseException as e:
+                    report_call_outcome(circuit_breaker, current_call.server_failure, e)
+                    check_job_deadline()
+                    raise
+                finally:
+                    current_call.server_failure = previous_server_failure
+                    current_call.slot_governor = previous_slot_governor
+                    self._governor.release()
+                if inspect.isgenerator(result):
+                    # ie. discovery.search_entities, whose requests are sent while it is iterated. The token
+                    # taken for the call is kept for its first page.
+                    return govern_generator(result, self._governor, circuit_breaker)
+                circuit_breaker.on_success()
+                return result
+            return governed_call
+        if hasattr(attribute, "__dict__") and hasattr(attribute, "_requests_args"):
+            return GovernedPurviewClient(attribute, self._governor, self._prefix + name + ".")
+        return attribute
+
+
+def get_request_governor(account_name: str):
+    """
+    Returns the governor shared by every client of a Purview account.
+
+    Parameters:
+        account_name (str): The name of the Purview account.
+
+    Returns:
+        RequestGovernor: The governor of the account.
+    """
+    with request_governors_lock:
+        if account_name.lower() not in request_governors:
+            request_governors[account_name.lower()] = RequestGovernor(account_name.lower())
+        return request_governors[account_name.lower()]
+
+
+def govern_purview_client(client, account_name: str):
+    """
+    Puts a PurviewClient under the governor of its account.
+
+    The response hook and a request timeout are added to the requests arguments the client shares with
+    its sub-clients, so the hook sees every HTTP response, and the returned wrapper paces every call.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        account_name (str): The name of the Purview account.
+
+    Returns:
+        GovernedPurviewClient: The governed client.
+    """
+    governor = get_request_governor(account_name)
+    client._requests_args.setdefault("timeout", GOVERNOR_REQUEST_TIMEOUT_SECONDS)
+    response_hooks = client._requests_args.setdefault("hooks", {}).setdefault("response", [])
+    if governor.response_hook not in response_hooks:
+        response_hooks.append(governor.response_hook)
+    return GovernedPurviewClient(client, governor)
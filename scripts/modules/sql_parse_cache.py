@@ -0,0 +1,194 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+
+# Constants
+# ---------------
+
+# The SQLite file parse results are kept in, in the working directory. ":memory:" keeps them for one run only.
+SQL_PARSE_CACHE_FILENAME = os.environ.get("PURVIEW_SQL_PARSE_CACHE") or "sql_parse_cache.sqlite3"
+
+# Trailing whitespace and line endings do not change what the parsers extract, so they are not part of the key
+TRAILING_WHITESPACE_PATTERN = re.compile(r"[ \t]+(?=\n)")
+
+
+# Global
+# ---------------
+
+# file name -> SqlParseCache
+sql_parse_caches = {}
+sql_parse_caches_lock = threading.Lock()
+
+
+# Functions
+# ---------------
+
+def normalize_sql_text(sql_text: str):
+    """
+    Normalizes SQL text for the cache key: line endings become "\n" and trailing whitespace is removed.
+    """
+    sql_text = sql_text.replace("\r\n", "\n").replace("\r", "\n")
+    return TRAILING_WHITESPACE_PATTERN.sub("", sql_text).strip()
+
+
+def get_sql_parse_key(parser_name: str, parser_version: str, sql_text: str):
+    """
+    Returns the cache key of a parse: the SHA-256 of the parser, its version and the normalized SQL text.
+    """
+    key_text = parser_name + "\0" + str(parser_version) + "\0" + normalize_sql_text(sql_text)
+    return hashlib.sha256(key_text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def get_sql_parse_cache(filename: str = SQL_PARSE_CACHE_FILENAME):
+    """
+    Returns the parse cache kept in a file, opening it on first use.
+    """
+    with sql_parse_caches_lock:
+        if filename not in sql_parse_caches:
+            sql_parse_caches[filename] = SqlParseCache(filename)
+        return sql_parse_caches[filename]
+
+
+def parse_sql_with_cache(parser_name: str, parser_version: str, sql_text: str, parse_function):
+    """
+    Returns the result of parse_function for a SQL text, parsed once and then served from the parse cache.
+
+    Parameters:
+        parser_name (str): The name of the parser, ie. "dw_view".
+        parser_version (str): The version of the parser. Change it when the parser extracts something different.
+        sql_text (str): The SQL text the result is cached for.
+        parse_function (callable): Parses the SQL text. Its result must be JSON serializable.
+
+    Returns:
+        The result of parse_function, as read back from JSON.
+    """
+    return get_sql_parse_cache().parse(parser_name, parser_version, sql_text, parse_function)
+
+
+def get_sql_parse_cache_stats():
+    """
+    Returns the hits and misses of the parse caches opened in this run, by parser.
+
+    Returns:
+        dict: {"hits", "misses", "parsers": {parser name: {"hits", "misses"}}}.
+    """
+    with sql_parse_caches_lock:
+        caches = list(sql_parse_caches.values())
+    stats = {"hits": 0, "misses": 0, "parsers": {}}
+    for cache in caches:
+        for parser_name, parser_stats in cache.get_stats()["parsers"].items():
+            total = stats["parsers"].setdefault(parser_name, {"hits": 0, "misses": 0})
+            for name in ("hits", "misses"):
+                total[name] += parser_stats[name]
+                stats[name] += parser_stats[name]
+    return stats
+
+
+def print_sql_parse_cache_stats():
+    """
+    Prints the hits and misses of the parse caches, if any SQL was parsed. Runs at exit.
+    """
+    stats = get_sql_parse_cache_stats()
+    total = stats["hits"] + stats["misses"]
+    if total == 0:
+        return
+    print(f"SQL parse cache: {stats['hits']} of {total} parses served from the cache ({round(stats['hits'] * 100 / total)}%).")
+    for parser_name, parser_stats in sorted(stats["parsers"].items()):
+        print(f"    {parser_name}: {parser_stats['hits']} hits, {parser_stats['misses']} misses")
+
+
+# Classes
+# ---------------
+
+class SqlParseCache:
+    """
+    Keeps what the SQL parsers extracted from a text (sources, targets, column mappings), keyed by the SHA-256
+    of the parser, its version and the normalized text, in a SQLite file, so a file that has not changed
+    since the last run is not parsed again.
+    """
+    def __init__(self, filename: str = SQL_PARSE_CACHE_FILENAME):
+        """
+        Args:
+            filename (str, optional): The SQLite file, created if it does not exist.
+        """
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS parses (key TEXT PRIMARY KEY, parser TEXT, result TEXT, parsed_on TEXT)")
+        self.connection.commit()
+
+        # parser name -> {"hits", "misses"}
+        self.stats = {}
+        atexit.register(self.close)
+
+    def count(self, parser_name: str, outcome: str):
+        with self.lock:
+            self.stats.setdefault(parser_name, {"hits": 0, "misses": 0})[outcome] += 1
+
+    def get(self, key: str):
+        with self.lock:
+            row = self.connection.execute("SELECT result FROM parses WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key: str, parser_name: str, result):
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO parses (key, parser, result, parsed_on) VALUES (?, ?, ?, ?)",
+                                    (key, parser_name, json.dumps(result), datetime.now().strftime("%m/%d/%Y %H:%M")))
+            self.connection.commit()
+
+    def parse(self, parser_name: str, parser_version: str, sql_text: str, parse_function):
+        """
+        Returns the cached result of a parse, or parses the SQL text and caches the result.
+
+        Parameters:
+            parser_name (str): The name of the parser, ie. "dw_view".
+            parser_version (str): The version of the parser.
+            sql_text (str): The SQL text.
+            parse_function (callable): Parses the SQL text, called without arguments on a miss.
+
+        Returns:
+            The result of parse_function, as read back from JSON so hits and misses return the same thing.
+        """
+        key = get_sql_parse_key(parser_name, parser_version, sql_text)
+        cached = self.get(key)
+        if cached is not None:
+            self.count(parser_name, "hits")
+            return cached["result"]
+
+        self.count(parser_name, "misses")
+        result = parse_function()
+        self.put(key, parser_name, {"result": result})
+        return json.loads(json.dumps(result))
+
+    def get_stats(self):
+        with self.lock:
+            return {"parsers": {name: dict(stats) for name, stats in self.stats.items()}}
+
+    def clear(self):
+        """
+        Removes every cached parse.
+        """
+        with self.lock:
+            self.connection.execute("DELETE FROM parses")
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            try:
+                self.connection.close()
+            except sqlite3.ProgrammingError:
+                pass
+
+
+atexit.register(print_sql_parse_cache_stats)
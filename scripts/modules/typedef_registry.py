@@ -0,0 +1,223 @@
+##! /usr/bin/env python3
+
+
+# Package Imports
+# ---------------
+import threading
+import time
+
+
+# Constants
+# ---------------
+
+# How long the typedefs of an account stay cached before they are fetched again. None keeps them for the rest of the run.
+TYPEDEF_REGISTRY_TTL_SECONDS = 600
+
+# The typedef categories upload_typedefs accepts, in the order they are listed in get_all_typedefs
+TYPEDEF_CATEGORIES = ["enumDefs", "structDefs", "classificationDefs", "entityDefs", "relationshipDefs", "businessMetadataDefs"]
+
+# Attribute definition fields that are compared when deciding whether a local definition changed
+COMPARED_ATTRIBUTE_DEF_FIELDS = ["typeName", "cardinality", "isOptional", "isUnique"]
+
+
+# Global
+# ---------------
+
+# Atlas endpoint of the account (see get_typedef_registry_key) -> {"loaded_on": time.time(), "typedefs": {category: {name: typedef}}}
+typedef_registry = {}
+typedef_registry_lock = threading.Lock()
+
+
+# Functions
+# ---------------
+
+def typedef_to_dict(type_def):
+    """
+    Converts a typedef given as a pyapacheatlas object (ie. EntityTypeDef) or a dictionary into a dictionary.
+
+    Parameters:
+        type_def (EntityTypeDef or dict): The typedef.
+
+    Returns:
+        dict: The typedef as a dictionary.
+    """
+    if hasattr(type_def, "to_json"):
+        type_def = type_def.to_json(omit_nulls=True)
+    type_def = dict(type_def)
+    if type_def.get("attributeDefs"):
+        type_def["attributeDefs"] = [a.to_json(omit_nulls=True) if hasattr(a, "to_json") else a for a in type_def["attributeDefs"]]
+    return type_def
+
+
+def get_typedef_registry_key(client):
+    """
+    Returns the key the typedefs of a client are cached under: the Atlas endpoint of its account, which the
+    client, its governed and instrumented wrappers and a LazyPurviewClient of the same account all share.
+    """
+    return str(getattr(client, "endpoint_url", None) or id(client)).lower()
+
+
+def clear_typedef_registry(client = None):
+    """
+    Drops the cached typedefs of the account of one client, or of every account.
+
+    Parameters:
+        client (PurviewClient, optional): The Purview client. Every client when not given.
+    """
+    with typedef_registry_lock:
+        if client is None:
+            typedef_registry.clear()
+        else:
+            typedef_registry.pop(get_typedef_registry_key(client), None)
+
+
+def get_cached_typedefs(client, refresh: bool = False):
+    """
+    Returns every typedef of the account, fetching them with one request the first time and after the TTL expires.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        refresh (bool, optional): Fetch the typedefs again even if they are cached.
+
+    Returns:
+        dict: The typedefs keyed by category ("entityDefs", ...) and then by name.
+    """
+    with typedef_registry_lock:
+        cached = typedef_registry.get(get_typedef_registry_key(client))
+        expired = cached is not None and TYPEDEF_REGISTRY_TTL_SECONDS is not None and time.time() - cached["loaded_on"] > TYPEDEF_REGISTRY_TTL_SECONDS
+        if cached is not None and not expired and not refresh:
+            return cached["typedefs"]
+
+        all_typedefs = client.get_all_typedefs()
+        typedefs = {}
+        for category in TYPEDEF_CATEGORIES:
+            typedefs[category] = {type_def.get("name"): type_def for type_def in all_typedefs.get(category, [])}
+        typedef_registry[get_typedef_registry_key(client)] = {"loaded_on": time.time(), "typedefs": typedefs}
+        print(f"Cached {sum(len(v) for v in typedefs.values())} typedefs")
+        return typedefs
+
+
+def get_typedef_names(client, category: str):
+    """
+    Returns the names of the typedefs of one category, ie. every classification name.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        category (str): The typedef category, ie. "classificationDefs".
+
+    Returns:
+        set: The typedef names.
+    """
+    return set(get_cached_typedefs(client).get(category, {}))
+
+
+def is_typedef_changed(local_type_def: dict, remote_type_def: dict):
+    """
+    Compares a local typedef against the one in Purview.
+
+    Only what the local definition sets is compared: superTypes, the description, the relationship
+    end definitions, and the typeName, cardinality, isOptional and isUnique of each attribute. Fields
+    Purview fills in itself (guid, version, createdBy, ...) are ignored.
+
+    Parameters:
+        local_type_def (dict): The local typedef.
+        remote_type_def (dict): The typedef returned by Purview.
+
+    Returns:
+        bool: True if the local typedef has to be uploaded.
+    """
+    if set(local_type_def.get("superTypes") or []) != set(remote_type_def.get("superTypes") or []):
+        return True
+    if local_type_def.get("description") and local_type_def.get("description") != remote_type_def.get("description"):
+        return True
+    for end_def in ("endDef1", "endDef2"):
+        local_end_def = local_type_def.get(end_def)
+        remote_end_def = remote_type_def.get(end_def) or {}
+        if local_end_def and any(remote_end_def.get(k) != v for k, v in local_end_def.items() if k in ("type", "name", "cardinality", "isContainer")):
+            return True
+
+    remote_attribute_defs = {a.get("name"): a for a in remote_type_def.get("attributeDefs") or []}
+    for local_attribute_def in local_type_def.get("attributeDefs") or []:
+        remote_attribute_def = remote_attribute_defs.get(local_attribute_def.get("name"))
+        if remote_attribute_def is None:
+            return True
+        for field in COMPARED_ATTRIBUTE_DEF_FIELDS:
+            if field in local_attribute_def and local_attribute_def[field] != remote_attribute_def.get(field):
+                return True
+    return False
+
+
+def diff_typedefs(client, local_typedefs: dict):
+    """
+    Works out which local typedefs are missing from Purview or differ from it.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        local_typedefs (dict): The local typedefs keyed by category, ie. {"entityDefs": [INGESTION_FRAMEWORK_DEF]}.
+
+    Returns:
+        dict: {"missing": {category: [typedef]}, "changed": {category: [typedef]}}, with the typedefs as dictionaries.
+    """
+    remote_typedefs = get_cached_typedefs(client)
+    diff = {"missing": {}, "changed": {}}
+    for category, type_defs in local_typedefs.items():
+        for type_def in type_defs:
+            type_def = typedef_to_dict(type_def)
+            remote_type_def = remote_typedefs.get(category, {}).get(type_def.get("name"))
+            if remote_type_def is None:
+                diff["missing"].setdefault(category, []).append(type_def)
+            elif is_typedef_changed(type_def, remote_type_def):
+                diff["changed"].setdefault(category, []).append(type_def)
+    return diff
+
+
+def sync_typedefs(client, entity_defs: list = None, relationship_defs: list = None, classification_defs: list = None, dry_run: bool = False):
+    """
+    Uploads only the local typedefs that are missing from Purview or changed, in a single upload_typedefs call.
+
+    The cached typedefs are updated with what was uploaded, so later lookups do not fetch them again.
+
+    Parameters:
+        client (PurviewClient): The Purview client.
+        entity_defs (list, optional): EntityTypeDef objects or dictionaries.
+        relationship_defs (list, optional): RelationshipTypeDef objects or dictionaries.
+        classification_defs (list, optional): ClassificationTypeDef objects or dictionaries.
+        dry_run (bool, optional): Only report what would be uploaded.
+
+    Returns:
+        dict: The names of the "missing" and "changed" typedefs by category, and the "result" of the upload (None if nothing was uploaded).
+    """
+    local_typedefs = {
+        "entityDefs": entity_defs or [],
+        "relationshipDefs": relationship_defs or [],
+        "classificationDefs": classification_defs or []
+    }
+    diff = diff_typedefs(client, local_typedefs)
+
+    summary = {
+        "missing": {category: [t.get("name") for t in type_defs] for category, type_defs in diff["missing"].items()},
+        "changed": {category: [t.get("name") for t in type_defs] for category, type_defs in diff["changed"].items()},
+        "result": None
+    }
+    upload = {}
+    for kind in ("missing", "changed"):
+        for category, type_defs in diff[kind].items():
+            upload.setdefault(category, []).extend(type_defs)
+
+    upload_count = sum(len(type_defs) for type_defs in upload.values())
+    print(f"Typedefs: {sum(len(v) for v in summary['missing'].values())} missing, {sum(len(v) for v in summary['changed'].values())} changed, "
+          f"{sum(len(v) for v in local_typedefs.values()) - upload_count} up to date")
+    if upload_count == 0 or dry_run:
+        return summary
+
+    summary["result"] = client.upload_typedefs(force_update=True, **upload)
+
+    # Purview answers with the stored typedefs, which are kept in the cache in place of the local ones
+    uploaded = summary["result"] if isinstance(summary["result"], dict) else {}
+    with typedef_registry_lock:
+        cached = typedef_registry.get(get_typedef_registry_key(client))
+        if cached is not None:
+            for category, type_defs in upload.items():
+                for type_def in uploaded.get(category) or type_defs:
+                    cached["typedefs"].setdefault(category, {})[type_def.get("name")] = type_def
+    return summary
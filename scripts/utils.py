@@ -8,9 +8,46 @@ from pyapacheatlas.core import PurviewClient
 from pyapacheatlas.auth import ServicePrincipalAuthentication
 from pyapacheatlas.core import PurviewClient
 import json
+import os
+import threading
+import time
 from pathlib import Path
+from azure.core.credentials import AccessToken
 from azure.identity import ClientSecretCredential, DefaultAzureCredential
 from typing import Union
+from modules.request_governor import govern_purview_client
+from modules.api_metrics import instrument_purview_client
+from modules.purview_emulator import create_emulated_purview_client
+from modules.purview_cassette import create_replaying_purview_client, record_purview_client
+
+
+# Constants
+# ---------------
+
+# Cached access tokens are fetched again this many seconds before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+# Set to a file path to keep access tokens on disk between runs, ie. ".purview_token_cache.json"
+TOKEN_CACHE_FILENAME = os.environ.get("PURVIEW_TOKEN_CACHE_FILENAME")
+
+# Set PURVIEW_EMULATOR=1 to send every client to an in-process emulator instead of Azure, for tests and benchmarks
+PURVIEW_EMULATOR_ENABLED = os.environ.get("PURVIEW_EMULATOR", "0") == "1"
+
+# Set to a cassette file, ie. "prod_run.jsonl.gz", to record every Purview request and response to it
+PURVIEW_CASSETTE_RECORD = os.environ.get("PURVIEW_CASSETTE_RECORD")
+
+# Set to a recorded cassette to answer every client from it instead of Azure, and PURVIEW_CASSETTE_LATENCY=1 to keep the recorded latencies
+PURVIEW_CASSETTE_REPLAY = os.environ.get("PURVIEW_CASSETTE_REPLAY")
+PURVIEW_CASSETTE_LATENCY = os.environ.get("PURVIEW_CASSETTE_LATENCY", "0") == "1"
+
+
+# Global
+# ---------------
+
+# cred_type -> CachedTokenCredential, and (purview_account, cred_type, mod_type) -> PurviewClient
+shared_credentials = {}
+purview_clients = {}
+client_registry_lock = threading.Lock()
 
 
 # Functions
@@ -50,10 +87,16 @@ def create_purview_client(credentials: Union[DefaultAzureCredential, ClientSecre
     """
     Creates and returns a PurviewClient object authenticated with Azure AD Service Principal.
 
+    The client is put under the request governor of its account, which paces its calls and retries
+    idempotent requests that Purview throttles, and its calls are recorded for the API usage summary.
+    With mod_type 'emulator', or PURVIEW_EMULATOR=1, the client talks to the in-process emulator of the
+    account (modules.purview_emulator) and the credentials are not used. PURVIEW_CASSETTE_RECORD records the
+    client's traffic to a cassette and PURVIEW_CASSETTE_REPLAY answers it from one (modules.purview_cassette).
+
     Args:
         credentials (Union[DefaultAzureCredential, ClientSecretCredential, ServicePrincipalAuthentication]): The credentials for authentication.
         purview_account (str): The name of the Azure Purview account.
-        mod_type (str): The type of python module to use for the operations.
+        mod_type (str): The type of python module to use for the operations, 'pyapacheatlas' or 'emulator'.
 
     Returns:
         PurviewClient: An authenticated PurviewClient object.
@@ -64,14 +107,122 @@ def create_purview_client(credentials: Union[DefaultAzureCredential, ClientSecre
     """
     try:
         # Instantiate the PurviewClient
-        if mod_type == 'pyapacheatlas':
-            return PurviewClient(account_name=purview_account, authentication=credentials)
+        if mod_type == 'emulator' or (PURVIEW_EMULATOR_ENABLED and mod_type == 'pyapacheatlas'):
+            client = create_emulated_purview_client(purview_account)
+        elif mod_type == 'pyapacheatlas' and PURVIEW_CASSETTE_REPLAY:
+            client = create_replaying_purview_client(purview_account, PURVIEW_CASSETTE_REPLAY, PURVIEW_CASSETTE_LATENCY)
+        elif mod_type == 'pyapacheatlas':
+            client = PurviewClient(account_name=purview_account, authentication=credentials)
         else:
             raise ValueError("Unsupported module type: " + mod_type)
+        if PURVIEW_CASSETTE_RECORD:
+            record_purview_client(client, purview_account, PURVIEW_CASSETTE_RECORD)
+        return instrument_purview_client(govern_purview_client(client, purview_account))
     except Exception as e:
         raise Exception("Error occurred during PurviewClient instantiation.") from e
 
 
+class CachedTokenCredential:
+    """
+    Wraps a credential and keeps its access tokens until shortly before they expire.
+
+    Tokens are kept in memory per scope and, when a cache file is given, on disk as well so the next
+    run can reuse them. The cache file holds bearer tokens and is created readable by the owner only.
+    """
+    def __init__(self, credential, cache_filename: str = None):
+        """
+        Args:
+            credential: The DefaultAzureCredential or ClientSecretCredential to fetch tokens with.
+            cache_filename (str, optional): The file to keep tokens in between runs.
+        """
+        self.credential = credential
+        self.cache_filename = cache_filename
+        self.tokens = {}
+        self.lock = threading.Lock()
+        if cache_filename and os.path.exists(cache_filename):
+            try:
+                with open(cache_filename, "r", encoding="utf-8") as json_file:
+                    self.tokens = {scope: AccessToken(t["token"], t["expires_on"]) for scope, t in json.load(json_file).items()}
+            except (OSError, ValueError, KeyError, TypeError):
+                self.tokens = {}
+
+    def _save_tokens(self):
+        file_descriptor = os.open(self.cache_filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as json_file:
+            json.dump({scope: {"token": t.token, "expires_on": t.expires_on} for scope, t in self.tokens.items()}, json_file)
+
+    def get_token(self, *scopes, **kwargs) -> AccessToken:
+        """
+        Returns the cached access token of the scopes, fetching a new one when it is missing or about to expire.
+        """
+        key = " ".join(scopes)
+        with self.lock:
+            token = self.tokens.get(key)
+            if token is None or token.expires_on - TOKEN_REFRESH_MARGIN_SECONDS < time.time():
+                token = self.credential.get_token(*scopes, **kwargs)
+                self.tokens[key] = token
+                if self.cache_filename:
+                    self._save_tokens()
+            return token
+
+
+def get_shared_credentials(cred_type: str = 'default', cache_filename: str = TOKEN_CACHE_FILENAME) -> CachedTokenCredential:
+    """
+    Returns the one credential of a type shared by every client, wrapped so its tokens are cached.
+
+    Args:
+        cred_type (str, optional): The type of the credentials, only 'default' is shared.
+        cache_filename (str, optional): The file to keep tokens in between runs. Defaults to $PURVIEW_TOKEN_CACHE_FILENAME.
+
+    Returns:
+        CachedTokenCredential: The shared credential.
+    """
+    with client_registry_lock:
+        if cred_type not in shared_credentials:
+            shared_credentials[cred_type] = CachedTokenCredential(get_credentials(cred_type=cred_type), cache_filename)
+        return shared_credentials[cred_type]
+
+
+def get_purview_client(purview_account: str, cred_type: str = 'default', mod_type: str = 'pyapacheatlas') -> PurviewClient:
+    """
+    Returns the client of a Purview account, creating it with the shared credential on first use.
+
+    Args:
+        purview_account (str): The name of the Azure Purview account.
+        cred_type (str, optional): The type of the credentials, only 'default' is shared.
+        mod_type (str, optional): The type of python module to use for the operations.
+
+    Returns:
+        PurviewClient: The client of the account.
+    """
+    key = (purview_account, cred_type, mod_type)
+    if key not in purview_clients:
+        credentials = get_shared_credentials(cred_type)
+        with client_registry_lock:
+            if key not in purview_clients:
+                purview_clients[key] = create_purview_client(credentials=credentials, purview_account=purview_account, mod_type=mod_type)
+    return purview_clients[key]
+
+
+class LazyPurviewClient:
+    """
+    Stands in for the client of a Purview account and only creates it, through get_purview_client, when it is first used.
+
+    Modules can keep their module-level qa_client and prod_client without signing in when they are imported.
+    """
+    def __init__(self, purview_account: str, cred_type: str = 'default', mod_type: str = 'pyapacheatlas'):
+        self.purview_account = purview_account
+        self.cred_type = cred_type
+        self.mod_type = mod_type
+
+    def __getattr__(self, name):
+        # Special names, ie. the __setstate__ lookup of copy and pickle, are not forwarded, and an instance made
+        # without __init__ (as copy and pickle do) has nothing to forward to, so neither recurses into __getattr__
+        if (name.startswith("__") and name.endswith("__")) or "purview_account" not in self.__dict__:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return getattr(get_purview_client(self.purview_account, self.cred_type, self.mod_type), name)
+
+
 def save_dict_to_json(data: dict, path: Path, filename: str):
     """
     Save a dictionary to a JSON file nested within the specified directory.